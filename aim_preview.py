@@ -0,0 +1,75 @@
+from settings import *
+from utils import vector_to_angle
+from laser_path import trace_to_target, trace_walls, stop_at_enemies
+import profiler
+
+class AimPreview:
+    """The laser path a shot would take right now, cached between frames
+
+    The path has two legs, traced the same way Laser.fire does: player to
+    Shay, then the ricochet from Shay. Each leg's wall trace is cached under
+    its own key, so only the legs whose inputs changed are traced again:
+
+    - player -> Shay: quantized player and Shay positions
+    - ricochet: quantized Shay position and ricochet heading
+
+    Both keys include the level version. Cutting the legs short at enemies is
+    cached separately against the enemy pool version, which changes whenever
+    enemies move. Lookups are reported to the profiler as cache hits and misses.
+    """
+    def __init__(self, quantum=None, angle_quantum=None):
+        # Defaults read per game, so balance overrides apply
+        self.quantum = AIM_PREVIEW_QUANTUM if quantum is None else quantum
+        self.angle_quantum = AIM_PREVIEW_ANGLE_QUANTUM if angle_quantum is None else angle_quantum
+        self._to_shay_key = None
+        self._to_shay = None
+        self._ricochet_key = None
+        self._ricochet = None
+        self._enemy_key = None
+        self._points = None
+
+    def _cell(self, pos):
+        return (round(pos[0] / self.quantum), round(pos[1] / self.quantum))
+
+    def path(self, player_pos, shay, walls, level_version, enemies):
+        """Polyline from the player through Shay to where the shot would stop
+
+        Returns:
+            list: points of the path; it ends before Shay if a wall or enemy
+                  is in the way
+        """
+        shay_cell = self._cell(shay.pos)
+        key = (self._cell(player_pos), shay_cell, level_version)
+        hit = key == self._to_shay_key
+        profiler.cache_hit("AimPreview.to_shay", hit)
+        if not hit:
+            self._to_shay_key = key
+            self._to_shay = trace_to_target(player_pos, shay.pos, walls)
+        ricochet_key = None
+
+        # Only a beam that reaches Shay ricochets
+        if self._to_shay.normals[-1] is None:
+            direction_to_shay = (shay.pos[0] - player_pos[0], shay.pos[1] - player_pos[1])
+            direction = shay.calculate_ricochet_vector(direction_to_shay, player_pos)
+            ricochet_key = (shay_cell, round(vector_to_angle(direction) / self.angle_quantum), level_version)
+            hit = ricochet_key == self._ricochet_key
+            profiler.cache_hit("AimPreview.ricochet", hit)
+            if not hit:
+                self._ricochet_key = ricochet_key
+                self._ricochet = trace_walls(shay.pos, direction, walls, LASER_MAX_BOUNCES, LASER_MAX_LENGTH)
+
+        # Re-test enemies only if they or a wall trace changed
+        enemy_key = (key, ricochet_key, enemies.version)
+        hit = enemy_key == self._enemy_key
+        profiler.cache_hit("AimPreview.enemies", hit)
+        if not hit:
+            self._enemy_key = enemy_key
+            if ricochet_key is None:
+                # Like Laser.fire, a beam a wall stops short of Shay ignores enemies
+                self._points = list(self._to_shay.points)
+            else:
+                to_shay = stop_at_enemies(self._to_shay, enemies)
+                self._points = list(to_shay.points)
+                if to_shay.enemy_index is None:
+                    self._points += stop_at_enemies(self._ricochet, enemies).points[1:]
+        return self._points
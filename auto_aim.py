@@ -0,0 +1,105 @@
+import math
+from collections import namedtuple
+import numpy as np
+from settings import *
+from enemy_pool import ENEMY_STATE_DYING, hit_half_extent
+from laser_path import trace_to_target, stop_at_enemies
+from ray_batch import raycast_many, segment_box_entries_many
+
+# A ricochet angle whose shot kills an enemy: the pool row of the enemy, where
+# the beam hits it, how far the beam travels from Shay and how far off the
+# center of the enemy's vulnerable arc it arrives (degrees)
+AimSolution = namedtuple("AimSolution", ["angle", "enemy_index", "point", "length", "arc_offset"])
+
+def kill_angles(player_pos, shay_pos, walls, enemies, increment=None, max_bounces=None, max_length=None):
+    """Every ricochet angle (a multiple of increment) whose shot kills an enemy, best first
+
+    All 360 / increment ricochet beams are traced together: one batched ray
+    cast against the walls and one batched enemy hit test per bounce. A beam
+    kills when the first enemy it runs into is hit inside its vulnerable arc,
+    the same rules as Laser.fire.
+
+    Solutions are ranked by how squarely the beam arrives on the enemy's back
+    (the smallest arc_offset is the one most likely to still kill after the
+    enemy turns a little), then by beam length.
+
+    Args:
+        walls: the level's WallIndex
+        enemies: the EnemyPool
+        increment, max_bounces, max_length: default to RICOCHET_ANGLE_INCREMENT,
+            LASER_MAX_BOUNCES and LASER_MAX_LENGTH, read at call time like
+            Laser.fire does, so balance overrides apply to both
+
+    Returns:
+        list: AimSolution for each killing angle; empty if the beam from the
+              player doesn't reach Shay
+    """
+    increment = RICOCHET_ANGLE_INCREMENT if increment is None else increment
+    max_bounces = LASER_MAX_BOUNCES if max_bounces is None else max_bounces
+    max_length = LASER_MAX_LENGTH if max_length is None else max_length
+
+    # The ricochet only happens if the beam reaches Shay
+    to_shay = trace_to_target(player_pos, shay_pos, walls)
+    if enemies.count == 0 or to_shay.normals[-1] is not None:
+        return []
+    if stop_at_enemies(to_shay, enemies).enemy_index is not None:
+        return []
+
+    # Shay reflects the beam straight back at the player, then turns it by the ricochet angle
+    angles = np.arange(0, 360, increment)
+    back = math.atan2(player_pos[1] - shay_pos[1], player_pos[0] - shay_pos[0])
+    headings = back + np.radians(angles)
+    directions = np.stack([np.cos(headings), np.sin(headings)], axis=1)
+    origins = np.tile(np.asarray(shay_pos, dtype=float), (len(angles), 1))
+
+    n = enemies.count
+    centers = enemies.pos[:n]
+    dying = enemies.state[:n] == ENEMY_STATE_DYING
+    enemy_index = np.full(len(angles), -1)
+    hit_points = np.zeros((len(angles), 2))
+    incoming = np.zeros(len(angles))
+    lengths = np.zeros(len(angles))
+    travelled = np.zeros(len(angles))
+
+    # Beams still travelling, by row into the arrays above
+    active = np.arange(len(angles))
+    for bounce in range(max_bounces + 1):
+        wall_hits = raycast_many(origins[active], directions[active], walls, max_length)
+        distances = np.minimum(wall_hits.distances, max_length - travelled[active])
+        ends = origins[active] + directions[active] * distances[:, None]
+
+        # Nearest enemy along each beam segment
+        entries = segment_box_entries_many(origins[active], ends, centers, hit_half_extent())
+        entries[:, dying] = np.inf
+        nearest = entries.argmin(axis=1)
+        fraction = entries[np.arange(len(active)), nearest]
+        stopped = fraction != np.inf
+
+        rows = active[stopped]
+        enemy_index[rows] = nearest[stopped]
+        hit_points[rows] = origins[rows] + (ends[stopped] - origins[rows]) * fraction[stopped, None]
+        incoming[rows] = np.degrees(np.arctan2(-directions[rows, 1], -directions[rows, 0])) % 360
+        lengths[rows] = travelled[rows] + distances[stopped] * fraction[stopped]
+
+        # The rest reflect off the wall they hit, while they have length left
+        travelled[active] += distances
+        bounces = ~stopped & (wall_hits.wall_indices >= 0) & (travelled[active] < max_length)
+        active = active[bounces]
+        if not len(active):
+            break
+        normals = wall_hits.normals[bounces]
+        dots = (directions[active] * normals).sum(axis=1)
+        directions[active] = directions[active] - 2 * dots[:, None] * normals
+        origins[active] = wall_hits.points[bounces]
+
+    # Kills: the stopping enemy was hit inside its vulnerable arc
+    rows = np.flatnonzero(enemy_index >= 0)
+    offsets = np.abs((incoming[rows] - enemies.vulnerable_angle[enemy_index[rows]] + 180) % 360 - 180)
+    kills = offsets <= VULNERABLE_ARC_SIZE / 2
+    rows, offsets = rows[kills], offsets[kills]
+    order = np.lexsort((lengths[rows], offsets))
+    return [
+        AimSolution(float(angles[row]), int(enemy_index[row]), tuple(hit_points[row].tolist()),
+                    float(lengths[row]), float(offset))
+        for row, offset in zip(rows[order], offsets[order])
+    ]
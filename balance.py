@@ -0,0 +1,204 @@
+"""Parallel wave-balancing simulator
+
+Plays many headless games with the scripted bot across all cores, each with
+its own seed and settings overrides, and writes per-wave results to CSV.
+
+Example:
+    python balance.py --runs 64 --set ENEMY_COUNT_BASE=4,5,6 --set VULNERABLE_ARC_SIZE=90,120
+"""
+import argparse
+import ast
+import csv
+import itertools
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import settings
+from simulation import Simulation
+from bot import ScriptedBot
+
+# Settings that have been overridden in this process, with their original values
+_defaults = {}
+# Settings only read while the game modules load, or that other settings are
+# computed from at that point (SIM_DT from FPS, the cache and sound directories),
+# so overriding them afterwards would silently change nothing
+LOAD_TIME_SETTINGS = {"FPS", "ASSET_DIR", "LEVEL_DIR", "TEXT_CACHE_SIZE", "SPRITE_FADE_STEPS",
+                      "ENEMY_SPRITE_ANGLE_STEP", "EVENT_LOG_LEVEL", "EVENT_LOG_BUFFER"}
+
+WAVE_FIELDS = ["config", "overrides", "seed", "wave", "outcome", "time_to_clear", "shots", "kills", "shots_per_kill"]
+SUMMARY_FIELDS = ["config", "overrides", "wave", "runs_reached", "survival_rate",
+                  "clear_time_p10", "clear_time_p50", "clear_time_p90",
+                  "shots_per_kill_p10", "shots_per_kill_p50", "shots_per_kill_p90"]
+
+def check_setting(name):
+    """Raise ValueError unless name is a setting apply_settings_overrides can change"""
+    if not hasattr(settings, name):
+        raise ValueError(f"Unknown setting: {name}")
+    if name in LOAD_TIME_SETTINGS:
+        raise ValueError(f"{name} is only read when the game loads and can't be overridden")
+
+def apply_settings_overrides(overrides):
+    """Override settings values in this process
+
+    Modules copy settings with 'from settings import *', so every loaded game
+    module holding the name is patched too. Game code reads settings when it
+    uses them (defaults of None are resolved at call time), so the new values
+    take effect from the next game on. Earlier overrides are undone first,
+    since a worker process runs many jobs.
+
+    Raises:
+        ValueError: for a setting check_setting rejects
+    """
+    package_dir = os.path.dirname(os.path.abspath(settings.__file__))
+    game_modules = [
+        module for module in list(sys.modules.values())
+        if os.path.dirname(os.path.abspath(getattr(module, "__file__", None) or "/")) == package_dir
+    ]
+
+    values = dict(_defaults)
+    for name, value in overrides.items():
+        check_setting(name)
+        _defaults.setdefault(name, getattr(settings, name))
+        values[name] = value
+
+    for name, value in values.items():
+        for module in game_modules:
+            if name in vars(module):
+                setattr(module, name, value)
+
+def run_game(job):
+    """Play one headless game and return a row per wave reached"""
+    config_id, overrides, seed, dt, max_seconds = job
+    apply_settings_overrides(overrides)
+
+    simulation = Simulation.headless(dt, seed)
+    dt = simulation.dt
+    game = simulation.game
+    spawner = game.enemy_spawner
+    bot = ScriptedBot()
+    rows = []
+    wave = None
+
+    for _ in range(int(max_seconds / dt)):
+        simulation.step(bot(game))
+        finished = game.game_state in (settings.GAME_STATE_GAME_OVER, settings.GAME_STATE_VICTORY)
+        in_wave = not spawner.in_wave_transition and 1 <= spawner.current_wave <= settings.TOTAL_WAVES
+
+        if wave is None and in_wave:
+            wave = (spawner.current_wave, simulation.time, game.shots_fired, spawner.laser_kills)
+        elif wave is not None and (not in_wave or finished):
+            died = game.game_state == settings.GAME_STATE_GAME_OVER
+            rows.append(_wave_row(config_id, overrides, seed, wave, "died" if died else "cleared",
+                                  simulation.time, game.shots_fired, spawner.laser_kills))
+            wave = None
+        if finished:
+            break
+    else:
+        if wave is not None:
+            rows.append(_wave_row(config_id, overrides, seed, wave, "timeout",
+                                  simulation.time, game.shots_fired, spawner.laser_kills))
+    return rows
+
+def _wave_row(config_id, overrides, seed, wave, outcome, now, shots_fired, kills):
+    number, start_time, start_shots, start_kills = wave
+    shots = shots_fired - start_shots
+    kills = kills - start_kills
+    return {
+        "config": config_id,
+        "overrides": " ".join(f"{k}={v}" for k, v in overrides.items()),
+        "seed": seed,
+        "wave": number,
+        "outcome": outcome,
+        "time_to_clear": round(now - start_time, 3) if outcome == "cleared" else "",
+        "shots": shots,
+        "kills": kills,
+        "shots_per_kill": round(shots / kills, 3) if kills else "",
+    }
+
+def percentile(values, fraction):
+    """Linearly interpolated percentile of a list of numbers ('' if empty)"""
+    if not values:
+        return ""
+    values = sorted(values)
+    position = (len(values) - 1) * fraction
+    low = int(position)
+    high = min(low + 1, len(values) - 1)
+    return round(values[low] + (values[high] - values[low]) * (position - low), 3)
+
+def summarize(rows):
+    """Per config and wave: survival rate and clear time / shots-per-kill distributions"""
+    groups = {}
+    for row in rows:
+        groups.setdefault((row["config"], row["overrides"], row["wave"]), []).append(row)
+
+    summary = []
+    for (config_id, overrides, wave), group in sorted(groups.items()):
+        clear_times = [r["time_to_clear"] for r in group if r["outcome"] == "cleared"]
+        shots_per_kill = [r["shots_per_kill"] for r in group if r["shots_per_kill"] != ""]
+        entry = {
+            "config": config_id,
+            "overrides": overrides,
+            "wave": wave,
+            "runs_reached": len(group),
+            "survival_rate": round(len(clear_times) / len(group), 3),
+        }
+        for fraction in (0.1, 0.5, 0.9):
+            entry[f"clear_time_p{int(fraction * 100)}"] = percentile(clear_times, fraction)
+            entry[f"shots_per_kill_p{int(fraction * 100)}"] = percentile(shots_per_kill, fraction)
+        summary.append(entry)
+    return summary
+
+def write_csv(path, fields, rows):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(rows)
+
+def parse_overrides(specs):
+    """Turn ['NAME=v1,v2', ...] into the list of every combination of override dicts"""
+    axes = []
+    for spec in specs:
+        name, _, values = spec.partition("=")
+        axes.append([(name, ast.literal_eval(v)) for v in values.split(",")])
+    return [dict(combo) for combo in itertools.product(*axes)]
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch-simulate waves to balance difficulty settings")
+    parser.add_argument("--runs", type=int, default=32, help="games per settings combination")
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=V1,V2",
+                        help="settings values to sweep (repeatable)")
+    parser.add_argument("--dt", type=float, default=None, help="fixed timestep in seconds (default SIM_DT)")
+    parser.add_argument("--max-seconds", type=float, default=900, help="simulated time limit per game")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--seed", type=int, default=0, help="first seed")
+    parser.add_argument("--out", default="balance_results", help="output directory")
+    args = parser.parse_args()
+
+    configs = parse_overrides(args.set)
+    # Reject bad names here rather than in every worker
+    for name in configs[0]:
+        try:
+            check_setting(name)
+        except ValueError as error:
+            parser.error(str(error))
+    jobs = [
+        (config_id, overrides, args.seed + run, args.dt, args.max_seconds)
+        for config_id, overrides in enumerate(configs)
+        for run in range(args.runs)
+    ]
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        results = executor.map(run_game, jobs, chunksize=max(1, len(jobs) // (args.workers * 4)))
+        rows = [row for game_rows in results for row in game_rows]
+    elapsed = time.perf_counter() - start
+
+    os.makedirs(args.out, exist_ok=True)
+    write_csv(os.path.join(args.out, "waves.csv"), WAVE_FIELDS, rows)
+    write_csv(os.path.join(args.out, "summary.csv"), SUMMARY_FIELDS, summarize(rows))
+    print(f"{len(jobs)} games on {args.workers} workers in {elapsed:.1f}s "
+          f"({len(jobs) / elapsed:.1f} games/s), results in {args.out}/")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Auto-aim benchmarks registered with the benchmark suite
+
+kill_angles traces every ricochet angle at once; auto_aim_per_angle
+traces one laser path per angle. Shay stands SHAY_OFFSET to the right of
+the player, inside the scene's clear area, so the beam always reaches
+Shay and ricochets into the crowd.
+
+Setup checks that kill_angles agrees with firing the real Laser at every
+angle, with the stock settings and under CHECK_OVERRIDES.
+
+Run with: python -m benchmarks.suite --filter auto_aim
+"""
+import numpy as np
+import settings
+from settings import *
+from balance import apply_settings_overrides
+from benchmarks.registry import register
+from auto_aim import kill_angles
+from laser_path import solve_laser_path, stop_at_enemies, trace_to_target
+
+SHAY_OFFSET = 100
+# Settings overrides (as with balance.py --set) under which the solver must still agree with Laser.fire
+CHECK_OVERRIDES = {"VULNERABLE_ARC_SIZE": 360, "RICOCHET_ANGLE_INCREMENT": 10,
+                   "LASER_MAX_BOUNCES": 2, "LASER_MAX_LENGTH": 900}
+
+def aim_positions(scene):
+    player = scene.game.player.pos
+    return player, (player[0] + SHAY_OFFSET, player[1])
+
+def per_angle_kill_angles(player, shay, walls, enemies):
+    """Reference: trace the shot of every ricochet angle one at a time"""
+    to_shay = stop_at_enemies(trace_to_target(player, shay, walls), enemies)
+    if to_shay.normals[-1] is not None:
+        return []  # Blocked on the way to Shay
+    kills = []
+    for angle in range(0, 360, RICOCHET_ANGLE_INCREMENT):
+        heading = np.arctan2(player[1] - shay[1], player[0] - shay[0]) + np.radians(angle)
+        path = solve_laser_path(shay, (np.cos(heading), np.sin(heading)), walls, enemies,
+                                LASER_MAX_BOUNCES, LASER_MAX_LENGTH)
+        if path.enemy_index is not None and path.vulnerable:
+            kills.append(float(angle))
+    return kills
+
+def laser_fire_kill_angles(game, player, shay):
+    """Every ricochet angle at which firing the game's Laser returns an enemy to destroy"""
+    kills = []
+    game.shay.pos = shay
+    # Read through the settings module, which balance overrides patch
+    for angle in range(0, 360, settings.RICOCHET_ANGLE_INCREMENT):
+        game.shay.ricochet_angle = angle
+        if game.laser.fire(player, shay, game.shay, game.wall_index, game.enemy_spawner.pool) is not None:
+            kills.append(float(angle))
+    return kills
+
+def check_against_laser_fire(game, player, shay, overrides):
+    """Assert that kill_angles finds exactly the angles Laser.fire kills with, under settings overrides"""
+    apply_settings_overrides(overrides)
+    try:
+        kills = sorted(solution.angle for solution in
+                       kill_angles(player, shay, game.wall_index, game.enemy_spawner.pool))
+        assert kills == laser_fire_kill_angles(game, player, shay), \
+            f"kill_angles and Laser.fire disagree with overrides {overrides}"
+    finally:
+        apply_settings_overrides({})
+
+@register("auto_aim")
+def auto_aim(scene):
+    """kill_angles from the player through Shay, checked against Laser.fire"""
+    player, shay = aim_positions(scene)
+    walls = scene.game.wall_index
+    enemies = scene.game.enemy_spawner.pool
+    check_against_laser_fire(scene.game, player, shay, {})
+    check_against_laser_fire(scene.game, player, shay, CHECK_OVERRIDES)
+    return lambda: kill_angles(player, shay, walls, enemies)
+
+@register("auto_aim_per_angle")
+def auto_aim_per_angle(scene):
+    """Reference: one solve_laser_path per ricochet angle"""
+    player, shay = aim_positions(scene)
+    walls = scene.game.wall_index
+    enemies = scene.game.enemy_spawner.pool
+    return lambda: per_angle_kill_angles(player, shay, walls, enemies)
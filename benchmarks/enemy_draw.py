@@ -0,0 +1,43 @@
+"""Enemy drawing benchmarks registered with the benchmark suite
+
+enemy_draw blits every enemy's cached sprite in one Surface.blits batch;
+enemy_draw_per_enemy draws a rect and a rotated arrow polygon per enemy,
+the way enemies were drawn before the sprite cache.
+
+Run with: python -m benchmarks.suite --filter enemy_draw
+"""
+import math
+import pygame
+from settings import *
+from benchmarks.registry import register
+
+def per_enemy_draw(spawner, surface):
+    """Reference: a rect and an arrow polygon per enemy, the arrow rotated with cos/sin"""
+    dirty = []
+    for enemy in spawner.enemies:
+        rect = enemy.rect
+        dirty.append(pygame.draw.rect(surface, enemy.color, rect))
+        points = []
+        for offset, reach in ((0, 0.5), (-140, 0.3), (140, 0.3)):
+            radians = math.radians(enemy.movement_angle + offset)
+            points.append((rect.centerx + math.cos(radians) * ENEMY_SIZE * reach,
+                           rect.centery + math.sin(radians) * ENEMY_SIZE * reach))
+        dirty.append(pygame.draw.polygon(surface, (255, 255, 255), points))
+    return dirty
+
+@register("enemy_draw")
+def enemy_draw(scene):
+    """EnemySpawner._draw_enemies, checked to cover the same rects as the per-enemy reference"""
+    spawner = scene.game.enemy_spawner
+    surface = scene.game.screen
+    # Also fills the sprite cache outside the timing
+    assert spawner._draw_enemies(surface) == per_enemy_draw(spawner, surface)[::2], \
+        "batched and per-enemy enemy rects differ"
+    return lambda: spawner._draw_enemies(surface)
+
+@register("enemy_draw_per_enemy")
+def enemy_draw_per_enemy(scene):
+    """Reference: per-enemy draw.rect and draw.polygon"""
+    spawner = scene.game.enemy_spawner
+    surface = scene.game.screen
+    return lambda: per_enemy_draw(spawner, surface)
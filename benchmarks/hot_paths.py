@@ -0,0 +1,199 @@
+"""Gameplay hot paths registered with the benchmark suite
+
+Ray and laser benchmarks time a batch of SHOTS random shots per call; the
+rest time a single call. Benchmarks that move or hit enemies reset them
+first, so every call does the same work.
+"""
+import pygame
+from settings import *
+from benchmarks.registry import register
+from aim_preview import AimPreview
+from game_input import KeyState, idle_input
+from laser_path import solve_laser_path
+from level import compile_level
+from ray_batch import raycast_many
+from simulation import Simulation
+from utils import raycast
+
+# Simulated seconds of a new game per simulation call: the first wave
+# transition, spawning and play until an idle player is overrun
+SIMULATION_SECONDS = 15
+
+@register("raycast")
+def raycast_shots(scene):
+    walls = scene.game.wall_index
+
+    def operation():
+        for origin, direction in scene.shots:
+            raycast(origin, direction, walls)
+    return operation
+
+@register("raycast_many")
+def raycast_batch(scene):
+    walls = scene.game.wall_index
+    origins = [origin for origin, _ in scene.shots]
+    directions = [direction for _, direction in scene.shots]
+    return lambda: raycast_many(origins, directions, walls)
+
+def shot_segments(scene):
+    """Laser segments from each shot origin to the first wall along its direction"""
+    return [
+        (origin, raycast(origin, direction, scene.game.wall_index)[0])
+        for origin, direction in scene.shots
+    ]
+
+@register("laser_enemy_hits")
+def laser_enemy_hits(scene):
+    """EnemyPool.segment_hit on ricochet segments ending at the first wall"""
+    enemies = scene.game.enemy_spawner.pool
+    segments = shot_segments(scene)
+
+    def operation():
+        for origin, end in segments:
+            enemies.segment_hit(origin, end)
+    return operation
+
+@register("laser_fire")
+def laser_fire(scene):
+    """Full Laser.fire from the player to Shay placed at each shot origin"""
+    game = scene.game
+
+    def operation():
+        scene.reset_enemies()
+        for origin, _ in scene.shots:
+            game.shay.pos = origin
+            game.laser.fire(game.player.pos, origin, game.shay, game.wall_index,
+                            game.enemy_spawner.pool)
+    return operation
+
+@register("laser_path")
+def laser_path(scene):
+    """solve_laser_path with 16 wall bounces from each shot, stopping at enemies"""
+    walls = scene.game.wall_index
+    enemies = scene.game.enemy_spawner.pool
+
+    def operation():
+        for origin, direction in scene.shots:
+            solve_laser_path(origin, direction, walls, enemies, max_bounces=16)
+    return operation
+
+@register("aim_preview")
+def aim_preview(scene):
+    """AimPreview.path for a held aim while the enemies move: walls cached, enemies re-tested"""
+    game = scene.game
+    preview = AimPreview()
+    enemies = game.enemy_spawner.pool
+
+    def operation():
+        enemies.version += 1
+        preview.path(game.player.pos, game.shay, game.wall_index, game.level_version, enemies)
+    return operation
+
+@register("wall_collides")
+def wall_collides(scene):
+    """WallIndex.collides for a player-sized rect at each shot origin"""
+    walls = scene.game.wall_index
+    rects = [pygame.Rect(0, 0, PLAYER_SIZE, PLAYER_SIZE) for _ in scene.shots]
+    for rect, (origin, _) in zip(rects, scene.shots):
+        rect.center = origin
+
+    def operation():
+        for rect in rects:
+            walls.collides(rect)
+    return operation
+
+@register("wall_sweep")
+def wall_sweep(scene):
+    """WallIndex.sweep of a player-sized rect along each shot for one frame at full speed"""
+    walls = scene.game.wall_index
+    step = PLAYER_MAX_VELOCITY * SIM_DT
+    moves = [
+        ((origin[0] - PLAYER_SIZE / 2, origin[1] - PLAYER_SIZE / 2, PLAYER_SIZE, PLAYER_SIZE),
+         direction[0] * step, direction[1] * step)
+        for origin, direction in scene.shots
+    ]
+
+    def operation():
+        for rect, dx, dy in moves:
+            walls.sweep(rect, dx, dy)
+    return operation
+
+@register("enemy_update")
+def enemy_update(scene):
+    spawner = scene.game.enemy_spawner
+    player = scene.game.player
+
+    def operation():
+        scene.reset_enemies()
+        spawner.update(SIM_DT, player.pos, player.rect, False)
+    return operation
+
+@register("flow_field_update")
+def flow_field_update(scene):
+    """Full FlowField recompute, as when the player enters a new cell"""
+    flow_field = scene.game.enemy_spawner.flow_field
+    targets = [origin for origin, _ in scene.shots]
+
+    def operation():
+        flow_field.target_cell = None
+        flow_field.update(targets[flow_field.recomputes % len(targets)])
+    return operation
+
+@register("spawn_sample")
+def spawn_sample(scene):
+    """SpawnSampler.sample with the player at each shot origin"""
+    spawner = scene.game.enemy_spawner
+    players = [origin for origin, _ in scene.shots]
+
+    def operation():
+        for player_pos in players:
+            spawner.spawn_sampler.sample(spawner.rng, player_pos)
+    return operation
+
+@register("player_move")
+def player_move(scene):
+    """Player.move diagonally from the start position, so every call does the same work"""
+    player = scene.game.player
+    start = player.pos
+    keys = KeyState({pygame.K_s, pygame.K_d})
+
+    def operation():
+        player.pos = start
+        player.rect.center = start
+        player.current_velocity = [PLAYER_MAX_VELOCITY, PLAYER_MAX_VELOCITY]
+        player.move(SIM_DT, keys)
+    return operation
+
+@register("game_update")
+def game_update(scene):
+    game = scene.game
+    frame_input = idle_input(game.shay.pos)
+
+    def operation():
+        scene.reset_enemies()
+        game.update(SIM_DT, frame_input)
+    return operation
+
+@register("simulation")
+def simulation(scene):
+    """Headless throughput: SIMULATION_SECONDS of a new, idle game on the scene's walls
+
+    Every call starts from the same seed, so it replays the same game.
+    Simulated seconds per wall-clock second = SIMULATION_SECONDS * 1e6 / us.
+    """
+    level = compile_level(scene.spec)
+
+    def operation():
+        Simulation.headless(seed=0, level=level).run(SIMULATION_SECONDS)
+    return operation
+
+@register("game_draw")
+def game_draw(scene):
+    """Full-screen frame: background, walls and everything on top"""
+    game = scene.game
+
+    def operation():
+        game.screen.fill(BG_COLOR)
+        game.draw_static(game.screen)
+        game.draw()
+    return operation
@@ -0,0 +1,51 @@
+"""Laser segment vs enemy hit test reference registered with the benchmark suite
+
+laser_enemy_hits (benchmarks.hot_paths) tests every enemy in one NumPy
+pass; laser_enemy_hits_loop slab-tests the same segments against each
+enemy in turn.
+
+Run with: python -m benchmarks.suite --filter laser_enemy_hits
+"""
+import math
+from benchmarks.registry import register
+from benchmarks.hot_paths import shot_segments
+from enemy_pool import ENEMY_STATE_DYING, hit_half_extent
+
+def loop_segment_hit(pool, start, end):
+    """Reference: slab test the segment against each live enemy's hit box in turn, keeping the nearest"""
+    nearest, nearest_t = None, math.inf
+    delta = (end[0] - start[0], end[1] - start[1])
+    half = hit_half_extent()
+    for i in range(pool.count):
+        if pool.state[i] == ENEMY_STATE_DYING:
+            continue
+        t_near, t_far = -math.inf, math.inf
+        for axis in range(2):
+            low = pool.pos[i, axis] - half
+            high = pool.pos[i, axis] + half
+            if delta[axis] == 0:
+                if not low <= start[axis] <= high:
+                    t_near = math.inf
+                continue
+            t1 = (low - start[axis]) / delta[axis]
+            t2 = (high - start[axis]) / delta[axis]
+            t_near = max(t_near, min(t1, t2))
+            t_far = min(t_far, max(t1, t2))
+        if t_near <= t_far and t_far >= 0 and t_near <= 1 and max(t_near, 0) < nearest_t:
+            nearest, nearest_t = i, max(t_near, 0)
+    return nearest
+
+@register("laser_enemy_hits_loop")
+def laser_enemy_hits_loop(scene):
+    """Reference: per-enemy loop over the laser_enemy_hits segments, checked against segment_hit"""
+    pool = scene.game.enemy_spawner.pool
+    segments = shot_segments(scene)
+    for start, end in segments:
+        hit = pool.segment_hit(start, end)
+        assert (None if hit is None else hit.index) == loop_segment_hit(pool, start, end), \
+            "segment_hit and the per-enemy loop disagree"
+
+    def operation():
+        for start, end in segments:
+            loop_segment_hit(pool, start, end)
+    return operation
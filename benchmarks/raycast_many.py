@@ -0,0 +1,48 @@
+"""Batched raycast_many against a scalar cast_ray loop, registered with the benchmark suite
+
+Both cast the same RAY_COUNT random rays against the scene's walls as a
+plain list of rects (no WallIndex), so the batch packs and tests every
+wall just as the loop does. The raycast and raycast_many benchmarks in
+benchmarks.hot_paths time the scene's shots through the wall index instead.
+
+Run with: python -m benchmarks.suite --filter raycast_many
+"""
+import math
+import random
+import numpy as np
+from settings import *
+from benchmarks.registry import register
+from ray_batch import raycast_many
+from utils import cast_ray
+
+RAY_COUNT = 1000
+
+def scene_rays(scene):
+    """The scene's walls as a list and RAY_COUNT rays from random points in the arena"""
+    rng = random.Random(0)
+    origins = [(rng.uniform(0, WIDTH), rng.uniform(0, HEIGHT)) for _ in range(RAY_COUNT)]
+    angles = [rng.uniform(0, 2 * math.pi) for _ in range(RAY_COUNT)]
+    directions = [(math.cos(a), math.sin(a)) for a in angles]
+    return list(scene.game.wall_index.walls), origins, directions
+
+@register("raycast_many_1k")
+def raycast_many_1k(scene):
+    """RAY_COUNT rays in one batch, checked against the scalar loop"""
+    walls, origins, directions = scene_rays(scene)
+    batch = raycast_many(origins, directions, walls)
+    for i, (origin, direction) in enumerate(zip(origins, directions)):
+        hit = cast_ray(origin, direction, walls)
+        assert batch.wall_indices[i] == (walls.index(hit.wall) if hit.wall is not None else -1), \
+            f"ray {i}: raycast_many and cast_ray hit different walls"
+        assert np.isclose(batch.distances[i], hit.distance), f"ray {i}: distance mismatch"
+    return lambda: raycast_many(origins, directions, walls)
+
+@register("raycast_many_1k_loop")
+def raycast_many_1k_loop(scene):
+    """Reference: the same rays through cast_ray one at a time"""
+    walls, origins, directions = scene_rays(scene)
+
+    def operation():
+        for origin, direction in zip(origins, directions):
+            cast_ray(origin, direction, walls)
+    return operation
@@ -0,0 +1,15 @@
+"""Registry of benchmarks run by benchmarks.suite
+
+Each benchmark takes a benchmarks.scenes.Scene and returns the operation to
+time. Register one with the decorator from any module the suite imports.
+"""
+
+# Benchmark name -> function(scene) returning the callable to time
+BENCHMARKS = {}
+
+def register(name):
+    """Decorator adding a benchmark to the suite"""
+    def decorator(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return decorator
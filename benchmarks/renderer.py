@@ -0,0 +1,27 @@
+"""Full and dirty-rect renderers registered with the benchmark suite
+
+Both renderers present the same scene to the display (the dummy video
+driver when run headless), so render_full against render_dirty shows what
+redrawing only the changed areas saves per frame.
+
+Run with: python -m benchmarks.suite --filter render_
+"""
+import pygame
+from benchmarks.registry import register
+from renderer import RENDERERS
+
+def renderer_frame(scene, mode):
+    """One presented frame of a renderer, drawing the scene's game on the display surface"""
+    game = scene.game
+    game.screen = pygame.display.set_mode(game.screen.get_size())
+    renderer = RENDERERS[mode](game.screen, game)
+    renderer.render()  # The dirty renderer builds its static layer on the first frame
+    return renderer.render
+
+@register("render_full")
+def render_full(scene):
+    return renderer_frame(scene, "full")
+
+@register("render_dirty")
+def render_dirty(scene):
+    return renderer_frame(scene, "dirty")
@@ -0,0 +1,84 @@
+"""Synthetic headless scenes for the benchmark suite
+
+A scene is a Game in the playing state on the stock level with extra
+random walls, plus extra enemies, a permanently invulnerable player and an
+offscreen surface to draw on.
+"""
+import math
+import random
+import pygame
+from settings import *
+from game import Game
+from level import compile_level, read_spec
+
+# Scene name -> (walls, enemies); 'stock' matches the shipped level and a late wave
+SCENES = {
+    "stock": (7, 17),
+    "medium": (100, 200),
+    "large": (1000, 2000),
+    "huge": (3000, 10000),
+}
+# Player and Shay start positions are kept clear of extra walls and enemies
+CLEAR_RADIUS = 150
+# Random shots (rays, laser segments) prepared per scene
+SHOTS = 100
+# Per-enemy pool arrays that gameplay changes while enemies live
+ENEMY_ARRAYS = ("pos", "movement_angle", "vulnerable_angle", "state", "death_timer")
+
+class Scene:
+    """A Game populated for benchmarking, plus pre-generated random shots"""
+    def __init__(self, name, seed=0):
+        self.name = name
+        self.wall_count, self.enemy_count = SCENES[name]
+        self.rng = random.Random(seed)
+        self.spec = read_spec(DEFAULT_LEVEL)
+        self.walls = [pygame.Rect(wall) for wall in self.spec["walls"]]
+        self.starts = (self.spec["player_start"], self.spec["shay_start"])
+        self._add_walls()
+        self.game = Game(pygame.Surface((WIDTH, HEIGHT)), seed, compile_level(self.spec))
+        self._add_enemies()
+        pool = self.game.enemy_spawner.pool
+        self.enemy_start = {name: getattr(pool, name)[:pool.count].copy() for name in ENEMY_ARRAYS}
+        self.shots = [(self._free_point(2), self._direction()) for _ in range(SHOTS)]
+
+    def _add_walls(self):
+        while len(self.walls) < self.wall_count:
+            rect = pygame.Rect(0, 0, self.rng.randint(4, 16), self.rng.randint(4, 16))
+            rect.center = self._free_point(0)
+            self.walls.append(rect)
+        self.spec["walls"] = [tuple(wall) for wall in self.walls]
+
+    def _add_enemies(self):
+        # Play the first wave with no further spawning and a player that can't die
+        game = self.game
+        spawner = game.enemy_spawner
+        spawner.start_wave()
+        spawner.wave_enemies_left = 0
+        game.game_state = GAME_STATE_PLAYING
+        game.player.invulnerability_duration = float("inf")
+        game.player.make_invulnerable()
+        # Only the enemy centers are kept out of walls: the huge scene has too few
+        # wall-free spots of a whole enemy's size
+        for _ in range(self.enemy_count):
+            spawner._add_enemy(self._free_point(2))
+
+    def reset_enemies(self):
+        """Put every enemy back where and how it started, so repeated calls time the same work"""
+        pool = self.game.enemy_spawner.pool
+        for name, start in self.enemy_start.items():
+            getattr(pool, name)[:pool.count] = start
+
+    def _free_point(self, size):
+        """Random point in the arena away from the player and Shay starts, not inside a wall"""
+        rect = pygame.Rect(0, 0, size, size)
+        while True:
+            point = (self.rng.uniform(30, WIDTH - 30), self.rng.uniform(30, HEIGHT - 30))
+            if any(math.dist(point, pos) < CLEAR_RADIUS for pos in self.starts):
+                continue
+            rect.center = point
+            if not size or rect.collidelist(self.walls) < 0:
+                return point
+
+    def _direction(self):
+        angle = self.rng.uniform(0, 2 * math.pi)
+        return (math.cos(angle), math.sin(angle))
@@ -0,0 +1,44 @@
+"""Enemy crowd separation benchmarks registered with the benchmark suite
+
+separation_offsets (all pairs for small crowds, grid-binned neighbours for
+larger ones) against a plain all-pairs reference, on the scene's enemies.
+
+Run with: python -m benchmarks.suite --filter separation
+"""
+import numpy as np
+from settings import *
+from benchmarks.registry import register
+from enemy_pool import separation_distance, separation_offsets
+
+# Rows of the reference's distance matrix computed at once, bounding its memory
+REFERENCE_CHUNK = 500
+
+def pairwise_offsets(positions):
+    """Reference separation over every pair (O(n^2)); stacked pairs are left alone"""
+    min_distance, strength = separation_distance(), ENEMY_SEPARATION_STRENGTH
+    offsets = np.zeros_like(positions)
+    for start in range(0, len(positions), REFERENCE_CHUNK):
+        delta = positions[start:start + REFERENCE_CHUNK, None, :] - positions[None, :, :]
+        dist = np.hypot(delta[..., 0], delta[..., 1])
+        push = np.where((dist < min_distance) & (dist > 0),
+                        (min_distance - dist) * strength / 2 / np.maximum(dist, 1e-9), 0)
+        offsets[start:start + REFERENCE_CHUNK] = (delta * push[..., None]).sum(axis=1)
+    return offsets
+
+def enemy_positions(scene):
+    pool = scene.game.enemy_spawner.pool
+    return pool.pos[:pool.count].copy()
+
+@register("separation")
+def separation(scene):
+    """separation_offsets for the scene's enemies, checked against the all-pairs reference"""
+    positions = enemy_positions(scene)
+    assert np.allclose(separation_offsets(positions), pairwise_offsets(positions)), \
+        "separation_offsets and the all-pairs reference differ"
+    return lambda: separation_offsets(positions)
+
+@register("separation_all_pairs")
+def separation_all_pairs(scene):
+    """Reference: the all-pairs separation_offsets is compared against"""
+    positions = enemy_positions(scene)
+    return lambda: pairwise_offsets(positions)
@@ -0,0 +1,128 @@
+"""Benchmark suite for the gameplay hot paths
+
+Each registered benchmark (see benchmarks.registry) takes a Scene and
+returns the operation to time. Every benchmark runs on every selected
+scene size; results can be saved as JSON and compared against an earlier
+run.
+
+Run everything:       python -m benchmarks.suite --save results.json
+Compare with a run:   python -m benchmarks.suite --compare results.json --threshold 0.1
+"""
+import argparse
+import importlib
+import json
+import platform
+import statistics
+import sys
+import time
+import pygame
+from benchmarks.registry import BENCHMARKS
+from benchmarks.scenes import SCENES, Scene
+
+# Importing these modules registers their benchmarks
+BENCHMARK_MODULES = [
+    "benchmarks.hot_paths",
+    "benchmarks.separation",
+    "benchmarks.laser_hits",
+    "benchmarks.auto_aim",
+    "benchmarks.enemy_draw",
+    "benchmarks.renderer",
+    "benchmarks.raycast_many",
+]
+for module in BENCHMARK_MODULES:
+    importlib.import_module(module)
+
+# Each repeat runs the operation at least this long
+MIN_REPEAT_SECONDS = 0.05
+
+def time_benchmark(setup, scene_name, repeat):
+    """Time one benchmark on a fresh scene, returning per-call stats in microseconds"""
+    operation = setup(Scene(scene_name))
+
+    # Calibrate the call count so each repeat runs at least MIN_REPEAT_SECONDS
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            operation()
+        if time.perf_counter() - start >= MIN_REPEAT_SECONDS:
+            break
+        number *= 2
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            operation()
+        timings.append((time.perf_counter() - start) / number * 1e6)
+    return {
+        "number": number,
+        "min_us": round(min(timings), 3),
+        "median_us": round(statistics.median(timings), 3),
+    }
+
+def run(names, scene_names, repeat):
+    results = {}
+    for scene_name in scene_names:
+        walls, enemies = SCENES[scene_name]
+        for name in names:
+            entry = time_benchmark(BENCHMARKS[name], scene_name, repeat)
+            entry.update(walls=walls, enemies=enemies)
+            key = f"{name}/{scene_name}"
+            results[key] = entry
+            print(f"{key:<28} {entry['median_us']:>12.1f} us  (min {entry['min_us']:.1f}, n={entry['number']})")
+    return results
+
+def compare(results, baseline, threshold):
+    """Print the change against a baseline run and return the regressed keys"""
+    regressions = []
+    print(f"\n{'benchmark':<28} {'baseline us':>12} {'now us':>12} {'change':>8}")
+    for key, entry in results.items():
+        if key not in baseline:
+            continue
+        before = baseline[key]["median_us"]
+        change = entry["median_us"] / before - 1
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(key)
+        print(f"{key:<28} {before:>12.1f} {entry['median_us']:>12.1f} {change:>+7.1%}{flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the gameplay hot paths on synthetic scenes")
+    parser.add_argument("--scenes", default=",".join(SCENES), help="comma-separated scene sizes to run")
+    parser.add_argument("--filter", default="", help="only run benchmarks whose name contains this")
+    parser.add_argument("--repeat", type=int, default=5, help="timed repeats per benchmark (median reported)")
+    parser.add_argument("--save", metavar="PATH", help="write results as JSON")
+    parser.add_argument("--compare", metavar="PATH", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="relative slowdown counted as a regression (0.1 = 10%%)")
+    args = parser.parse_args()
+
+    pygame.init()
+    names = [name for name in BENCHMARKS if args.filter in name]
+    results = run(names, args.scenes.split(","), args.repeat)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({
+                "meta": {
+                    "python": platform.python_version(),
+                    "pygame": pygame.version.ver,
+                    "machine": platform.machine(),
+                    "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                },
+                "results": results,
+            }, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
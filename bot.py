@@ -0,0 +1,105 @@
+import pygame
+from settings import *
+from game_input import FrameInput, KeyState
+from utils import distance, normalize_vector, vector_to_angle
+from auto_aim import kill_angles
+
+# How far behind and to the side of its target the bot parks Shay
+AIM_BEHIND_DISTANCE = 120
+AIM_SIDE_DISTANCE = 80
+# Enemies closer than this make the bot back off instead of aiming
+DANGER_DISTANCE = 130
+
+class ScriptedBot:
+    """Deterministic bot that plays the game through FrameInputs
+
+    It backs away from nearby enemies, otherwise it parks Shay behind and to
+    the side of the nearest enemy and dials in the ricochet angle with Q/E.
+    It turns toward the best angle the auto-aim solver finds for a kill (or
+    the one aiming straight at the nearest enemy when there is none) and taps
+    SPACE as soon as the current angle kills.
+    """
+    def __init__(self):
+        self.space_held = False
+
+    def __call__(self, game):
+        player_pos = game.player.pos
+        enemies = [e for e in game.enemy_spawner.enemies if e.state == e.STATE_MOVING]
+        if game.game_state != GAME_STATE_PLAYING or not enemies:
+            return self._input(set(), game.shay.pos)
+
+        target = min(enemies, key=lambda e: distance(e.pos, player_pos))
+        if distance(target.pos, player_pos) < DANGER_DISTANCE:
+            return self._input(self._flee_keys(player_pos, enemies), game.shay.pos)
+
+        aim_point = self._aim_point(player_pos, target.pos)
+        solutions = kill_angles(player_pos, game.shay.pos, game.wall_index, game.enemy_spawner.pool)
+        if game.player.can_fire and any(s.angle == game.shay.ricochet_angle for s in solutions):
+            return self._input(set(), aim_point, fire=True)
+
+        # Rotate the ricochet angle toward the best kill, or one that sends the beam into the target
+        if solutions:
+            needed = solutions[0].angle
+        else:
+            needed = self._needed_ricochet_angle(player_pos, game.shay.pos, target.pos)
+        keys = set()
+        offset = (needed - game.shay.ricochet_angle + 180) % 360 - 180
+        if offset >= RICOCHET_ANGLE_INCREMENT:
+            keys.add(pygame.K_e)
+        elif offset <= -RICOCHET_ANGLE_INCREMENT:
+            keys.add(pygame.K_q)
+        return self._input(keys, aim_point)
+
+    def _input(self, keys, mouse_pos, fire=False):
+        """Build a FrameInput, pressing SPACE one step and releasing it the next"""
+        pressed = fire and not self.space_held
+        released = self.space_held
+        self.space_held = pressed
+        return FrameInput(KeyState(keys), mouse_pos, pressed, released)
+
+    def _flee_keys(self, player_pos, enemies):
+        """WASD keys moving away from nearby enemies, with a pull back to the arena centre"""
+        push_x = (WIDTH / 2 - player_pos[0]) / WIDTH
+        push_y = (HEIGHT / 2 - player_pos[1]) / HEIGHT
+        for enemy in enemies:
+            dist = distance(enemy.pos, player_pos)
+            if 0 < dist < DANGER_DISTANCE * 2:
+                push_x += (player_pos[0] - enemy.pos[0]) / (dist * dist) * DANGER_DISTANCE
+                push_y += (player_pos[1] - enemy.pos[1]) / (dist * dist) * DANGER_DISTANCE
+
+        keys = set()
+        push_x, push_y = normalize_vector((push_x, push_y))
+        if push_x > 0.3:
+            keys.add(pygame.K_d)
+        elif push_x < -0.3:
+            keys.add(pygame.K_a)
+        if push_y > 0.3:
+            keys.add(pygame.K_s)
+        elif push_y < -0.3:
+            keys.add(pygame.K_w)
+        return keys
+
+    def _aim_point(self, player_pos, target_pos):
+        """Point behind the target (seen from the player) and off to the side, inside the arena"""
+        back = normalize_vector((target_pos[0] - player_pos[0], target_pos[1] - player_pos[1]))
+        side = (-back[1], back[0])
+        best = None
+        for sign in (1, -1):
+            point = (
+                target_pos[0] + back[0] * AIM_BEHIND_DISTANCE + side[0] * AIM_SIDE_DISTANCE * sign,
+                target_pos[1] + back[1] * AIM_BEHIND_DISTANCE + side[1] * AIM_SIDE_DISTANCE * sign
+            )
+            margin = min(point[0], WIDTH - point[0], point[1], HEIGHT - point[1])
+            if best is None or margin > best[0]:
+                best = (margin, point)
+
+        # Clamp inside the outer walls
+        point = best[1]
+        return (min(WIDTH - 40, max(40, point[0])), min(HEIGHT - 40, max(40, point[1])))
+
+    def _needed_ricochet_angle(self, player_pos, shay_pos, target_pos):
+        """Ricochet angle that turns the beam reflected back at the player toward the target"""
+        back_to_player = vector_to_angle((player_pos[0] - shay_pos[0], player_pos[1] - shay_pos[1]))
+        to_target = vector_to_angle((target_pos[0] - shay_pos[0], target_pos[1] - shay_pos[1]))
+        needed = (to_target - back_to_player) % 360
+        return round(needed / RICOCHET_ANGLE_INCREMENT) * RICOCHET_ANGLE_INCREMENT % 360
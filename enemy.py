@@ -1,57 +1,71 @@
 import pygame
 import math
-import random
+import numpy as np
 from settings import *
-from utils import normalize_vector, vector_to_angle, vector_from_angle
+from utils import vector_from_angle
+from text import draw_text
+from sprites import death_fade, enemy_angle_buckets, enemy_body
+from spatial_grid import SpatialHash
+from enemy_pool import EnemyPool, ENEMY_STATE_IDLE, ENEMY_STATE_MOVING, ENEMY_STATE_DYING
 
 class Enemy:
-    def __init__(self, pos, speed, wave_num):
-        self.pos = pos
-        self.speed = speed
-        self.wave_num = wave_num
-        self.rect = pygame.Rect(0, 0, ENEMY_SIZE, ENEMY_SIZE)
-        self.rect.center = self.pos
-        self.color = ENEMY_COLORS[min(wave_num - 1, len(ENEMY_COLORS) - 1)]
-        
-        # Set random vulnerable angle (the back of the enemy)
-        self.movement_angle = random.uniform(0, 360)
-        self.vulnerable_angle = (self.movement_angle + 180) % 360
-        
-        # State management
-        self.STATE_IDLE = 0
-        self.STATE_MOVING = 1
-        self.STATE_DYING = 2
-        self.state = self.STATE_MOVING
-        self.death_timer = 0
-        self.death_duration = 0.5  # seconds
+    """Thin view of one enemy stored in an EnemyPool
     
-    def update(self, dt, player_pos):
-        if self.state == self.STATE_DYING:
-            self.death_timer += dt
-            if self.death_timer >= self.death_duration:
-                return True  # Enemy should be removed
-            return False
-            
-        if self.state == self.STATE_IDLE:
-            return False
-            
-        # Calculate direction to player
-        direction = (player_pos[0] - self.pos[0], player_pos[1] - self.pos[1])
-        direction = normalize_vector(direction)
-        
-        # Update movement angle
-        self.movement_angle = vector_to_angle(direction)
-        self.vulnerable_angle = (self.movement_angle + 180) % 360
-        
-        # Move towards player
-        self.pos = (
-            self.pos[0] + direction[0] * self.speed * dt,
-            self.pos[1] + direction[1] * self.speed * dt
-        )
-        self.rect.center = self.pos
-        
-        # Check if collided with player
-        return False
+    All state lives in the pool arrays; index is the enemy's current row
+    (-1 once it has been removed).
+    """
+    __slots__ = ("pool", "index")
+    
+    STATE_IDLE = ENEMY_STATE_IDLE
+    STATE_MOVING = ENEMY_STATE_MOVING
+    STATE_DYING = ENEMY_STATE_DYING
+    
+    def __init__(self, pool, index):
+        self.pool = pool
+        self.index = index
+    
+    @property
+    def alive(self):
+        return self.index >= 0
+    
+    @property
+    def pos(self):
+        pos = self.pool.pos[self.index]
+        return (float(pos[0]), float(pos[1]))
+    
+    @property
+    def rect(self):
+        rect = pygame.Rect(0, 0, ENEMY_SIZE, ENEMY_SIZE)
+        rect.center = self.pos
+        return rect
+    
+    @property
+    def speed(self):
+        return float(self.pool.speed[self.index])
+    
+    @property
+    def wave_num(self):
+        return int(self.pool.wave_num[self.index])
+    
+    @property
+    def color(self):
+        return ENEMY_COLORS[min(self.wave_num - 1, len(ENEMY_COLORS) - 1)]
+    
+    @property
+    def movement_angle(self):
+        return float(self.pool.movement_angle[self.index])
+    
+    @property
+    def vulnerable_angle(self):
+        return float(self.pool.vulnerable_angle[self.index])
+    
+    @property
+    def state(self):
+        return int(self.pool.state[self.index])
+    
+    @property
+    def death_timer(self):
+        return float(self.pool.death_timer[self.index])
     
     def check_player_collision(self, player_rect, player_invulnerable=False):
         """Check if enemy has collided with the player"""
@@ -59,74 +73,27 @@ class Enemy:
     
     def hit(self):
         """Enemy is hit by laser from vulnerable direction"""
-        self.state = self.STATE_DYING
-        self.death_timer = 0
+        self.pool.hit(self.index)
         return True
-    
-    def draw(self, surface):
-        # Draw enemy with different appearance based on state
-        if self.state == self.STATE_DYING:
-            # Draw death animation (pulsing/fading)
-            alpha = int(255 * (1 - self.death_timer / self.death_duration))
-            size_mod = int(ENEMY_SIZE * (1 + self.death_timer / self.death_duration))
-            
-            # Create a surface with per-pixel alpha
-            s = pygame.Surface((size_mod, size_mod), pygame.SRCALPHA)
-            s.fill((self.color[0], self.color[1], self.color[2], alpha))
-            surface.blit(s, (self.pos[0] - size_mod // 2, self.pos[1] - size_mod // 2))
-        else:
-            # Draw regular enemy
-            pygame.draw.rect(surface, self.color, self.rect)
-            
-            # Draw arrow indicating direction
-            center = self.rect.center
-            front_point = (
-                center[0] + math.cos(math.radians(self.movement_angle)) * ENEMY_SIZE * 0.5,
-                center[1] + math.sin(math.radians(self.movement_angle)) * ENEMY_SIZE * 0.5
-            )
-            
-            left_point = (
-                center[0] + math.cos(math.radians(self.movement_angle - 140)) * ENEMY_SIZE * 0.3,
-                center[1] + math.sin(math.radians(self.movement_angle - 140)) * ENEMY_SIZE * 0.3
-            )
-            
-            right_point = (
-                center[0] + math.cos(math.radians(self.movement_angle + 140)) * ENEMY_SIZE * 0.3,
-                center[1] + math.sin(math.radians(self.movement_angle + 140)) * ENEMY_SIZE * 0.3
-            )
-            
-            pygame.draw.polygon(surface, (255, 255, 255), [front_point, left_point, right_point])
-        
-        # Debug - show vulnerable arc if debug is enabled
-        if DEBUG_MODE:
-            arc_center = self.rect.center
-            start_angle = (self.vulnerable_angle - VULNERABLE_ARC_SIZE / 2) % 360
-            end_angle = (self.vulnerable_angle + VULNERABLE_ARC_SIZE / 2) % 360
-            
-            # Draw vulnerable direction with a colored arc
-            pygame.draw.arc(
-                surface,
-                DEBUG_COLOR,
-                pygame.Rect(
-                    arc_center[0] - ENEMY_SIZE,
-                    arc_center[1] - ENEMY_SIZE,
-                    ENEMY_SIZE * 2,
-                    ENEMY_SIZE * 2
-                ),
-                math.radians(start_angle),
-                math.radians(end_angle),
-                3
-            )
 
 class EnemySpawner:
-    def __init__(self, walls):
-        self.walls = walls
+    def __init__(self, rng, spawn_sampler, flow_field):
+        self.spawn_sampler = spawn_sampler  # The level's valid spawn points
+        self.flow_field = flow_field
+        self.rng = rng  # The game's random.Random stream
         self.current_wave = 0
-        self.enemies = []
+        self.enemy_grid = SpatialHash(ENEMY_GRID_CELL_SIZE)
+        self.pool = EnemyPool(Enemy, self.enemy_grid)
         self.spawn_timer = 0
         self.wave_enemies_left = 0
         self.wave_transition_timer = 0
         self.in_wave_transition = True
+        self.laser_kills = 0
+    
+    @property
+    def enemies(self):
+        """Views of all live enemies"""
+        return self.pool.views
     
     def start_wave(self):
         """Start a new wave of enemies"""
@@ -189,95 +156,105 @@ class EnemySpawner:
             self.spawn_timer = 0
             self.wave_enemies_left -= 1
             
-        # Update all enemies
-        enemies_to_remove = []
+        # Move all enemies along the flow field, advance death timers and remove finished ones
+        self.flow_field.update(player_pos)
+        self.pool.update(dt, player_pos, self.flow_field)
         
-        for enemy in self.enemies:
-            should_remove = enemy.update(dt, player_pos)
-            
-            if should_remove:
-                enemies_to_remove.append(enemy)
-            elif enemy.check_player_collision(player_rect):
-                if not player_invulnerable:
-                    # Only register a hit if player is not invulnerable
+        # Only enemies bucketed near the player can collide with it
+        if not player_invulnerable:
+            for enemy in self.enemy_grid.query_rect(player_rect):
+                if enemy.check_player_collision(player_rect):
                     player_hit = True
-        
-        # Remove dead enemies
-        for enemy in enemies_to_remove:
-            if enemy in self.enemies:  # Ensure it's still in the list
-                self.enemies.remove(enemy)
+                    break
                 
         return (player_hit, wave_result)
     
     def spawn_enemy(self, player_pos):
-        """Spawn a new enemy at a random position away from the player"""
-        # Don't spawn too close to player
-        min_distance = 200
-        max_tries = 50
-        
-        for _ in range(max_tries):
-            # Pick a random position at the edge of the screen
-            side = random.randint(0, 3)
-            if side == 0:  # Top
-                pos = (random.randint(50, WIDTH - 50), 50)
-            elif side == 1:  # Right
-                pos = (WIDTH - 50, random.randint(50, HEIGHT - 50))
-            elif side == 2:  # Bottom
-                pos = (random.randint(50, WIDTH - 50), HEIGHT - 50)
-            else:  # Left
-                pos = (50, random.randint(50, HEIGHT - 50))
-                
-            # Check if position is far enough from player
-            dist = math.sqrt((pos[0] - player_pos[0])**2 + (pos[1] - player_pos[1])**2)
-            if dist >= min_distance:
-                # Check if position doesn't collide with walls
-                temp_rect = pygame.Rect(0, 0, ENEMY_SIZE, ENEMY_SIZE)
-                temp_rect.center = pos
-                
-                if not any(temp_rect.colliderect(wall) for wall in self.walls):
-                    # Valid position, create enemy
-                    enemy = Enemy(pos, self.enemy_speed, self.current_wave)
-                    self.enemies.append(enemy)
-                    return
-        
-        # If we couldn't find a valid position after max_tries, spawn anyway at a random edge
-        side = random.randint(0, 3)
-        if side == 0:
-            pos = (random.randint(50, WIDTH - 50), 50)
-        elif side == 1:
-            pos = (WIDTH - 50, random.randint(50, HEIGHT - 50))
-        elif side == 2:
-            pos = (random.randint(50, WIDTH - 50), HEIGHT - 50)
-        else:
-            pos = (50, random.randint(50, HEIGHT - 50))
-            
-        enemy = Enemy(pos, self.enemy_speed, self.current_wave)
-        self.enemies.append(enemy)
+        """Spawn a new enemy at a precomputed spawn point, away from the player"""
+        self._add_enemy(self.spawn_sampler.sample(self.rng, player_pos))
+    
+    def _add_enemy(self, pos):
+        """Create an enemy for the current wave, facing a random direction"""
+        # The vulnerable angle (the back of the enemy) follows from the movement angle
+        self.pool.spawn(pos, self.enemy_speed, self.current_wave, self.rng.uniform(0, 360))
+    
+    def clear_enemies(self):
+        """Remove all enemies from the current wave"""
+        self.pool.clear()
+    
+    def enemies_near(self, rect):
+        """Enemies bucketed in the cells overlapped by rect (broadphase candidates)"""
+        return self.enemy_grid.query_rect(rect)
     
     def handle_laser_hit(self, enemy):
         """Enemy was hit by laser"""
-        if enemy in self.enemies:
+        if enemy.alive:
             enemy.hit()
+            self.laser_kills += 1
             
     def handle_player_collision(self, enemy):
         """Enemy collided with player and should be destroyed"""
-        if enemy in self.enemies:
+        if enemy.alive:
             enemy.hit()
             
     def draw(self, surface):
-        """Draw all enemies"""
-        for enemy in self.enemies:
-            enemy.draw(surface)
+        """Draw all enemies and the wave countdown
+        
+        Returns:
+            list: rects of the screen areas drawn on
+        """
+        dirty = self._draw_enemies(surface)
+        if DEBUG_MODE:
+            dirty += self._draw_vulnerable_arcs(surface)
             
         # Draw wave information
-        font = pygame.font.SysFont('Arial', 20)
         if self.in_wave_transition and self.current_wave < TOTAL_WAVES:
-            wave_text = f"WAVE {self.current_wave + 1}"
-            text_surf = font.render(wave_text, True, (255, 255, 255))
-            surface.blit(text_surf, (WIDTH // 2 - text_surf.get_width() // 2, HEIGHT // 2 - 50))
+            dirty.append(draw_text(surface, f"WAVE {self.current_wave + 1}", 20, (255, 255, 255),
+                                   WIDTH // 2, HEIGHT // 2 - 50, "midtop"))
             
             # Draw countdown
             time_left = max(0, WAVE_TRANSITION_TIME - self.wave_transition_timer)
-            count_text = f"{time_left:.1f}"
-            count_surf = font.render(count_text, True, (255, 255, 255))
-            surface.blit(count_surf, (WIDTH // 2 - count_surf.get_width() // 2, HEIGHT // 2)) 
\ No newline at end of file
+            dirty.append(draw_text(surface, f"{time_left:.1f}", 20, (255, 255, 255), WIDTH // 2, HEIGHT // 2, "midtop"))
+        
+        return dirty
+    
+    def _draw_enemies(self, surface):
+        """Blit every enemy in one Surface.blits batch
+        
+        Live enemies use the cached body sprite for their color and movement
+        angle bucket, dying ones their death fade.
+        
+        Returns:
+            list: rects of the screen areas drawn on
+        """
+        pool = self.pool
+        n = pool.count
+        if n == 0:
+            return []
+        colors = np.minimum(pool.wave_num[:n] - 1, len(ENEMY_COLORS) - 1).tolist()
+        buckets = enemy_angle_buckets(pool.movement_angle[:n]).tolist()
+        corners = (np.rint(pool.pos[:n]) - ENEMY_SIZE // 2).tolist()
+        dying = (pool.state[:n] == ENEMY_STATE_DYING).tolist()
+        
+        blits = []
+        for i, (color, bucket, corner, is_dying) in enumerate(zip(colors, buckets, corners, dying)):
+            if is_dying:
+                # Growing and fading, centered on the enemy
+                sprite = death_fade(ENEMY_COLORS[color], pool.death_timer[i] / ENEMY_DEATH_DURATION)
+                half = sprite.get_width() // 2
+                blits.append((sprite, (pool.pos[i, 0] - half, pool.pos[i, 1] - half)))
+            else:
+                blits.append((enemy_body(ENEMY_COLORS[color], bucket), corner))
+        return surface.blits(blits)
+    
+    def _draw_vulnerable_arcs(self, surface):
+        """Debug: outline each enemy's vulnerable direction with an arc"""
+        dirty = []
+        for enemy in self.enemies:
+            center = enemy.rect.center
+            start_angle = (enemy.vulnerable_angle - VULNERABLE_ARC_SIZE / 2) % 360
+            end_angle = (enemy.vulnerable_angle + VULNERABLE_ARC_SIZE / 2) % 360
+            arc_rect = pygame.Rect(center[0] - ENEMY_SIZE, center[1] - ENEMY_SIZE, ENEMY_SIZE * 2, ENEMY_SIZE * 2)
+            dirty.append(pygame.draw.arc(surface, DEBUG_COLOR, arc_rect,
+                                         math.radians(start_angle), math.radians(end_angle), 3))
+        return dirty
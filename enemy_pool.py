@@ -0,0 +1,383 @@
+import math
+import numpy as np
+from collections import namedtuple
+from settings import *
+from spatial_grid import neighbour_pairs
+from ray_batch import segment_box_entries
+
+# Enemy states
+ENEMY_STATE_IDLE = 0
+ENEMY_STATE_MOVING = 1
+ENEMY_STATE_DYING = 2
+
+# Sizes derived from settings are computed when used, so balance overrides apply
+
+def hit_half_extent():
+    """Half size of the box a laser has to enter to hit an enemy"""
+    return ENEMY_SIZE / 2 + ENEMY_HIT_BUFFER
+
+def grid_half_extent():
+    """Half size of the bounds used for spatial hash bucketing: the laser hit
+    box plus a pixel for the rounding pygame.Rect applies to float centers"""
+    return hit_half_extent() + 1
+
+def separation_distance():
+    """Distance between enemy centers below which they push each other apart"""
+    return ENEMY_SIZE * ENEMY_SEPARATION_MULTIPLIER
+
+# Nearest enemy a laser segment runs into (see EnemyPool.segment_hit)
+SegmentHit = namedtuple("SegmentHit", ["index", "point", "normal", "incoming_angle", "vulnerable"])
+
+# Row and column indices of every pair among n points, by n
+_all_pairs = {}
+
+def separation_offsets(positions, min_distance=None, strength=None):
+    """Offsets that push apart every pair of positions closer than min_distance
+
+    Each close pair is pushed apart along the line between them by
+    strength times their overlap, split evenly between the two.
+    min_distance and strength default to separation_distance() and
+    ENEMY_SEPARATION_STRENGTH. Up to ENEMY_SCALAR_MAX positions are handled
+    in plain Python (see point_separation_offsets); crowds of up to
+    ENEMY_SEPARATION_PAIRWISE_MAX test every pair at once; larger ones take
+    neighbours from grid binning, so the cost stays near-linear in the
+    number of positions.
+    """
+    min_distance = separation_distance() if min_distance is None else min_distance
+    strength = ENEMY_SEPARATION_STRENGTH if strength is None else strength
+    n = len(positions)
+    if n <= ENEMY_SCALAR_MAX:
+        return np.array(point_separation_offsets(positions.tolist(), min_distance, strength)).reshape(-1, 2)
+    if n <= ENEMY_SEPARATION_PAIRWISE_MAX:
+        if n not in _all_pairs:
+            _all_pairs[n] = np.triu_indices(n, 1)
+        i, j = _all_pairs[n]
+    else:
+        i, j = neighbour_pairs(positions, min_distance)
+    # Coordinates as contiguous columns, which gather much faster than rows
+    x, y = positions.T.copy()
+    dx = x[i] - x[j]
+    dy = y[i] - y[j]
+    dist = np.hypot(dx, dy)
+    close = np.flatnonzero(dist < min_distance)
+    if not len(close):
+        return np.zeros_like(positions)  # Nobody is crowding anybody
+    i, j, dx, dy, dist = i[close], j[close], dx[close], dy[close], dist[close]
+
+    # Exactly stacked pairs split sideways, in opposite directions
+    stacked = dist == 0
+    dx[stacked] = -1
+    push = (min_distance - dist) * (strength / 2) / np.where(stacked, 1, dist)
+
+    # Each pair pushes i one way and j the other
+    both = np.concatenate([i, j])
+    offsets = np.empty_like(positions)
+    for axis, delta in enumerate((dx, dy)):
+        weights = delta * push
+        offsets[:, axis] = np.bincount(both, np.concatenate([weights, -weights]), n)
+    return offsets
+
+def point_separation_offsets(points, min_distance, strength):
+    """separation_offsets for a short list of (x, y) points, testing every pair in plain Python
+
+    Returns:
+        list: (x, y) offset of each point
+    """
+    count = len(points)
+    xs = [point[0] for point in points]
+    ys = [point[1] for point in points]
+    offset_x = [0.0] * count
+    offset_y = [0.0] * count
+    half_strength = strength / 2
+    for i in range(count):
+        x = xs[i]
+        y = ys[i]
+        for j in range(i + 1, count):
+            dx = x - xs[j]
+            if not -min_distance < dx < min_distance:
+                continue
+            dy = y - ys[j]
+            if not -min_distance < dy < min_distance:
+                continue
+            dist = math.hypot(dx, dy)
+            if dist >= min_distance:
+                continue
+            if dist == 0:
+                push = min_distance * half_strength
+                dx = -1  # Exactly stacked pairs split sideways, in opposite directions
+            else:
+                push = (min_distance - dist) * half_strength / dist
+            offset_x[i] += dx * push
+            offset_y[i] += dy * push
+            offset_x[j] -= dx * push
+            offset_y[j] -= dy * push
+    return list(zip(offset_x, offset_y))
+
+class EnemyPool:
+    """Structure-of-arrays store for all live enemies
+
+    Rows [0, count) of each array hold the live enemies. Every enemy also has
+    a thin view object (see enemy.Enemy) which tracks its current row, so the
+    rest of the game can keep working with individual enemies.
+
+    Removed rows are filled from the end of the arrays (swap-and-pop), and
+    the views of removed enemies go on a free list for later spawns to reuse.
+    """
+    def __init__(self, view_class, grid=None, capacity=64):
+        self.view_class = view_class
+        self.grid = grid
+        self.count = 0
+        self.views = []
+        self.free_views = []
+        # Most enemies live at once since the pool was created
+        self.high_water = 0
+        # Bumped whenever any enemy changes, so cached laser paths know to re-test enemies
+        self.version = 0
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        """(Re)allocate the arrays, keeping the live rows"""
+        old = getattr(self, "pos", None)
+        arrays = {
+            "pos": np.zeros((capacity, 2)),
+            "speed": np.zeros(capacity),
+            "movement_angle": np.zeros(capacity),
+            "vulnerable_angle": np.zeros(capacity),
+            "state": np.zeros(capacity, dtype=np.int8),
+            "death_timer": np.zeros(capacity),
+            "wave_num": np.zeros(capacity, dtype=np.int32),
+            "cell_range": np.zeros((capacity, 4), dtype=np.int64),
+        }
+        for name, array in arrays.items():
+            if old is not None:
+                array[:self.count] = getattr(self, name)[:self.count]
+            setattr(self, name, array)
+        self.capacity = capacity
+
+    def __len__(self):
+        return self.count
+
+    def _cell_ranges(self, pos):
+        """Spatial hash cell ranges (col_start, row_start, col_end, row_end) for positions"""
+        cell_size = self.grid.cell_size
+        half = grid_half_extent()
+        low = np.floor((pos - half) / cell_size)
+        high = np.floor((pos + half) / cell_size)
+        return np.concatenate([low, high], axis=1).astype(np.int64)
+
+    def spawn(self, pos, speed, wave_num, movement_angle):
+        """Add an enemy and return its view"""
+        if self.count == self.capacity:
+            self._allocate(self.capacity * 2)
+
+        i = self.count
+        self.version += 1
+        self.pos[i] = pos
+        self.speed[i] = speed
+        self.movement_angle[i] = movement_angle
+        self.vulnerable_angle[i] = (movement_angle + 180) % 360
+        self.state[i] = ENEMY_STATE_MOVING
+        self.death_timer[i] = 0
+        self.wave_num[i] = wave_num
+        self.count += 1
+
+        self.high_water = max(self.high_water, self.count)
+
+        if self.free_views:
+            view = self.free_views.pop()
+            view.index = i
+        else:
+            view = self.view_class(self, i)
+        self.views.append(view)
+        if self.grid is not None:
+            self.cell_range[i] = self._cell_ranges(self.pos[i:i + 1])[0]
+            self.grid.update_cells(view, tuple(self.cell_range[i]))
+        return view
+
+    def hit(self, index):
+        """Start the death animation of an enemy"""
+        self.version += 1
+        self.state[index] = ENEMY_STATE_DYING
+        self.death_timer[index] = 0
+
+    def update(self, dt, player_pos, flow_field):
+        """Advance every enemy by one frame
+
+        Up to ENEMY_SCALAR_MAX enemies are stepped one at a time in plain
+        Python, where NumPy's per-call overhead would outweigh the work;
+        larger crowds in a handful of vectorized steps.
+        """
+        n = self.count
+        if n == 0:
+            return
+        self.version += 1
+        if n <= ENEMY_SCALAR_MAX:
+            self._update_few(dt, player_pos, flow_field)
+            return
+        state = self.state[:n]
+        pos = self.pos[:n]
+
+        # Head for the player along the flow field: facing angle and movement.
+        # Usually nobody is dying, and the rows are updated in place rather than through masked copies
+        moving = state == ENEMY_STATE_MOVING
+        all_moving = moving.all()
+        rows = slice(None) if all_moving else moving
+        walkers = pos[rows]
+        direction = flow_field.directions(walkers, player_pos)
+
+        # Keep the facing of enemies with nowhere to go
+        heading = (direction != 0).any(axis=1)
+        angle = np.degrees(np.arctan2(direction[:, 1], direction[:, 0])) % 360
+        angle = np.where(heading, angle, self.movement_angle[:n][rows])
+        self.movement_angle[:n][rows] = angle
+        self.vulnerable_angle[:n][rows] = (angle + 180) % 360
+
+        # Step along the flow field while pushing overlapping enemies apart,
+        # in a single move that keeps them out of walls
+        steps = direction * (self.speed[:n][rows] * dt)[:, None] + separation_offsets(walkers)
+        pos[rows] = flow_field.move(walkers, steps)
+
+        if not all_moving:
+            self._advance_deaths(dt)
+        self._rebucket()
+
+    def _update_few(self, dt, player_pos, flow_field):
+        """update() for a small crowd, reading and writing the arrays once as lists"""
+        n = self.count
+        positions = self.pos[:n].tolist()
+        angles = self.movement_angle[:n].tolist()
+        speeds = self.speed[:n].tolist()
+        walkers = [i for i, state in enumerate(self.state[:n].tolist()) if state == ENEMY_STATE_MOVING]
+
+        # Step along the flow field while pushing overlapping enemies apart
+        points = [positions[i] for i in walkers]
+        offsets = point_separation_offsets(points, separation_distance(), ENEMY_SEPARATION_STRENGTH)
+        for i, (x, y), (offset_x, offset_y) in zip(walkers, points, offsets):
+            dx, dy = flow_field.direction(x, y, player_pos)
+            if dx or dy:  # Keep the facing of enemies with nowhere to go
+                angles[i] = math.degrees(math.atan2(dy, dx)) % 360
+            distance = speeds[i] * dt
+            positions[i] = flow_field.move_point(x, y, dx * distance + offset_x, dy * distance + offset_y)
+
+        self.pos[:n] = positions
+        self.movement_angle[:n] = angles
+        self.vulnerable_angle[:n] = [(angle + 180) % 360 for angle in angles]
+        if len(walkers) < n:
+            self._advance_deaths(dt)
+        self._rebucket()
+
+    def _advance_deaths(self, dt):
+        """Death timers, then drop enemies whose animation has finished"""
+        n = self.count
+        dying = self.state[:n] == ENEMY_STATE_DYING
+        self.death_timer[:n][dying] += dt
+        finished = dying & (self.death_timer[:n] >= ENEMY_DEATH_DURATION)
+        if finished.any():
+            self._remove(finished)
+
+    def segment_hit(self, start, end, arc_size=None):
+        """First enemy (not dying) whose hit box the segment from start to end enters
+
+        Every enemy is tested at once. The laser hits an enemy's vulnerable
+        side when it comes from within arc_size (default VULNERABLE_ARC_SIZE,
+        read at call time so balance overrides apply) of the enemy's
+        vulnerable angle, i.e. from behind.
+
+        Returns:
+            SegmentHit: the nearest enemy's row, entry point, entry face normal,
+                        the laser's incoming angle and whether the hit is
+                        vulnerable, or None if the segment hits no enemy
+        """
+        n = self.count
+        if n == 0:
+            return None
+        if arc_size is None:
+            arc_size = VULNERABLE_ARC_SIZE
+        t, x_faces = segment_box_entries(start, end, self.pos[:n], hit_half_extent())
+        hits = np.flatnonzero(t != np.inf)
+        hits = hits[self.state[hits] != ENEMY_STATE_DYING]
+        if not len(hits):
+            return None
+
+        # Direction the laser comes from, as seen from the enemies
+        dx = end[0] - start[0]
+        dy = end[1] - start[1]
+        incoming_angle = math.degrees(math.atan2(-dy, -dx)) % 360
+        offset = (incoming_angle - self.vulnerable_angle[hits] + 180) % 360 - 180
+        vulnerable = np.abs(offset) <= arc_size / 2
+
+        nearest = int(t[hits].argmin())
+        index = int(hits[nearest])
+        fraction = float(t[index])
+        if fraction == 0:
+            normal = (0, 0)  # The segment starts inside the enemy
+        elif x_faces[index]:
+            normal = (-1 if dx > 0 else 1, 0)
+        else:
+            normal = (0, -1 if dy > 0 else 1)
+        return SegmentHit(index, (start[0] + dx * fraction, start[1] + dy * fraction), normal,
+                          incoming_angle, bool(vulnerable[nearest]))
+
+    def _rebucket(self):
+        """Move enemies whose cell range changed to their new spatial hash cells"""
+        if self.grid is None or self.count == 0:
+            return
+        n = self.count
+        if n <= ENEMY_SCALAR_MAX:
+            # The grid skips enemies whose range didn't change
+            cell_size = self.grid.cell_size
+            half = grid_half_extent()
+            ranges = [(math.floor((x - half) / cell_size), math.floor((y - half) / cell_size),
+                       math.floor((x + half) / cell_size), math.floor((y + half) / cell_size))
+                      for x, y in self.pos[:n].tolist()]
+            for view, cell_range in zip(self.views, ranges):
+                self.grid.update_cells(view, cell_range)
+            self.cell_range[:n] = ranges
+            return
+        ranges = self._cell_ranges(self.pos[:n])
+        changed = np.flatnonzero((ranges != self.cell_range[:n]).any(axis=1))
+        self.cell_range[:n] = ranges
+        for i in changed:
+            self.grid.update_cells(self.views[i], tuple(ranges[i]))
+
+    def _remove(self, mask):
+        """Drop the rows selected by mask, moving live rows from the end into the gaps"""
+        n = self.count
+        removed = np.flatnonzero(mask)
+        kept = n - len(removed)
+        for i in removed:
+            view = self.views[i]
+            if self.grid is not None:
+                self.grid.remove(view)
+            view.index = -1
+            self.free_views.append(view)
+
+        # Gaps below the new count take the surviving rows above it
+        holes = removed[removed < kept]
+        movers = kept + np.flatnonzero(~mask[kept:n])
+        for name in ("pos", "speed", "movement_angle", "vulnerable_angle",
+                     "state", "death_timer", "wave_num", "cell_range"):
+            array = getattr(self, name)
+            array[holes] = array[movers]
+
+        for hole, mover in zip(holes.tolist(), movers.tolist()):
+            view = self.views[mover]
+            view.index = hole
+            self.views[hole] = view
+        del self.views[kept:]
+        self.count = kept
+
+    def stats(self):
+        """Pool counters for the debug overlay: live, free and high-water enemy counts"""
+        return {"live": self.count, "free": len(self.free_views), "high_water": self.high_water}
+
+    def clear(self):
+        """Remove every enemy"""
+        self.version += 1
+        for view in self.views:
+            view.index = -1
+        self.free_views += self.views
+        self.views = []
+        self.count = 0
+        if self.grid is not None:
+            self.grid.clear()
@@ -0,0 +1,160 @@
+"""Structured game event log
+
+Events are typed (an EventType has a level and named fields) and go into
+an in-memory ring buffer that the debug overlay reads. When a log file is
+open, a background thread writes them out as JSON lines, so the game loop
+never waits on file or terminal I/O. Events below the configured level
+return from log() before touching any buffer.
+
+Write a session's events to a file: python main.py --log events.jsonl
+"""
+import atexit
+import json
+import queue
+import threading
+import time
+from collections import deque
+from settings import *
+from text import draw_text
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+LEVELS = {"debug": DEBUG, "info": INFO, "warning": WARNING}
+
+_level = LEVELS[EVENT_LOG_LEVEL]
+_start = time.perf_counter()
+# Most recent (time, event type, values) records, for the overlay and queries
+_ring = deque(maxlen=EVENT_LOG_BUFFER)
+# Number of events logged per event type name
+_counts = {}
+# Background writer, when a log file is open
+_writer = None
+EVENT_TYPES = []
+
+class EventType:
+    """A kind of event with a level and named fields"""
+    __slots__ = ("name", "level", "fields", "enabled")
+
+    def __init__(self, name, level, fields):
+        self.name = name
+        self.level = level
+        self.fields = fields
+        self.enabled = level >= _level
+        EVENT_TYPES.append(self)
+
+    def log(self, *values):
+        """Record an event with one value per field"""
+        if not self.enabled:
+            return
+        record = (time.perf_counter() - _start, self, values)
+        _ring.append(record)
+        _counts[self.name] = _counts.get(self.name, 0) + 1
+        if _writer is not None:
+            _writer.queue.put(record)
+
+# Laser shots
+SHOT_FIRED = EventType("shot_fired", INFO, ("x", "y", "shay_x", "shay_y"))
+SHOT_REJECTED = EventType("shot_rejected", DEBUG, ("cooldown",))
+LASER_READY = EventType("laser_ready", DEBUG, ())
+RICOCHET = EventType("ricochet", DEBUG, ("dir_x", "dir_y"))
+# Where a shot ended: segment is "to_shay" or "ricochet"
+WALL_HIT = EventType("wall_hit", INFO, ("x", "y", "segment"))
+ENEMY_HIT = EventType("enemy_hit", INFO, ("x", "y", "killed", "segment"))
+# The first enemy a laser segment runs into, and whether it was hit from behind
+ENEMY_IN_PATH = EventType("enemy_in_path", DEBUG, ("x", "y", "incoming_angle", "vulnerable_angle", "vulnerable"))
+# Game flow
+WAVE_START = EventType("wave_start", INFO, ("wave",))
+DEBUG_TOGGLED = EventType("debug_toggled", INFO, ("on",))
+SPACE_KEY = EventType("space_key", DEBUG, ("down",))
+
+class _Writer(threading.Thread):
+    """Drains queued events to a JSON lines file every EVENT_LOG_FLUSH_INTERVAL seconds"""
+    def __init__(self, path):
+        super().__init__(name="eventlog-writer", daemon=True)
+        self.file = open(path, "w")
+        self.queue = queue.SimpleQueue()
+        self.stopping = threading.Event()
+
+    def run(self):
+        while not self.stopping.wait(EVENT_LOG_FLUSH_INTERVAL):
+            self._drain()
+        self._drain()
+        self.file.close()
+
+    def _drain(self):
+        lines = []
+        while True:
+            try:
+                record = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            lines.append(json.dumps(to_dict(record), separators=(",", ":"), default=_plain) + "\n")
+        if lines:
+            self.file.writelines(lines)
+            self.file.flush()
+
+def _plain(value):
+    """JSON fallback for numpy scalars"""
+    return value.item()
+
+def set_level(name):
+    """Log only events at or above a level name ('debug', 'info' or 'warning')"""
+    global _level
+    _level = LEVELS[name]
+    for event_type in EVENT_TYPES:
+        event_type.enabled = event_type.level >= _level
+
+def open_log(path):
+    """Start writing events to a JSON lines file in the background"""
+    global _writer
+    close_log()
+    _writer = _Writer(path)
+    _writer.start()
+    atexit.register(close_log)
+
+def close_log():
+    """Write out any queued events and close the log file"""
+    global _writer
+    if _writer is not None:
+        _writer.stopping.set()
+        _writer.join()
+        _writer = None
+
+def to_dict(record):
+    """A (time, event type, values) record as a flat dict"""
+    t, event_type, values = record
+    event = {"t": round(t, 4), "event": event_type.name}
+    event.update(zip(event_type.fields, values))
+    return event
+
+def recent(count=None, event_type=None):
+    """The most recent records, oldest first, optionally of a single event type"""
+    records = [r for r in _ring if event_type is None or r[1] is event_type]
+    return records if count is None else records[-count:]
+
+def counts():
+    """Number of events logged per event type name"""
+    return dict(_counts)
+
+def format_record(record):
+    """One-line text form of a record"""
+    t, event_type, values = record
+    fields = " ".join(
+        f"{name}={value:.1f}" if isinstance(value, float) else f"{name}={value}"
+        for name, value in zip(event_type.fields, values)
+    )
+    return f"{t:8.2f} {event_type.name} {fields}"
+
+def draw_overlay(surface):
+    """Draw the latest events under the health and cooldown HUD
+
+    Returns:
+        list: rects of the screen areas drawn on
+    """
+    dirty = []
+    y = 60
+    for record in recent(EVENT_LOG_OVERLAY_ROWS):
+        dirty.append(draw_text(surface, format_record(record), 12, DEBUG_COLOR, 10, y))
+        y += 14
+    return dirty
@@ -0,0 +1,227 @@
+import heapq
+import math
+import numpy as np
+from settings import *
+
+# Neighbour offsets (col, row) with their step cost; diagonals last
+NEIGHBOURS = [(1, 0, 1), (-1, 0, 1), (0, 1, 1), (0, -1, 1),
+              (1, 1, math.sqrt(2)), (1, -1, math.sqrt(2)), (-1, 1, math.sqrt(2)), (-1, -1, math.sqrt(2))]
+
+class FlowField:
+    """Shared navigation toward the player for every enemy
+
+    A coarse grid over the level holds each cell's path distance to the
+    player's cell and the next cell along that path. It is recomputed
+    (Dijkstra from the player's cell) only when the player enters a new
+    cell, so the cost doesn't depend on the number of enemies: each one just
+    looks up its cell. Enemies whose shortest path is a straight line seek
+    the player directly, as they always did.
+
+    A per-pixel clearance map marks where an enemy center would overlap a
+    wall, and stops enemy moves into walls.
+
+    Up to ENEMY_SCALAR_MAX positions are handled one at a time in plain
+    Python (direction, move_point), where NumPy's per-call overhead would
+    cost more than the work itself.
+    """
+    def __init__(self, walls, size, cell_size=None):
+        if cell_size is None:
+            cell_size = FLOW_FIELD_CELL_SIZE  # Read per level, so balance overrides apply
+        self.size = size
+        self.cell_size = cell_size
+        self.cols = -(-size[0] // cell_size)
+        self.rows = -(-size[1] // cell_size)
+        # Highest (x, y) pixel and (col, row) cell indices
+        self.last_pixel = np.array([size[0] - 1, size[1] - 1])
+        self.last_cell = np.array([self.cols - 1, self.rows - 1])
+
+        # Enemy centers closer than half an enemy to a wall are blocked
+        half = ENEMY_SIZE // 2
+        self.blocked = np.zeros((size[1], size[0]), dtype=bool)
+        for wall in walls:
+            self.blocked[max(0, wall.top - half):max(0, wall.bottom + half),
+                         max(0, wall.left - half):max(0, wall.right + half)] = True
+        # One bytes row per pixel row, for fast single-pixel lookups
+        self.blocked_rows = [row.tobytes() for row in self.blocked]
+
+        # Cells are walkable when an enemy fits at their center
+        centers = np.arange(self.cols) * cell_size + cell_size // 2, np.arange(self.rows) * cell_size + cell_size // 2
+        center_x = np.minimum(centers[0], size[0] - 1)
+        center_y = np.minimum(centers[1], size[1] - 1)
+        self.walkable = ~self.blocked[np.ix_(center_y, center_x)]
+        self.neighbours = self._build_neighbours()
+
+        self.target_cell = None
+        self.distance = np.full((self.rows, self.cols), np.inf)
+        # Unit direction toward the next cell on the path, and whether to seek the player directly
+        self.flow = np.zeros((self.rows, self.cols, 2))
+        self.direct = np.ones((self.rows, self.cols), dtype=bool)
+        self._cache_lists()
+        self.recomputes = 0
+
+    def _cache_lists(self):
+        """Nested-list copies of flow and direct, for single-position lookups"""
+        self.flow_lists = self.flow.tolist()
+        self.direct_lists = self.direct.tolist()
+
+    def _build_neighbours(self):
+        """Walkable neighbours and step costs of every cell, by flat cell index
+
+        Diagonal steps need both adjacent orthogonal cells walkable, so paths
+        don't cut wall corners.
+        """
+        walkable = self.walkable
+        neighbours = []
+        for row in range(self.rows):
+            for col in range(self.cols):
+                cell_neighbours = []
+                for d_col, d_row, cost in NEIGHBOURS:
+                    n_col, n_row = col + d_col, row + d_row
+                    if not (0 <= n_col < self.cols and 0 <= n_row < self.rows) or not walkable[n_row, n_col]:
+                        continue
+                    if d_col and d_row and not (walkable[row, n_col] and walkable[n_row, col]):
+                        continue
+                    cell_neighbours.append((n_row * self.cols + n_col, cost))
+                neighbours.append(cell_neighbours)
+        return neighbours
+
+    def cell_of(self, pos):
+        """Grid cell (col, row) containing a point, clamped to the grid"""
+        return (
+            min(self.cols - 1, max(0, int(pos[0] // self.cell_size))),
+            min(self.rows - 1, max(0, int(pos[1] // self.cell_size)))
+        )
+
+    def update(self, target_pos):
+        """Recompute the field if the target moved into a new cell
+
+        Returns:
+            bool: True if the field was recomputed
+        """
+        cell = self.cell_of(target_pos)
+        if cell == self.target_cell:
+            return False
+        self.target_cell = cell
+        self.recomputes += 1
+
+        # Dijkstra from the target cell, recording where each cell's path goes next
+        count = self.rows * self.cols
+        distance = [math.inf] * count
+        next_cell = [-1] * count
+        start = cell[1] * self.cols + cell[0]
+        distance[start] = 0
+        heap = [(0, start)]
+        neighbours = self.neighbours
+        while heap:
+            dist, index = heapq.heappop(heap)
+            if dist > distance[index]:
+                continue
+            for other, cost in neighbours[index]:
+                new_dist = dist + cost
+                if new_dist < distance[other]:
+                    distance[other] = new_dist
+                    next_cell[other] = index
+                    heapq.heappush(heap, (new_dist, other))
+
+        self.distance = np.array(distance).reshape(self.rows, self.cols)
+        next_cell = np.array(next_cell).reshape(self.rows, self.cols)
+
+        # Step direction toward the next cell (zero where there's no path)
+        rows, cols = np.indices((self.rows, self.cols))
+        has_next = next_cell >= 0
+        step = np.stack([next_cell % self.cols - cols, next_cell // self.cols - rows], axis=-1).astype(float)
+        step[~has_next] = 0
+        self.flow = step / np.maximum(np.hypot(step[..., 0], step[..., 1]), 1)[..., None]
+
+        # Cells whose path is as short as the open-floor distance have nothing in the way
+        d_col = np.abs(cols - cell[0])
+        d_row = np.abs(rows - cell[1])
+        open_distance = np.maximum(d_col, d_row) + (math.sqrt(2) - 1) * np.minimum(d_col, d_row)
+        self.direct = ~has_next | (self.distance <= open_distance + 1e-6)
+        self._cache_lists()
+        return True
+
+    def direction(self, x, y, target_pos):
+        """Unit movement direction toward the target for one position (see directions)
+
+        Returns:
+            tuple: (dx, dy), zero where there's no path
+        """
+        col = min(max(int(x / self.cell_size), 0), self.cols - 1)
+        row = min(max(int(y / self.cell_size), 0), self.rows - 1)
+        if not self.direct_lists[row][col]:
+            return tuple(self.flow_lists[row][col])
+        dx = target_pos[0] - x
+        dy = target_pos[1] - y
+        length = math.hypot(dx, dy) or 1
+        return (dx / length, dy / length)
+
+    def directions(self, positions, target_pos):
+        """Unit movement directions toward the target for an (N, 2) array of positions"""
+        if len(positions) <= ENEMY_SCALAR_MAX:
+            return np.array([self.direction(x, y, target_pos) for x, y in positions.tolist()]).reshape(-1, 2)
+        cells = self._clamped(positions / self.cell_size, self.last_cell)
+        cols, rows = cells[:, 0], cells[:, 1]
+
+        seek = np.asarray(target_pos, dtype=float) - positions
+        length = np.hypot(seek[:, 0], seek[:, 1])
+        seek /= np.where(length == 0, 1, length)[:, None]
+        return np.where(self.direct[rows, cols][:, None], seek, self.flow[rows, cols])
+
+    @staticmethod
+    def _clamped(coords, last):
+        """Floored integer indices of (N, 2) coordinates, clamped to [0, last] per axis
+
+        Truncation floors every coordinate that isn't clamped to 0 anyway.
+        In-place ufuncs avoid the call overhead of np.clip.
+        """
+        indices = coords.astype(np.intp)
+        np.minimum(indices, last, out=indices)
+        np.maximum(indices, 0, out=indices)
+        return indices
+
+    def _is_blocked(self, positions):
+        # Rounded like the pixel centers of enemy rects
+        pixels = self._clamped(positions + 0.5, self.last_pixel)
+        return self.blocked[pixels[:, 1], pixels[:, 0]]
+
+    def blocked_at(self, x, y):
+        """Whether an enemy centered at one position would overlap a wall"""
+        return self.blocked_rows[min(max(int(y + 0.5), 0), self.size[1] - 1)][
+            min(max(int(x + 0.5), 0), self.size[0] - 1)] != 0
+
+    def move_point(self, x, y, step_x, step_y):
+        """One position after moving by a step (see move)
+
+        Returns:
+            tuple: the new (x, y)
+        """
+        moved_x = x + step_x
+        moved_y = y + step_y
+        if not self.blocked_at(moved_x, moved_y) or self.blocked_at(x, y):
+            return (moved_x, moved_y)
+        if not self.blocked_at(moved_x, y):
+            return (moved_x, y)
+        if not self.blocked_at(x, moved_y):
+            return (x, moved_y)
+        return (x, y)
+
+    def move(self, positions, steps):
+        """Positions after moving by steps, sliding along or stopping at walls
+
+        Enemies already inside a wall (spawned there) move freely until they leave it.
+        """
+        if len(positions) <= ENEMY_SCALAR_MAX:
+            return np.array([self.move_point(x, y, step_x, step_y) for (x, y), (step_x, step_y)
+                             in zip(positions.tolist(), steps.tolist())]).reshape(-1, 2)
+        moved = positions + steps
+        stuck = self._is_blocked(moved) & ~self._is_blocked(positions)
+        if stuck.any():
+            # Keep whichever single-axis part of the step is clear
+            start = positions[stuck]
+            along_x = start + steps[stuck] * (1, 0)
+            along_y = start + steps[stuck] * (0, 1)
+            x_clear = ~self._is_blocked(along_x)
+            y_clear = ~self._is_blocked(along_y)
+            moved[stuck] = np.where(x_clear[:, None], along_x, np.where(y_clear[:, None], along_y, start))
+        return moved
@@ -1,4 +1,5 @@
 import pygame
+import random
 import sys
 from settings import *
 from player import Player, PLAYER_STATE_MOVING, PLAYER_STATE_FIRING
@@ -6,117 +7,128 @@ from shay import Shay
 from laser import Laser
 from enemy import EnemySpawner
 from utils import distance
+from text import draw_text
+import profiler
+import eventlog
+from level import load_level
+from flow_field import FlowField
+from spawn_sampler import SpawnSampler
+from aim_preview import AimPreview
 
 class Game:
-    def __init__(self, screen):
+    def __init__(self, screen=None, seed=None, level=None):
+        # screen is None when running headless (see simulation.py)
         self.screen = screen
+        # Compiled level (see level.py); restarts reuse it as is
+        self.level = level if level is not None else load_level(DEFAULT_LEVEL)
+        
+        # All game randomness comes from this stream so runs can be reproduced
+        self.seed = seed if seed is not None else random.randrange(2 ** 63)
+        self.rng = random.Random(self.seed)
         self.game_state = GAME_STATE_MENU
         self.debug_mode = DEBUG_MODE
+        # Measured frame rate for the debug overlay, set by whoever runs the frame loop
+        self.fps = 0
         self.keys = {}
+        # Bumped whenever the walls change so renderers can rebuild their static layer
+        self.level_version = 0
         self.setup_level()
         
     def setup_level(self):
         """Set up the game level and entities"""
-        # Create walls (boundaries)
-        self.walls = [
-            pygame.Rect(0, 0, WIDTH, 20),  # Top wall
-            pygame.Rect(0, 0, 20, HEIGHT),  # Left wall
-            pygame.Rect(0, HEIGHT - 20, WIDTH, 20),  # Bottom wall
-            pygame.Rect(WIDTH - 20, 0, 20, HEIGHT),  # Right wall
-            
-            # Add some obstacles in the level
-            pygame.Rect(WIDTH // 4, HEIGHT // 3, 100, 100),
-            pygame.Rect(WIDTH * 3 // 4 - 100, HEIGHT * 2 // 3 - 100, 100, 100),
-            pygame.Rect(WIDTH // 2 - 50, HEIGHT // 2 - 50, 100, 20),
-        ]
+        level = self.level
+        self.walls = level.walls
+        self.wall_index = level.wall_index
+        self.level_version += 1
         
         # Create player and Shay
-        player_pos = (WIDTH // 4, HEIGHT // 2)
-        self.player = Player(player_pos, self.walls)
-        
-        shay_pos = (WIDTH * 3 // 4, HEIGHT // 2)
-        self.shay = Shay(shay_pos)
+        self.player = Player(level.player_start, self.wall_index)
+        self.shay = Shay(level.shay_start)
         
-        # Create laser
-        self.laser = Laser()
+        # Create laser and the cached preview of its path
+        self.laser = Laser(self.rng)
+        self.aim_preview = AimPreview()
+        self.shots_fired = 0
         
         # Create enemy spawner
-        self.enemy_spawner = EnemySpawner(self.walls)
+        self.enemy_spawner = EnemySpawner(self.rng, SpawnSampler(level.spawn_zones, self.wall_index),
+                                          FlowField(level.walls, level.size))
         
         # Start first wave
         self.game_state = GAME_STATE_WAVE_TRANSITION
         
-    def handle_event(self, event):
-        """Handle pygame events"""
-        if event.type == pygame.KEYDOWN:
-            # Toggle debug mode
-            if event.key == pygame.K_F1:
-                self.debug_mode = not self.debug_mode
-                print(f"Debug mode: {self.debug_mode}")
-                
-            # Skip wave (debug)
-            if event.key == pygame.K_f and self.debug_mode:
-                if self.game_state == GAME_STATE_PLAYING:
-                    self.enemy_spawner.enemies = []
-                    self.enemy_spawner.wave_enemies_left = 0
-            
-            # God mode toggle (debug)
-            if event.key == pygame.K_g and self.debug_mode:
-                if self.player.health < PLAYER_MAX_HEALTH:
-                    self.player.health = PLAYER_MAX_HEALTH
-                else:
-                    self.player.health = 999
+    def handle_key_press(self, key):
+        """Handle debug and restart key presses"""
+        # Toggle debug mode
+        if key == pygame.K_F1:
+            self.debug_mode = not self.debug_mode
+            eventlog.DEBUG_TOGGLED.log(self.debug_mode)
             
-            # Restart after game over/victory
-            if event.key == pygame.K_r and (self.game_state == GAME_STATE_GAME_OVER or 
-                                           self.game_state == GAME_STATE_VICTORY):
-                self.setup_level()
+        # Skip wave (debug)
+        if key == pygame.K_f and self.debug_mode:
+            if self.game_state == GAME_STATE_PLAYING:
+                self.enemy_spawner.clear_enemies()
+                self.enemy_spawner.wave_enemies_left = 0
+        
+        # God mode toggle (debug)
+        if key == pygame.K_g and self.debug_mode:
+            if self.player.health < PLAYER_MAX_HEALTH:
+                self.player.health = PLAYER_MAX_HEALTH
+            else:
+                self.player.health = 999
+        
+        # Restart after game over/victory
+        if key == pygame.K_r and (self.game_state == GAME_STATE_GAME_OVER or 
+                                  self.game_state == GAME_STATE_VICTORY):
+            self.setup_level()
                 
+    def handle_space(self, pressed, released):
+        """Handle SPACE edges: press enters the firing state, release fires the laser"""
+        if pressed:
             # Start game from menu
-            if event.key == pygame.K_SPACE and self.game_state == GAME_STATE_MENU:
+            if self.game_state == GAME_STATE_MENU:
                 self.game_state = GAME_STATE_WAVE_TRANSITION
             
             # Handle spacebar press for entering firing state
-            if event.key == pygame.K_SPACE and self.game_state == GAME_STATE_PLAYING:
+            elif self.game_state == GAME_STATE_PLAYING:
                 self.player.enter_firing_state()
+        
+        # Handle spacebar release for firing laser and returning to moving state
+        if released and self.game_state == GAME_STATE_PLAYING:
+            # Only fire if player is in firing state (meaning they pressed space earlier)
+            if self.player.is_in_firing_state() and self.player.can_fire:
+                laser_direction = self.player.fire_laser(self.shay.pos)
                 
-        elif event.type == pygame.KEYUP:
-            # Handle spacebar release for firing laser and returning to moving state
-            if event.key == pygame.K_SPACE and self.game_state == GAME_STATE_PLAYING:
-                # Only fire if player is in firing state (meaning they pressed space earlier)
-                if self.player.is_in_firing_state() and self.player.can_fire:
-                    print("Firing laser on space key release")
-                    laser_direction = self.player.fire_laser(self.shay.pos)
-                    
-                    # If laser direction is valid, activate it
-                    if laser_direction:
-                        print(f"Game received laser direction: {laser_direction}")
+                # If laser direction is valid, activate it
+                if laser_direction:
+                    with profiler.scope("Laser.fire"):
                         hit_enemy = self.laser.fire(
                             self.player.pos, 
                             self.shay.pos, 
                             self.shay, 
-                            self.walls, 
-                            self.enemy_spawner.enemies
+                            self.wall_index, 
+                            self.enemy_spawner.pool
                         )
-                        
-                        # Handle enemy hit if any
-                        if hit_enemy:
-                            print(f"Hit enemy at {hit_enemy.pos}")
-                            self.enemy_spawner.handle_laser_hit(hit_enemy)
-                
-                # Return to moving state
-                self.player.enter_moving_state()
+                    self.shots_fired += 1
+                    
+                    # Handle enemy hit if any
+                    if hit_enemy:
+                        self.enemy_spawner.handle_laser_hit(hit_enemy)
+            
+            # Return to moving state
+            self.player.enter_moving_state()
     
-    def update(self, dt, keys=None, space_just_pressed=False):
-        """Update game state and all entities"""
-        # Get all pressed keys
-        if keys is None:
-            self.keys = pygame.key.get_pressed()
-        else:
-            self.keys = keys
+    def update(self, dt, frame_input):
+        """Update game state and all entities for one step of the given input
         
-        # Get mouse position
-        mouse_pos = pygame.mouse.get_pos()
+        Game logic only reads frame_input (never pygame's keyboard, mouse or
+        display), so it can run headless at any speed.
+        """
+        self.keys = frame_input.keys
+        mouse_pos = frame_input.mouse_pos
+        for key in frame_input.key_presses:
+            self.handle_key_press(key)
+        self.handle_space(frame_input.space_pressed, frame_input.space_released)
         
         # Update based on game state
         if self.game_state == GAME_STATE_MENU:
@@ -125,160 +137,141 @@ class Game:
             
         elif self.game_state == GAME_STATE_WAVE_TRANSITION or self.game_state == GAME_STATE_PLAYING:
             # Update Shay
-            self.shay.update(dt, mouse_pos, self.keys)
+            with profiler.scope("Shay.update"):
+                self.shay.update(dt, mouse_pos, self.keys)
             
             # Update player
-            self.player.update(dt, self.keys, self.shay.pos)
+            with profiler.scope("Player.update"):
+                self.player.update(dt, self.keys, self.shay.pos)
             
             # Update laser visual effect
             self.laser.update(dt)
             
-            # Update enemies if in playing state
-            if self.game_state == GAME_STATE_PLAYING:
-                player_hit, _ = self.enemy_spawner.update(
-                    dt, 
-                    self.player.pos, 
-                    self.player.rect,
-                    self.player.invulnerable
-                )
-                
-                # Handle player-enemy collision
-                if player_hit:
-                    # If not invulnerable, take damage and become invulnerable
-                    if not self.player.invulnerable:
-                        game_over = self.player.take_damage()
-                        if game_over:
-                            self.game_state = GAME_STATE_GAME_OVER
-                            return
-                        self.player.make_invulnerable()
-                        
-                        # Find and destroy the colliding enemy
-                        self._destroy_colliding_enemy()
-            
-            # Update enemy spawner for wave transitions
-            else:
+            # Update enemies and wave progression (the spawner runs its own
+            # transition countdown between waves)
+            with profiler.scope("EnemySpawner.update"):
                 player_hit, wave_result = self.enemy_spawner.update(
                     dt, 
                     self.player.pos, 
                     self.player.rect,
                     self.player.invulnerable  # Pass player invulnerability state
                 )
-                
-                # Handle player-enemy collision during wave transition
-                if player_hit:
-                    # If not invulnerable, take damage and become invulnerable
-                    if not self.player.invulnerable:
-                        game_over = self.player.take_damage()
-                        if game_over:
-                            self.game_state = GAME_STATE_GAME_OVER
-                            return
-                        self.player.make_invulnerable()
-                        
-                        # Find and destroy the colliding enemy
-                        self._destroy_colliding_enemy()
-                
-                # Check if wave transition is complete
-                if wave_result is not None:
-                    if wave_result:  # New wave started
-                        print(f"Starting wave {self.enemy_spawner.current_wave}")
-                        self.game_state = GAME_STATE_PLAYING
-                        
-                        # Make player briefly invulnerable when wave starts to avoid
-                        # getting hit immediately at wave start
-                        self.player.make_invulnerable()
-                    else:  # No more waves, game won
-                        self.game_state = GAME_STATE_VICTORY
+            
+            # Handle player-enemy collision
+            if player_hit:
+                # If not invulnerable, take damage and become invulnerable
+                if not self.player.invulnerable:
+                    game_over = self.player.take_damage()
+                    if game_over:
+                        self.game_state = GAME_STATE_GAME_OVER
+                        return
+                    self.player.make_invulnerable()
+                    
+                    # Find and destroy the colliding enemy
+                    self._destroy_colliding_enemy()
+            
+            # Check if wave transition is complete
+            if wave_result is not None:
+                if wave_result:  # New wave started
+                    eventlog.WAVE_START.log(self.enemy_spawner.current_wave)
+                    self.game_state = GAME_STATE_PLAYING
+                    
+                    # Make player briefly invulnerable when wave starts to avoid
+                    # getting hit immediately at wave start
+                    self.player.make_invulnerable()
+                else:  # No more waves, game won
+                    self.game_state = GAME_STATE_VICTORY
             
             # Deactivate laser game logic after one frame, but let visual effect continue
             if self.laser.active:
                 self.laser.deactivate()
     
+    def draw_static(self, surface):
+        """Draw the parts of the level that only change with level_version (background and walls)"""
+        surface.blit(self.level.background, (0, 0))
+    
     def draw(self):
-        """Draw the game"""
-        # Draw walls
-        for wall in self.walls:
-            pygame.draw.rect(self.screen, (100, 100, 100), wall)
+        """Draw everything that moves or changes on top of the static layer
+        
+        Returns:
+            list: rects of the screen areas drawn on
+        """
+        dirty = []
         
         # Draw based on game state
         if self.game_state == GAME_STATE_MENU:
             # Draw menu
-            font = pygame.font.SysFont('Arial', 36)
-            title = font.render("Ric 'n' Shay", True, (255, 255, 255))
-            self.screen.blit(title, (WIDTH // 2 - title.get_width() // 2, HEIGHT // 3))
-            
-            font = pygame.font.SysFont('Arial', 24)
-            start = font.render("Press SPACE to start", True, (200, 200, 200))
-            self.screen.blit(start, (WIDTH // 2 - start.get_width() // 2, HEIGHT // 2))
-            
-            controls = font.render("W,A,S,D to move Ric, Mouse to move Shay", True, (200, 200, 200))
-            self.screen.blit(controls, (WIDTH // 2 - controls.get_width() // 2, HEIGHT // 2 + 50))
-            
-            controls2 = font.render("Q,E to rotate ricochet angle, SPACE to fire", True, (200, 200, 200))
-            self.screen.blit(controls2, (WIDTH // 2 - controls2.get_width() // 2, HEIGHT // 2 + 80))
+            dirty.append(draw_text(self.screen, "Ric 'n' Shay", 36, (255, 255, 255), WIDTH // 2, HEIGHT // 3, "midtop"))
+            dirty.append(draw_text(self.screen, "Press SPACE to start", 24, (200, 200, 200), WIDTH // 2, HEIGHT // 2, "midtop"))
+            dirty.append(draw_text(self.screen, "W,A,S,D to move Ric, Mouse to move Shay", 24, (200, 200, 200),
+                                   WIDTH // 2, HEIGHT // 2 + 50, "midtop"))
+            dirty.append(draw_text(self.screen, "Q,E to rotate ricochet angle, SPACE to fire", 24, (200, 200, 200),
+                                   WIDTH // 2, HEIGHT // 2 + 80, "midtop"))
             
         elif self.game_state == GAME_STATE_GAME_OVER:
             # Draw game over
-            font = pygame.font.SysFont('Arial', 48)
-            game_over = font.render("GAME OVER", True, (255, 50, 50))
-            self.screen.blit(game_over, (WIDTH // 2 - game_over.get_width() // 2, HEIGHT // 3))
-            
-            font = pygame.font.SysFont('Arial', 24)
-            restart = font.render("Press R to restart", True, (200, 200, 200))
-            self.screen.blit(restart, (WIDTH // 2 - restart.get_width() // 2, HEIGHT // 2))
-            
-            wave = font.render(f"You reached Wave {self.enemy_spawner.current_wave}", True, (200, 200, 200))
-            self.screen.blit(wave, (WIDTH // 2 - wave.get_width() // 2, HEIGHT // 2 + 50))
+            dirty.append(draw_text(self.screen, "GAME OVER", 48, (255, 50, 50), WIDTH // 2, HEIGHT // 3, "midtop"))
+            dirty.append(draw_text(self.screen, "Press R to restart", 24, (200, 200, 200), WIDTH // 2, HEIGHT // 2, "midtop"))
+            dirty.append(draw_text(self.screen, f"You reached Wave {self.enemy_spawner.current_wave}", 24, (200, 200, 200),
+                                   WIDTH // 2, HEIGHT // 2 + 50, "midtop"))
             
         elif self.game_state == GAME_STATE_VICTORY:
             # Draw victory
-            font = pygame.font.SysFont('Arial', 48)
-            victory = font.render("VICTORY!", True, (50, 255, 50))
-            self.screen.blit(victory, (WIDTH // 2 - victory.get_width() // 2, HEIGHT // 3))
-            
-            font = pygame.font.SysFont('Arial', 24)
-            congrats = font.render("You defeated all 5 waves!", True, (200, 200, 200))
-            self.screen.blit(congrats, (WIDTH // 2 - congrats.get_width() // 2, HEIGHT // 2))
-            
-            restart = font.render("Press R to play again", True, (200, 200, 200))
-            self.screen.blit(restart, (WIDTH // 2 - restart.get_width() // 2, HEIGHT // 2 + 50))
+            dirty.append(draw_text(self.screen, "VICTORY!", 48, (50, 255, 50), WIDTH // 2, HEIGHT // 3, "midtop"))
+            dirty.append(draw_text(self.screen, "You defeated all 5 waves!", 24, (200, 200, 200), WIDTH // 2, HEIGHT // 2, "midtop"))
+            dirty.append(draw_text(self.screen, "Press R to play again", 24, (200, 200, 200), WIDTH // 2, HEIGHT // 2 + 50, "midtop"))
             
         else:  # Playing or wave transition
             # Draw entities
-            self.player.draw(self.screen)
-            # Pass the player's firing state to Shay for drawing laser indicators
-            self.shay.draw(self.screen, self.player.pos, self.player.is_in_firing_state())
-            self.laser.draw(self.screen)
-            self.enemy_spawner.draw(self.screen)
+            with profiler.scope("Player.draw"):
+                dirty += self.player.draw(self.screen)
+            # Preview the shot's path while the player is in the firing state
+            aim_path = None
+            if self.player.is_in_firing_state():
+                with profiler.scope("AimPreview.path"):
+                    aim_path = self.aim_preview.path(self.player.pos, self.shay, self.wall_index,
+                                                     self.level_version, self.enemy_spawner.pool)
+            with profiler.scope("Shay.draw"):
+                dirty += self.shay.draw(self.screen, aim_path)
+            with profiler.scope("Laser.draw"):
+                dirty += self.laser.draw(self.screen)
+            with profiler.scope("EnemySpawner.draw"):
+                dirty += self.enemy_spawner.draw(self.screen)
             
             # Draw HUD
-            font = pygame.font.SysFont('Arial', 20)
             wave_text = f"Wave: {self.enemy_spawner.current_wave}/{TOTAL_WAVES}"
-            wave_surf = font.render(wave_text, True, (200, 200, 200))
-            self.screen.blit(wave_surf, (WIDTH - wave_surf.get_width() - 20, 15))
+            dirty.append(draw_text(self.screen, wave_text, 20, (200, 200, 200), WIDTH - 20, 15, "topright"))
             
             enemies_text = f"Enemies: {len(self.enemy_spawner.enemies)} + {self.enemy_spawner.wave_enemies_left} remaining"
-            enemies_surf = font.render(enemies_text, True, (200, 200, 200))
-            self.screen.blit(enemies_surf, (WIDTH - enemies_surf.get_width() - 20, 40))
+            dirty.append(draw_text(self.screen, enemies_text, 20, (200, 200, 200), WIDTH - 20, 40, "topright"))
             
         # Draw debug info if enabled
         if self.debug_mode:
-            font = pygame.font.SysFont('Arial', 14)
-            debug_text = f"DEBUG MODE | FPS: {int(pygame.time.Clock().get_fps())} | F: Skip Wave | G: God Mode"
-            debug_surf = font.render(debug_text, True, DEBUG_COLOR)
-            self.screen.blit(debug_surf, (10, HEIGHT - 20)) 
+            debug_text = f"DEBUG MODE | FPS: {int(self.fps)} | F: Skip Wave | G: God Mode"
+            dirty.append(draw_text(self.screen, debug_text, 14, DEBUG_COLOR, 10, HEIGHT - 20))
+            pool_stats = self.enemy_spawner.pool.stats()
+            pool_text = f"Enemy pool: {pool_stats['live']} live | {pool_stats['free']} free | {pool_stats['high_water']} peak"
+            dirty.append(draw_text(self.screen, pool_text, 14, DEBUG_COLOR, WIDTH - 10, HEIGHT - 20, "topright"))
+            dirty += eventlog.draw_overlay(self.screen)
+            dirty += profiler.draw_overlay(self.screen)
+        
+        return dirty
 
     def _destroy_colliding_enemy(self):
         """Helper method to find and destroy the enemy that collided with the player"""
-        # Find the closest enemy to the player
+        # Find the closest enemy to the player among those within collision range
         min_distance = float('inf')
         colliding_enemy = None
+        collision_range = PLAYER_SIZE + ENEMY_SIZE
+        search_rect = pygame.Rect(0, 0, collision_range * 2, collision_range * 2)
+        search_rect.center = self.player.pos
         
-        for enemy in self.enemy_spawner.enemies:
+        for enemy in self.enemy_spawner.enemies_near(search_rect):
             dist = distance(enemy.pos, self.player.pos)
             if dist < min_distance:
                 min_distance = dist
                 colliding_enemy = enemy
         
         # If we found a close enemy, destroy it
-        if colliding_enemy and min_distance < PLAYER_SIZE + ENEMY_SIZE:
+        if colliding_enemy and min_distance < collision_range:
             self.enemy_spawner.handle_player_collision(colliding_enemy) 
\ No newline at end of file
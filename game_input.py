@@ -0,0 +1,20 @@
+from collections import namedtuple
+
+# Everything Game.update needs from the player for one frame:
+# - keys: held keys, indexable by pygame key constants
+# - mouse_pos: where Shay should follow to
+# - space_pressed / space_released: SPACE went down / up since the last frame
+# - key_presses: other keys that went down since the last frame (debug/restart commands)
+FrameInput = namedtuple("FrameInput", ["keys", "mouse_pos", "space_pressed", "space_released", "key_presses"],
+                        defaults=[()])
+
+class KeyState(frozenset):
+    """Set of held pygame key constants, indexable like pygame.key.get_pressed()"""
+    def __getitem__(self, key):
+        return key in self
+
+NO_KEYS = KeyState()
+
+def idle_input(mouse_pos=(0, 0)):
+    """A frame with no keys held and no SPACE edges"""
+    return FrameInput(NO_KEYS, mouse_pos, False, False)
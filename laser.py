@@ -1,80 +1,80 @@
 import pygame
 import math
-import random
 from settings import *
-from utils import normalize_vector, raycast, vector_to_angle, is_angle_in_arc
+from utils import vector_to_angle
+from sprites import glow_circle, quantize_fraction
+from laser_path import solve_laser_path, stop_at_enemies, trace_to_target
+import eventlog
 
 class Laser:
-    def __init__(self):
+    def __init__(self, rng):
+        self.rng = rng  # The game's random.Random stream
         self.active = False
         self.start_pos = None
         self.shay_pos = None
         self.ricochet_pos = None
         self.end_pos = None
-        self.hit_object = None
         self.ricochet_direction = None
+        # Polyline of the ricochet beam from Shay to end_pos, through any wall bounces
+        self.ricochet_path = []
         self.display_duration = LASER_DISPLAY_DURATION
         self.display_timer = 0
         self.visual_active = False
-        # Reflection effect variables
-        self.reflection_angles = []
-        self.reflection_lengths = []
+        # Reflection effect lines, overwritten in place by every shot
+        self.reflection_angles = [0.0] * REFLECTION_LINE_COUNT
+        self.reflection_lengths = [0.0] * REFLECTION_LINE_COUNT
     
     def fire(self, player_pos, shay_pos, shay, walls, enemies):
-        """Fire a laser from player to shay, then ricochet according to shay's settings"""
-        print(f"Laser firing from {player_pos} to {shay_pos}")
+        """Fire a laser from player to shay, then ricochet according to shay's settings
+        
+        enemies is the EnemyPool; each laser leg tests all enemies at once.
+        """
+        eventlog.SHOT_FIRED.log(player_pos[0], player_pos[1], shay_pos[0], shay_pos[1])
         self.active = True
         self.visual_active = True
         self.display_timer = 0
         self.start_pos = player_pos
         self.shay_pos = shay_pos  # Initially set to target, may be nullified if blocked
-        self.ricochet_direction = None  # Reset ricochet direction
-        
-        # Reset reflection effect
-        self.reflection_angles = []
-        self.reflection_lengths = []
+        self.ricochet_direction = None  # Reset ricochet direction (also hides the reflection effect)
+        self.ricochet_path = []
         
         # Check if laser hits Shay (or is blocked by walls or enemies)
         blocked_by_enemy = self._calculate_path_to_shay(walls, enemies)
         if blocked_by_enemy is True:  # Blocked by wall
             # Laser terminates early due to wall
-            print("Laser blocked by wall before reaching Shay")
             self.active = False
             return None
         elif blocked_by_enemy is not False:  # Blocked by enemy (enemy object returned)
             # Laser terminates early due to enemy
-            print(f"Laser blocked by enemy before reaching Shay")
+            hit_enemy, hit_pos = blocked_by_enemy
+            eventlog.ENEMY_HIT.log(hit_pos[0], hit_pos[1], hit_enemy is not None, "to_shay")
             self.active = False
             # Check if enemy was hit from vulnerable side
-            if blocked_by_enemy[0] is not None:
-                print(f"Enemy hit from vulnerable angle before reaching Shay")
-                return blocked_by_enemy[0]  # Return the enemy to be destroyed
+            if hit_enemy is not None:
+                return hit_enemy  # Return the enemy to be destroyed
             return None
         
         # If we reach here, the laser has successfully reached Shay
         # Calculate ricochet direction using Shay's algorithm
         direction_to_shay = (shay_pos[0] - player_pos[0], shay_pos[1] - player_pos[1])
         self.ricochet_direction = shay.calculate_ricochet_vector(direction_to_shay, player_pos)
-        print(f"Ricochet direction: {self.ricochet_direction}")
+        eventlog.RICOCHET.log(self.ricochet_direction[0], self.ricochet_direction[1])
         
         # Generate reflection effect parameters (after ricochet direction is calculated)
         self._generate_reflection_effect(direction_to_shay)
         
-        # Cast ray from Shay in the ricochet direction
-        hit_pos, hit_obj = raycast(self.shay_pos, self.ricochet_direction, walls)
-        self.end_pos = hit_pos
-        self.hit_object = hit_obj
-        print(f"Ricochet end point: {self.end_pos}")
-        
-        # Check if any enemies were hit by the ricochet and update laser endpoint
-        hit_enemy, blocked_at = self._check_enemy_hits(enemies)
-        if blocked_at:
-            # Update the laser endpoint if it was blocked by an enemy
-            self.end_pos = blocked_at
-            
-        if hit_enemy:
-            print(f"Hit enemy with laser at {hit_enemy.pos}")
+        # Trace the ricochet from Shay, reflecting off walls up to LASER_MAX_BOUNCES times
+        path = solve_laser_path(self.shay_pos, self.ricochet_direction, walls, enemies,
+                                LASER_MAX_BOUNCES, LASER_MAX_LENGTH)
+        self.ricochet_path = path.points
+        self.end_pos = path.points[-1]
+        if path.enemy_index is None:
+            eventlog.WALL_HIT.log(self.end_pos[0], self.end_pos[1], "ricochet")
+            return None
         
+        # The beam was stopped by an enemy, which is destroyed if hit from its vulnerable side
+        hit_enemy = self._enemy_stop(path, enemies)
+        eventlog.ENEMY_HIT.log(self.end_pos[0], self.end_pos[1], hit_enemy is not None, "ricochet")
         return hit_enemy
     
     def _generate_reflection_effect(self, incoming_vector):
@@ -88,19 +88,16 @@ class Laser:
         # The reflection arc will be 180 degrees centered around the reflection angle
         arc_start = (reflection_angle - 90) % 360  # Start 90 degrees to the left of reflection
         
-        # Generate random reflection lines
-        self.reflection_angles = []
-        self.reflection_lengths = []
-        
-        for _ in range(REFLECTION_LINE_COUNT):
+        # Generate random reflection lines into the reused effect lists
+        for i in range(REFLECTION_LINE_COUNT):
             # Random angle within the 180 degree arc centered on reflection angle
-            angle = (arc_start + random.random() * 180) % 360
+            angle = (arc_start + self.rng.random() * 180) % 360
             # Random length (within configured range)
-            length = SHAY_SIZE * (REFLECTION_MIN_LENGTH + random.random() * 
+            length = SHAY_SIZE * (REFLECTION_MIN_LENGTH + self.rng.random() * 
                                  (REFLECTION_MAX_LENGTH - REFLECTION_MIN_LENGTH))
             
-            self.reflection_angles.append(angle)
-            self.reflection_lengths.append(length)
+            self.reflection_angles[i] = angle
+            self.reflection_lengths[i] = length
     
     def _calculate_path_to_shay(self, walls, enemies=None):
         """Calculate if laser from player to Shay hits any walls or enemies
@@ -110,223 +107,48 @@ class Laser:
             - False if path is clear
             - (hit_enemy, hit_pos) tuple if blocked by an enemy
         """
-        # Calculate direction from player to Shay
-        direction_to_shay = (self.shay_pos[0] - self.start_pos[0], self.shay_pos[1] - self.start_pos[1])
-        hit_pos, hit_obj = raycast(self.start_pos, direction_to_shay, walls)
-        
-        # If we hit something that's not near Shay's position, the laser didn't reach Shay
-        dist_to_shay = pygame.math.Vector2(self.shay_pos[0] - self.start_pos[0], 
-                                           self.shay_pos[1] - self.start_pos[1]).length()
-        dist_to_hit = pygame.math.Vector2(hit_pos[0] - self.start_pos[0], 
-                                          hit_pos[1] - self.start_pos[1]).length()
-        
-        # Allow a small margin of error
-        if dist_to_hit < dist_to_shay - 5:
+        # The same beam traces the aim preview (see aim_preview.py)
+        path = trace_to_target(self.start_pos, self.shay_pos, walls)
+        if path.normals[-1] is not None:
             # Hit wall before reaching Shay
-            print(f"Laser hit wall at {hit_pos} before reaching Shay")
-            self.end_pos = hit_pos
-            self.hit_object = hit_obj
+            self.end_pos = path.points[-1]
+            eventlog.WALL_HIT.log(self.end_pos[0], self.end_pos[1], "to_shay")
             self.shay_pos = None  # Explicitly set to None since laser didn't reach Shay
             return True
         
         # Now check for enemies in the path to Shay (if any)
-        if enemies:
-            # Create a rect to represent the path of the laser for initial filtering
-            line_rect = pygame.Rect(
-                min(self.start_pos[0], self.shay_pos[0]),
-                min(self.start_pos[1], self.shay_pos[1]),
-                abs(self.shay_pos[0] - self.start_pos[0]) or 1,  # Ensure non-zero width
-                abs(self.shay_pos[1] - self.start_pos[1]) or 1   # Ensure non-zero height
-            )
-            
-            # Sort enemies by distance from player to check closest ones first
-            sorted_enemies = sorted(enemies, key=lambda e: 
-                pygame.math.Vector2(e.pos[0] - self.start_pos[0], e.pos[1] - self.start_pos[1]).length_squared())
-            
-            closest_hit_enemy = None
-            closest_hit_pos = None
-            closest_distance = float('inf')
-            
-            for enemy in sorted_enemies:
-                # Skip enemies that are definitely not in the laser path
-                if not line_rect.colliderect(enemy.rect):
-                    continue
-                    
-                # Skip enemies in dying state
-                if enemy.state == enemy.STATE_DYING:
-                    continue
-                    
-                # Calculate more precise collision by checking if the enemy is between player and Shay
-                enemy_center = enemy.rect.center
-                
-                # Calculate vector from player to enemy
-                player_to_enemy = (enemy_center[0] - self.start_pos[0], enemy_center[1] - self.start_pos[1])
-                
-                # Calculate vector from player to Shay
-                player_to_shay = (self.shay_pos[0] - self.start_pos[0], self.shay_pos[1] - self.start_pos[1])
-                
-                # Calculate projection of player_to_enemy onto laser direction
-                laser_len_squared = player_to_shay[0]**2 + player_to_shay[1]**2
-                if laser_len_squared < 0.0001:  # Avoid division by zero
-                    continue
-                    
-                projection = (player_to_enemy[0] * player_to_shay[0] + player_to_enemy[1] * player_to_shay[1]) / laser_len_squared
-                
-                # Enemy is not between player and Shay
-                if projection <= 0 or projection >= 1:
-                    continue
-                    
-                # Calculate closest point on laser to enemy
-                closest_point = (
-                    self.start_pos[0] + projection * player_to_shay[0],
-                    self.start_pos[1] + projection * player_to_shay[1]
-                )
-                
-                # Distance from closest point to enemy center
-                dist_to_enemy = pygame.math.Vector2(closest_point[0] - enemy_center[0], 
-                                                   closest_point[1] - enemy_center[1]).length()
-                
-                # Check if closest point is close enough to enemy (half the size plus a small buffer)
-                collision_threshold = ENEMY_SIZE / 2 + 2  # Half enemy size plus small buffer
-                if dist_to_enemy <= collision_threshold:
-                    # Calculate distance from player to this hit point
-                    dist_from_player = pygame.math.Vector2(closest_point[0] - self.start_pos[0], 
-                                                       closest_point[1] - self.start_pos[1]).length()
-                    
-                    # Only consider this hit if it's closer than any previous hit
-                    if dist_from_player < closest_distance:
-                        closest_distance = dist_from_player
-                        closest_hit_pos = closest_point
-                        
-                        # Check if hit is from enemy's vulnerable direction
-                        # Calculate the direction from the hit point to the enemy
-                        hit_to_enemy = normalize_vector((enemy_center[0] - closest_point[0], 
-                                                      enemy_center[1] - closest_point[1]))
-                        incoming_angle = vector_to_angle(hit_to_enemy)
-                        
-                        print(f"Initial laser hit enemy - incoming angle: {incoming_angle}, vulnerable angle: {enemy.vulnerable_angle}")
-                        
-                        if is_angle_in_arc(incoming_angle, enemy.vulnerable_angle, VULNERABLE_ARC_SIZE):
-                            # Enemy is hit from vulnerable direction
-                            print("Enemy hit from vulnerable angle on initial path!")
-                            closest_hit_enemy = enemy
-                        else:
-                            # Enemy blocks laser but is not destroyed
-                            print("Enemy hit but not from vulnerable angle on initial path, laser blocked")
-                            closest_hit_enemy = None
-            
-            # If we found an enemy in the path, return it and the hit position
-            if closest_hit_pos is not None:
-                self.end_pos = closest_hit_pos
+        if enemies is not None:
+            path = stop_at_enemies(path, enemies)
+            if path.enemy_index is not None:
+                self.end_pos = path.points[-1]
                 self.shay_pos = None  # Explicitly set to None since laser didn't reach Shay
-                return (closest_hit_enemy, closest_hit_pos)
+                return (self._enemy_stop(path, enemies), self.end_pos)
         
         return False
     
-    def _check_enemy_hits(self, enemies):
-        """Check if the ricochet laser hits any enemies from their vulnerable direction
-        
-        Returns:
-            tuple: (hit_enemy, blocked_position) - The enemy hit from vulnerable side (or None), 
-                   and the position where the laser was blocked (or None)
-        """
-        if not self.active or not self.ricochet_direction:
-            return None, None
+    def _enemy_stop(self, path, enemies):
+        """Log the enemy that stopped a path, returning it if it was hit from its vulnerable side"""
+        enemy = enemies.views[path.enemy_index]
+        end, last_start = path.points[-1], path.points[-2]
+        incoming_angle = vector_to_angle((last_start[0] - end[0], last_start[1] - end[1]))
+        eventlog.ENEMY_IN_PATH.log(end[0], end[1], incoming_angle, enemy.vulnerable_angle, path.vulnerable)
         
-        # Create a rect to represent the path of the laser for initial filtering
-        line_rect = pygame.Rect(
-            min(self.shay_pos[0], self.end_pos[0]),
-            min(self.shay_pos[1], self.end_pos[1]),
-            abs(self.end_pos[0] - self.shay_pos[0]) or 1,  # Ensure non-zero width
-            abs(self.end_pos[1] - self.shay_pos[1]) or 1   # Ensure non-zero height
-        )
-        
-        # Sort enemies by distance from Shay to check closest ones first
-        sorted_enemies = sorted(enemies, key=lambda e: 
-            pygame.math.Vector2(e.pos[0] - self.shay_pos[0], e.pos[1] - self.shay_pos[1]).length_squared())
-        
-        closest_hit_enemy = None
-        closest_hit_pos = None
-        closest_distance = float('inf')
-        
-        for enemy in sorted_enemies:
-            # Skip enemies that are definitely not in the laser path
-            if not line_rect.colliderect(enemy.rect):
-                continue
-                
-            # Skip enemies in dying state
-            if enemy.state == enemy.STATE_DYING:
-                continue
-                
-            # Calculate more precise collision by checking if the enemy is between shay and end position
-            enemy_center = enemy.rect.center
-            
-            # Calculate vector from Shay to enemy
-            shay_to_enemy = (enemy_center[0] - self.shay_pos[0], enemy_center[1] - self.shay_pos[1])
-            
-            # Calculate vector from Shay to end position
-            shay_to_end = (self.end_pos[0] - self.shay_pos[0], self.end_pos[1] - self.shay_pos[1])
-            
-            # Calculate projection of shay_to_enemy onto laser direction
-            laser_len_squared = shay_to_end[0]**2 + shay_to_end[1]**2
-            if laser_len_squared < 0.0001:  # Avoid division by zero
-                continue
-                
-            projection = (shay_to_enemy[0] * shay_to_end[0] + shay_to_enemy[1] * shay_to_end[1]) / laser_len_squared
-            
-            # Enemy is not between Shay and end position
-            if projection <= 0 or projection >= 1:
-                continue
-                
-            # Calculate closest point on laser to enemy
-            closest_point = (
-                self.shay_pos[0] + projection * shay_to_end[0],
-                self.shay_pos[1] + projection * shay_to_end[1]
-            )
-            
-            # Distance from closest point to enemy center
-            dist_to_enemy = pygame.math.Vector2(closest_point[0] - enemy_center[0], 
-                                               closest_point[1] - enemy_center[1]).length()
-            
-            # Check if closest point is close enough to enemy (half the size plus a small buffer)
-            collision_threshold = ENEMY_SIZE / 2 + 2  # Half enemy size plus small buffer
-            if dist_to_enemy <= collision_threshold:
-                # Calculate distance from Shay to this hit point
-                dist_from_shay = pygame.math.Vector2(closest_point[0] - self.shay_pos[0], 
-                                                   closest_point[1] - self.shay_pos[1]).length()
-                
-                # Only consider this hit if it's closer than any previous hit
-                if dist_from_shay < closest_distance:
-                    closest_distance = dist_from_shay
-                    closest_hit_pos = closest_point
-                    
-                    # Check if hit is from enemy's vulnerable direction
-                    incoming_angle = vector_to_angle(
-                        (-self.ricochet_direction[0], -self.ricochet_direction[1])
-                    )
-                    
-                    print(f"Laser hit enemy - incoming angle: {incoming_angle}, vulnerable angle: {enemy.vulnerable_angle}")
-                    
-                    if is_angle_in_arc(incoming_angle, enemy.vulnerable_angle, VULNERABLE_ARC_SIZE):
-                        # Enemy is hit from vulnerable direction
-                        print("Enemy hit from vulnerable angle!")
-                        closest_hit_enemy = enemy
-                    else:
-                        # Enemy blocks laser but is not destroyed
-                        print("Enemy hit but not from vulnerable angle, laser blocked")
-                        closest_hit_enemy = None
-        
-        # Return the closest enemy hit (if any)
-        return closest_hit_enemy, closest_hit_pos
+        # Enemy is destroyed if hit from its vulnerable direction, otherwise it blocks the laser
+        return enemy if path.vulnerable else None
     
     def deactivate(self):
         """Turn off the laser game logic (but keep visual effect until timer expires)"""
         self.active = False
     
     def draw(self, surface):
-        """Draw the laser beam"""
+        """Draw the laser beam
+        
+        Returns:
+            list: rects of the screen areas drawn on
+        """
+        dirty = []
         if not self.visual_active or not self.start_pos:
-            return
+            return dirty
         
         # Calculate pulse effect based on timer
         time_factor = self.display_timer / self.display_duration
@@ -343,56 +165,50 @@ class Laser:
         impact_glow_radius = int(base_impact_radius * IMPACT_GLOW_MULTIPLIER)
         impact_glow_radius = max(2, impact_glow_radius)  # Ensure minimum glow radius of 2
         
-        # Create the glow surface that will be reused
-        glow_color = (laser_color[0], laser_color[1], laser_color[2], IMPACT_GLOW_ALPHA)
-        glow_surface_size = max(4, impact_glow_radius * 2)  # Minimum size of 4 pixels
-        glow_surface = pygame.Surface((glow_surface_size, glow_surface_size), pygame.SRCALPHA)
-        pygame.draw.circle(
-            glow_surface,
-            glow_color,
-            (glow_surface_size // 2, glow_surface_size // 2),  # Center of the surface
-            impact_glow_radius
-        )
+        # Pre-rendered glow, with its color quantized so the sprite cache can share it
+        glow_green = 50 + int(100 * quantize_fraction(bright_factor))
+        glow_surface = glow_circle(impact_glow_radius, (255, glow_green, glow_green, IMPACT_GLOW_ALPHA))
+        glow_surface_size = glow_surface.get_width()
         
         # Case 1: Laser blocked before reaching Shay (hits wall or enemy)
         if not self.shay_pos:
             # Draw only from player to endpoint
             if self.end_pos:
-                pygame.draw.line(
+                dirty.append(pygame.draw.line(
                     surface,
                     laser_color,
                     self.start_pos,
                     self.end_pos,
                     pulse_width
-                )
+                ))
                 
                 # Draw enhanced impact at end point where laser was blocked
-                surface.blit(
+                dirty.append(surface.blit(
                     glow_surface, 
                     (int(self.end_pos[0] - glow_surface_size // 2), int(self.end_pos[1] - glow_surface_size // 2))
-                )
+                ))
                 
                 # Then draw the main impact circle
-                pygame.draw.circle(
+                dirty.append(pygame.draw.circle(
                     surface, 
                     laser_color, 
                     (int(self.end_pos[0]), int(self.end_pos[1])), 
                     base_impact_radius
-                )
-            return
+                ))
+            return dirty
         
         # Cases 2, 3, 4: Laser reaches Shay
         # Draw line from player to Shay
-        pygame.draw.line(
+        dirty.append(pygame.draw.line(
             surface,
             laser_color,
             self.start_pos,
             self.shay_pos,
             pulse_width
-        )
+        ))
         
         # Draw the reflection effect (3 lines in a 180 degree arc)
-        if self.reflection_angles and self.ricochet_direction:
+        if self.ricochet_direction:
             thin_width = max(1, pulse_width // REFLECTION_LINE_WIDTH_DIVISOR)  # Thinner than the main laser
             reflection_color = laser_color
             
@@ -401,44 +217,45 @@ class Laser:
                 end_x = self.shay_pos[0] + math.cos(angle_rad) * self.reflection_lengths[i]
                 end_y = self.shay_pos[1] + math.sin(angle_rad) * self.reflection_lengths[i]
                 
-                pygame.draw.line(
+                dirty.append(pygame.draw.line(
                     surface,
                     reflection_color,
                     self.shay_pos,
                     (end_x, end_y),
                     thin_width
-                )
+                ))
         
         # Draw reflection line if applicable (cases 2, 3, 4)
         if self.end_pos and self.ricochet_direction:
-            # Draw ricochet line from Shay to end point
-            pygame.draw.line(
+            # Draw ricochet beam from Shay to end point, through any wall bounces
+            dirty.append(pygame.draw.lines(
                 surface,
                 laser_color,
-                self.shay_pos,
-                self.end_pos,
+                False,
+                self.ricochet_path,
                 pulse_width
-            )
+            ))
             
             # Draw enhanced impact at end point of reflection
             # First draw outer glow
-            surface.blit(
+            dirty.append(surface.blit(
                 glow_surface, 
                 (int(self.end_pos[0] - glow_surface_size // 2), int(self.end_pos[1] - glow_surface_size // 2))
-            )
+            ))
             
             # Then draw main impact
-            pygame.draw.circle(
+            dirty.append(pygame.draw.circle(
                 surface, 
                 laser_color, 
                 (int(self.end_pos[0]), int(self.end_pos[1])), 
                 base_impact_radius
-            )
+            ))
+        
+        return dirty
     
     def update(self, dt):
         """Update laser visual effect timer"""
         if self.visual_active:
             self.display_timer += dt
             if self.display_timer >= self.display_duration:
-                self.visual_active = False
-                print("Laser visual effect ended") 
\ No newline at end of file
+                self.visual_active = False 
\ No newline at end of file
@@ -0,0 +1,87 @@
+import math
+from collections import namedtuple
+from settings import *
+from utils import normalize_vector, reflect_vector
+
+# A solved laser beam: the polyline it follows, the surface normal where each
+# segment ended (None where it ended in open space or at its target), and
+# the pool row of the enemy that stopped it (None if no enemy did)
+LaserPath = namedtuple("LaserPath", ["points", "normals", "enemy_index", "vulnerable"])
+
+# A wall closer than this to the target of a beam doesn't count as blocking it
+TARGET_MARGIN = 5
+
+def trace_to_target(start, target, walls):
+    """Straight beam from start to target, cut short by the first wall in the way
+
+    Returns:
+        LaserPath: ending at target, or at the wall (with its normal) if one
+                   is hit more than TARGET_MARGIN before target
+    """
+    hit = walls.cast_ray(start, (target[0] - start[0], target[1] - start[1]))
+    if hit.wall is not None and hit.distance < math.dist(start, target) - TARGET_MARGIN:
+        return LaserPath([start, hit.point], [hit.normal], None, False)
+    return LaserPath([start, target], [None], None, False)
+
+def trace_walls(start, direction, walls, max_bounces=None, max_length=None):
+    """Beam from start along direction, reflecting off walls (utils.reflect_vector)
+
+    It stops after max_bounces reflections or max_length pixels (by default
+    LASER_MAX_BOUNCES and LASER_MAX_LENGTH, read at call time).
+
+    Returns:
+        LaserPath: with no enemy hit
+    """
+    if max_bounces is None:
+        max_bounces = LASER_MAX_BOUNCES
+    if max_length is None:
+        max_length = LASER_MAX_LENGTH
+    direction = normalize_vector(direction)
+    points = [start]
+    normals = []
+    remaining = max_length
+    pos = start
+
+    for bounce in range(max_bounces + 1):
+        hit = walls.cast_ray(pos, direction, remaining)
+        points.append(hit.point)
+        normals.append(hit.normal)
+        remaining -= hit.distance
+        if hit.wall is None or remaining <= 0 or bounce == max_bounces:
+            break
+        direction = reflect_vector(direction, hit.normal)
+        pos = hit.point
+
+    return LaserPath(points, normals, None, False)
+
+def stop_at_enemies(path, enemies):
+    """Cut a path short at the first enemy along it (see EnemyPool.segment_hit)
+
+    Returns:
+        LaserPath: ending at the enemy's hit box with vulnerable True if it
+                   was hit from its vulnerable side, or path itself if no
+                   enemy is in the way
+    """
+    points = path.points
+    for i in range(len(points) - 1):
+        hit = enemies.segment_hit(points[i], points[i + 1])
+        if hit is not None:
+            return LaserPath(points[:i + 1] + [hit.point], path.normals[:i] + [hit.normal],
+                             hit.index, hit.vulnerable)
+    return path
+
+def solve_laser_path(start, direction, walls, enemies=None, max_bounces=None, max_length=None):
+    """Trace a laser beam that reflects off walls and stops at the first enemy
+
+    The first enemy in its way stops the beam, whichever side it is hit from.
+
+    Args:
+        walls: the level's WallIndex
+        enemies: EnemyPool whose enemies can stop the beam, or None
+
+    Returns:
+        LaserPath: with vulnerable True if the stopping enemy was hit from its
+                   vulnerable side
+    """
+    path = trace_walls(start, direction, walls, max_bounces, max_length)
+    return path if enemies is None else stop_at_enemies(path, enemies)
@@ -0,0 +1,223 @@
+"""Level files and their precompiled, cached form
+
+A level is a JSON file in LEVEL_DIR:
+
+    {
+        "name": "Arena",
+        "size": [1024, 768],
+        "player_start": [256, 384],
+        "shay_start": [768, 384],
+        "walls": [[x, y, width, height], ...],
+        "spawn_zones": [[x, y, width, height], ...]
+    }
+
+A spawn zone of zero width or height is a line. Walls can also be given
+as a tile grid, "tile_size": 32 and "tiles": ["####", "#..#", ...], where
+'#' is a wall tile. Loading compiles a level into merged wall rects
+(see merge_walls), a WallIndex and a static background surface. The
+result is kept in memory for restarts and written to LEVEL_CACHE_DIR keyed
+by a hash of the file, so later launches memory-map it instead of
+compiling again.
+"""
+import hashlib
+import json
+import os
+import shutil
+import numpy as np
+import pygame
+from settings import *
+from wall_index import WallIndex
+
+# Bump when the compiled layout changes so stale caches are ignored
+LEVEL_FORMAT_VERSION = 2
+
+# Compiled levels by cache key, so restarts and level switches skip the disk
+_compiled = {}
+
+class Level:
+    """A compiled level: walls, wall index, start points, spawn zones and background"""
+    def __init__(self, name, size, walls, wall_index, player_start, shay_start, spawn_zones, background):
+        self.name = name
+        self.size = size
+        self.walls = walls
+        self.wall_index = wall_index
+        self.player_start = player_start
+        self.shay_start = shay_start
+        self.spawn_zones = spawn_zones
+        self.background = background
+
+def level_path(name):
+    return os.path.join(LEVEL_DIR, name + ".json")
+
+def read_spec(name):
+    """The parsed JSON of a level file"""
+    with open(level_path(name)) as f:
+        return json.load(f)
+
+def load_level(name):
+    """Compiled level for a level file name, from memory, the disk cache or a fresh compile"""
+    with open(level_path(name), "rb") as f:
+        data = f.read()
+    key = _cache_key(data)
+    level = _compiled.get(key)
+    if level is not None:
+        return level
+
+    cache_dir = os.path.join(LEVEL_CACHE_DIR, key)
+    if os.path.isdir(cache_dir):
+        level = _read_compiled(cache_dir)
+    else:
+        level = compile_level(json.loads(data))
+        _write_compiled(level, cache_dir)
+    _compiled[key] = level
+    return level
+
+def compile_level(spec):
+    """Build a Level from a parsed level file (no caching)"""
+    walls = merge_walls(spec.get("walls", []) + tile_walls(spec))
+    size = tuple(spec["size"])
+    return Level(
+        spec["name"],
+        size,
+        walls,
+        WallIndex(walls),
+        tuple(spec["player_start"]),
+        tuple(spec["shay_start"]),
+        [pygame.Rect(zone) for zone in spec["spawn_zones"]],
+        _display_format(render_background(size, walls))
+    )
+
+def merge_walls(walls):
+    """Cover the area of the walls with as few rects as a greedy pass finds
+
+    The wall edges split the level into a grid of cells (coordinate
+    compression), so the grid stays small for tile maps and never exceeds
+    one cell per pixel. Scanning rows top to bottom, each cell not yet
+    covered starts a rect that grows right across wall cells and then down
+    while the whole span is wall. Rects may overlap; their union is exactly
+    the union of the walls. When that finds no fewer rects than given, the
+    walls are kept as they are.
+
+    Returns:
+        list: pygame.Rect walls
+    """
+    rects = [pygame.Rect(wall) for wall in walls]
+    rects = [rect for rect in rects if rect.width > 0 and rect.height > 0]
+    if len(rects) < 2:
+        return rects
+
+    bounds = np.array([(r.left, r.top, r.right, r.bottom) for r in rects])
+    xs = np.unique(bounds[:, [0, 2]])
+    ys = np.unique(bounds[:, [1, 3]])
+    x0, x1 = np.searchsorted(xs, bounds[:, 0]), np.searchsorted(xs, bounds[:, 2])
+    y0, y1 = np.searchsorted(ys, bounds[:, 1]), np.searchsorted(ys, bounds[:, 3])
+
+    # Count walls over each cell with a 2D difference array
+    counts = np.zeros((len(ys), len(xs)), np.int32)
+    np.add.at(counts, (y0, x0), 1)
+    np.add.at(counts, (y0, x1), -1)
+    np.add.at(counts, (y1, x0), -1)
+    np.add.at(counts, (y1, x1), 1)
+    filled = counts.cumsum(0).cumsum(1)[:-1, :-1] > 0
+    rows, cols = filled.shape
+    covered = np.zeros_like(filled)
+
+    cover = []
+    for row in range(rows):
+        col = 0
+        while True:
+            todo = np.flatnonzero(filled[row, col:] & ~covered[row, col:])
+            if not len(todo):
+                break
+            start = col + todo[0]
+            run = filled[row, start:]
+            end = start + (len(run) if run.all() else int(run.argmin()))
+            bottom = row + 1
+            while bottom < rows and filled[bottom, start:end].all():
+                bottom += 1
+            covered[row:bottom, start:end] = True
+            cover.append(pygame.Rect(int(xs[start]), int(ys[row]),
+                                     int(xs[end] - xs[start]), int(ys[bottom] - ys[row])))
+            col = end
+    return cover if len(cover) < len(rects) else rects
+
+def tile_walls(spec):
+    """Wall rects for the optional tile grid of a level file ('#' marks a wall tile)"""
+    size = spec.get("tile_size", 0)
+    return [
+        (col * size, row * size, size, size)
+        for row, line in enumerate(spec.get("tiles", []))
+        for col, tile in enumerate(line)
+        if tile == "#"
+    ]
+
+def render_background(size, walls):
+    """The static layer of a level: background color with the walls drawn on"""
+    background = pygame.Surface(size)
+    background.fill(BG_COLOR)
+    for wall in walls:
+        pygame.draw.rect(background, WALL_COLOR, wall)
+    return background
+
+def _display_format(surface):
+    """Convert to the display's pixel format for fast blits, when there is a display"""
+    if pygame.display.get_init() and pygame.display.get_surface() is not None:
+        return surface.convert()
+    return surface
+
+def _cache_key(data):
+    """Hash of a level file plus every setting that changes its compiled form"""
+    settings = repr((LEVEL_FORMAT_VERSION, WALL_INDEX_CELL_SIZE, BG_COLOR, WALL_COLOR))
+    return hashlib.sha1(data + settings.encode()).hexdigest()[:16]
+
+def _write_compiled(level, cache_dir):
+    """Save a compiled level as .npy arrays plus a JSON header"""
+    index = level.wall_index
+    temp_dir = f"{cache_dir}.{os.getpid()}.tmp"
+    os.makedirs(temp_dir, exist_ok=True)
+
+    # Per-cell wall lists flattened into one array with cell start offsets
+    offsets = np.cumsum([0] + [len(cell) for cell in index.cells])
+    cell_walls = [i for cell in index.cells for i in cell]
+    np.save(os.path.join(temp_dir, "walls.npy"), np.array([tuple(w) for w in level.walls], np.int32).reshape(-1, 4))
+    np.save(os.path.join(temp_dir, "cell_offsets.npy"), offsets.astype(np.int32))
+    np.save(os.path.join(temp_dir, "cell_walls.npy"), np.array(cell_walls, np.int32))
+    pixels = np.frombuffer(pygame.image.tobytes(level.background, "RGB"), np.uint8)
+    np.save(os.path.join(temp_dir, "background.npy"), pixels.reshape(level.size[1], level.size[0], 3))
+    with open(os.path.join(temp_dir, "level.json"), "w") as f:
+        json.dump({
+            "name": level.name,
+            "size": level.size,
+            "player_start": level.player_start,
+            "shay_start": level.shay_start,
+            "spawn_zones": [tuple(zone) for zone in level.spawn_zones],
+        }, f)
+
+    # Another process may have finished the same level first
+    try:
+        os.rename(temp_dir, cache_dir)
+    except OSError:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+def _read_compiled(cache_dir):
+    """Load a level saved by _write_compiled, memory-mapping its arrays"""
+    def array(name):
+        return np.load(os.path.join(cache_dir, name + ".npy"), mmap_mode="r")
+
+    with open(os.path.join(cache_dir, "level.json")) as f:
+        header = json.load(f)
+    size = tuple(header["size"])
+    walls = [pygame.Rect(wall) for wall in array("walls").tolist()]
+    offsets = array("cell_offsets").tolist()
+    cell_walls = array("cell_walls").tolist()
+    cells = [cell_walls[start:end] for start, end in zip(offsets, offsets[1:])]
+    return Level(
+        header["name"],
+        size,
+        walls,
+        WallIndex(walls, cells=cells),
+        tuple(header["player_start"]),
+        tuple(header["shay_start"]),
+        [pygame.Rect(zone) for zone in header["spawn_zones"]],
+        _display_format(pygame.image.frombuffer(array("background"), size, "RGB"))
+    )
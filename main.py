@@ -1,58 +1,105 @@
+import argparse
 import pygame
 import sys
 from settings import *
 from game import Game
+from level import load_level
+from game_input import FrameInput
+from simulation import Simulation
+from replay import Recorder
+from text import init_fonts
+import sprites
+from renderer import create_renderer
+import profiler
+import eventlog
 
 class Main:
-    def __init__(self):
+    def __init__(self, seed=None, record_path=None, render_mode=RENDER_MODE, profile_path=None, log_path=None,
+                 level_name=DEFAULT_LEVEL):
         pygame.init()
         self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
         pygame.display.set_caption("Ric 'n' Shay")
         self.clock = pygame.time.Clock()
-        self.game = Game(self.screen)
-        # Key press tracking
-        self.space_pressed = False
-        self.space_just_pressed = False
+        init_fonts()
+        sprites.prewarm()
+        self.game = Game(self.screen, seed, load_level(level_name))
+        
+        # Optionally record every simulation step for headless replay
+        self.recorder = Recorder(record_path, self.game.seed, level_name) if record_path else None
+        self.simulation = Simulation(self.game, recorder=self.recorder)
+        self.renderer = create_renderer(self.screen, self.game, render_mode)
+        
+        # Optionally time subsystems, dumping the stats on exit
+        self.profile_path = profile_path
+        profiler.enable(profile_path is not None)
+        
+        # Optionally write game events to a file in the background
+        if log_path:
+            eventlog.open_log(log_path)
         
     def run(self):
         while True:
-            # Reset single-frame press states
-            self.space_just_pressed = False
+            # Single-frame key edges
+            space_pressed = False
+            space_released = False
+            key_presses = []
             
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
+                    if self.recorder:
+                        self.recorder.close()
+                    if self.profile_path:
+                        profiler.dump(self.profile_path)
+                    eventlog.close_log()
                     pygame.quit()
                     sys.exit()
                     
                 # Handle key press events
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_SPACE:
-                        print("SPACE key pressed down")
-                        self.space_pressed = True
-                        self.space_just_pressed = True
+                        eventlog.SPACE_KEY.log(True)
+                        space_pressed = True
+                    else:
+                        key_presses.append(event.key)
                         
                 elif event.type == pygame.KEYUP:
                     if event.key == pygame.K_SPACE:
-                        print("SPACE key released")
-                        self.space_pressed = False
-                
-                self.game.handle_event(event)
+                        eventlog.SPACE_KEY.log(False)
+                        space_released = True
             
             # Update
-            dt = self.clock.tick(FPS) / 1000.0
+            elapsed = self.clock.tick(FPS) / 1000.0
+            self.game.fps = self.clock.get_fps()
+            profiler.begin_frame()
             
-            # Get current keys state
-            keys = pygame.key.get_pressed()
-            
-            # Update game with key states including our SPACE tracking
-            self.game.update(dt, keys, self.space_just_pressed)
+            # Gather this frame's input and run the fixed-timestep simulation
+            frame_input = FrameInput(
+                pygame.key.get_pressed(),
+                pygame.mouse.get_pos(),
+                space_pressed,
+                space_released,
+                tuple(key_presses)
+            )
+            with profiler.scope("update"):
+                self.simulation.advance(elapsed, frame_input)
             
             # Draw
-            self.screen.fill(BG_COLOR)
-            self.game.draw()
-            
-            pygame.display.flip()
+            with profiler.scope("draw"):
+                self.renderer.render()
 
 if __name__ == "__main__":
-    main = Main()
-    main.run() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Ric 'n' Shay")
+    parser.add_argument("--seed", type=int, default=None, help="game RNG seed")
+    parser.add_argument("--level", default=DEFAULT_LEVEL, help="level file name in " + LEVEL_DIR)
+    parser.add_argument("--record", metavar="PATH", default=None, help="record the session for replay.py")
+    parser.add_argument("--renderer", choices=["dirty", "full"], default=RENDER_MODE, help="screen update strategy")
+    parser.add_argument("--profile", metavar="PATH", default=None,
+                        help="time subsystems (overlay with F1) and write stats to PATH (.json or .csv) on exit")
+    parser.add_argument("--log", metavar="PATH", default=None, help="write game events to PATH as JSON lines")
+    parser.add_argument("--log-level", choices=list(eventlog.LEVELS), default=EVENT_LOG_LEVEL,
+                        help="lowest event level recorded")
+    args = parser.parse_args()
+    
+    eventlog.set_level(args.log_level)
+    main = Main(args.seed, args.record, args.renderer, args.profile, args.log, args.level)
+    main.run()
@@ -2,6 +2,8 @@ import pygame
 import math
 from settings import *
 from utils import normalize_vector, distance
+from sprites import fade_square, firing_glow
+import eventlog
 
 # Define player states
 PLAYER_STATE_MOVING = 0
@@ -10,7 +12,7 @@ PLAYER_STATE_FIRING = 1
 class Player:
     def __init__(self, pos, walls):
         self.pos = pos
-        self.walls = walls
+        self.walls = walls  # The level's WallIndex
         self.rect = pygame.Rect(0, 0, PLAYER_SIZE, PLAYER_SIZE)
         self.rect.center = self.pos
         self.health = PLAYER_MAX_HEALTH
@@ -77,33 +79,42 @@ class Player:
                     if self.current_velocity[i] < target_velocity[i]:
                         self.current_velocity[i] = target_velocity[i]
                         
-        # Calculate new position with current velocity and delta time
+        # Move by velocity * dt, sliding along any walls in the way
         if self.current_velocity[0] != 0 or self.current_velocity[1] != 0:
-            new_x = self.pos[0] + self.current_velocity[0] * dt
-            new_y = self.pos[1] + self.current_velocity[1] * dt
+            self.slide(self.current_velocity[0] * dt, self.current_velocity[1] * dt)
             
-            # Check wall collision for X movement
-            temp_rect = self.rect.copy()
-            temp_rect.centerx = new_x
+            # Update rectangle position
+            self.rect.center = self.pos
+    
+    def slide(self, dx, dy):
+        """Move by (dx, dy) with swept collision, so no step is too large to pass through a wall
+        
+        On contact the player stops flush against the wall, loses its velocity
+        into the wall and carries on with the rest of the move along it.
+        """
+        x, y = self.pos
+        half = PLAYER_SIZE / 2
+        while dx != 0 or dy != 0:
+            hit = self.walls.sweep((x - half, y - half, PLAYER_SIZE, PLAYER_SIZE), dx, dy)
+            if hit.wall is None:
+                x += dx
+                y += dy
+                break
             
-            if not any(temp_rect.colliderect(wall) for wall in self.walls):
-                self.pos = (new_x, self.pos[1])
-            else:
-                # Hit wall, stop horizontal movement
+            # Advance to the contact, snapping exactly onto the wall face so the
+            # next sweep can't start a rounding error inside the wall
+            remaining = 1 - hit.t
+            if hit.normal[0] != 0:
+                x = hit.wall.left - half if hit.normal[0] < 0 else hit.wall.right + half
+                y += dy * hit.t
                 self.current_velocity[0] = 0
-            
-            # Check wall collision for Y movement
-            temp_rect = self.rect.copy()
-            temp_rect.centery = new_y
-            
-            if not any(temp_rect.colliderect(wall) for wall in self.walls):
-                self.pos = (self.pos[0], new_y)
+                dx, dy = 0, dy * remaining
             else:
-                # Hit wall, stop vertical movement
+                y = hit.wall.top - half if hit.normal[1] < 0 else hit.wall.bottom + half
+                x += dx * hit.t
                 self.current_velocity[1] = 0
-            
-            # Update rectangle position
-            self.rect.center = self.pos
+                dx, dy = dx * remaining, 0
+        self.pos = (x, y)
     
     def update_laser_cooldown(self, dt):
         if not self.can_fire:
@@ -111,19 +122,18 @@ class Player:
             if self.laser_cooldown_timer >= LASER_COOLDOWN:
                 self.can_fire = True
                 self.laser_cooldown_timer = 0
-                print("Laser ready to fire again")
+                eventlog.LASER_READY.log()
     
     def fire_laser(self, shay_pos):
         if self.can_fire:
             self.can_fire = False
             self.laser_cooldown_timer = 0
-            print(f"Firing laser from {self.pos} to {shay_pos}")
             # Calculate direction vector from Ric to Shay
             direction = (shay_pos[0] - self.pos[0], shay_pos[1] - self.pos[1])
             # Return the direction for the laser to follow
             return direction
         else:
-            print(f"Cannot fire yet. Cooldown: {self.laser_cooldown_timer:.2f}/{LASER_COOLDOWN}")
+            eventlog.SHOT_REJECTED.log(self.laser_cooldown_timer)
         return None
     
     def take_damage(self):
@@ -180,53 +190,35 @@ class Player:
         self.rect.center = self.pos
         
     def draw(self, surface):
+        """Draw the player, its effects and the health/cooldown HUD
+        
+        Returns:
+            list: rects of the screen areas drawn on
+        """
+        dirty = []
+        
         # Draw the player character with alpha if invulnerable
         if self.invulnerable:
-            # Create a surface with alpha
             alpha = 128 + int(127 * math.sin(self.invulnerability_timer * 10))  # Pulsing effect
-            s = pygame.Surface((PLAYER_SIZE, PLAYER_SIZE), pygame.SRCALPHA)
-            s.fill((PLAYER_COLOR[0], PLAYER_COLOR[1], PLAYER_COLOR[2], alpha))
-            surface.blit(s, (self.rect.x, self.rect.y))
+            dirty.append(surface.blit(fade_square(PLAYER_SIZE, PLAYER_COLOR, alpha), (self.rect.x, self.rect.y)))
         else:
             # Draw normal player
-            pygame.draw.rect(surface, PLAYER_COLOR, self.rect)
+            dirty.append(pygame.draw.rect(surface, PLAYER_COLOR, self.rect))
             
             # Add glowing red effect when in firing state
             if self.state == PLAYER_STATE_FIRING:
-                # Create a larger surface for the glow
+                # Pulsing red glow centered on the player
                 glow_size = PLAYER_SIZE * FIRING_GLOW_SIZE_MULTIPLIER
-                glow_surface = pygame.Surface((int(glow_size), int(glow_size)), pygame.SRCALPHA)
-                
-                # Draw a pulsing red circle for the glow effect
                 pulse_range = FIRING_GLOW_PULSE_MAX - FIRING_GLOW_PULSE_MIN
                 pulse_factor = FIRING_GLOW_PULSE_MIN + pulse_range * math.sin(pygame.time.get_ticks() / FIRING_GLOW_PULSE_SPEED)
-                glow_radius = int(glow_size/2 * pulse_factor)
-                glow_center = (int(glow_size/2), int(glow_size/2))
-                
-                # Outer glow
-                pygame.draw.circle(
-                    glow_surface,
-                    FIRING_GLOW_OUTER_COLOR,
-                    glow_center,
-                    glow_radius
-                )
-                
-                # Inner glow
-                pygame.draw.circle(
-                    glow_surface,
-                    FIRING_GLOW_INNER_COLOR,
-                    glow_center,
-                    int(glow_radius * FIRING_GLOW_INNER_RADIUS_FACTOR)
-                )
-                
-                # Blit the glow surface centered on the player
-                surface.blit(
+                glow_surface = firing_glow(int(glow_size/2 * pulse_factor))
+                dirty.append(surface.blit(
                     glow_surface,
                     (
                         self.rect.centerx - glow_surface.get_width() // 2,
                         self.rect.centery - glow_surface.get_height() // 2
                     )
-                )
+                ))
         
         # Draw velocity indicator (motion blur effect)
         if (abs(self.current_velocity[0]) > 50 or abs(self.current_velocity[1]) > 50):
@@ -238,9 +230,6 @@ class Player:
             vel_dir = normalize_vector(self.current_velocity)
             
             # Draw blur trail behind player
-            blur_surf = pygame.Surface((PLAYER_SIZE, PLAYER_SIZE), pygame.SRCALPHA)
-            blur_color = (PLAYER_COLOR[0], PLAYER_COLOR[1], PLAYER_COLOR[2], blur_alpha)
-            
             # Draw a semi-transparent trail
             for i in range(1, 5):
                 trail_pos = (
@@ -254,24 +243,24 @@ class Player:
                     trail_alpha = blur_alpha - (i * 25)
                     if trail_alpha > 0:
                         trail_color = (PLAYER_COLOR[0], PLAYER_COLOR[1], PLAYER_COLOR[2], trail_alpha)
-                        pygame.draw.rect(surface, trail_color, trail_rect)
+                        dirty.append(pygame.draw.rect(surface, trail_color, trail_rect))
         
         # Draw health indicators
         for i in range(self.health):
             health_rect = pygame.Rect(10 + i * 30, 10, 20, 20)
-            pygame.draw.rect(surface, (255, 0, 0), health_rect)
+            dirty.append(pygame.draw.rect(surface, (255, 0, 0), health_rect))
         
         # Draw cooldown indicator
         if not self.can_fire:
             cooldown_percentage = self.laser_cooldown_timer / LASER_COOLDOWN
             cooldown_width = 40 * cooldown_percentage
             cooldown_rect = pygame.Rect(10, 40, cooldown_width, 10)
-            pygame.draw.rect(surface, (150, 150, 255), cooldown_rect)
-            pygame.draw.rect(surface, (100, 100, 200), pygame.Rect(10, 40, 40, 10), 1)
+            dirty.append(pygame.draw.rect(surface, (150, 150, 255), cooldown_rect))
+            dirty.append(pygame.draw.rect(surface, (100, 100, 200), pygame.Rect(10, 40, 40, 10), 1))
         
         # Debug - draw collision rect if debug is enabled
         if DEBUG_MODE:
-            pygame.draw.rect(surface, DEBUG_COLOR, self.rect, 1)
+            dirty.append(pygame.draw.rect(surface, DEBUG_COLOR, self.rect, 1))
             
             # Draw velocity vector
             vel_magnitude = math.sqrt(self.current_velocity[0]**2 + self.current_velocity[1]**2)
@@ -280,4 +269,6 @@ class Player:
                     self.rect.centerx + self.current_velocity[0] * 0.1,
                     self.rect.centery + self.current_velocity[1] * 0.1
                 )
-                pygame.draw.line(surface, (255, 255, 0), self.rect.center, vel_indicator_end, 2) 
\ No newline at end of file
+                dirty.append(pygame.draw.line(surface, (255, 255, 0), self.rect.center, vel_indicator_end, 2))
+        
+        return dirty
\ No newline at end of file
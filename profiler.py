@@ -0,0 +1,200 @@
+"""Named timing scopes with percentile stats and an on-screen flame-bar overlay
+
+Wrap code in 'with profiler.scope("name"):'. While the profiler is
+disabled scope() hands back a shared no-op context manager, so
+instrumented code costs a function call per scope. Caches report each
+lookup with profiler.cache_hit("name", hit) for hit rates.
+
+Profile a session: python main.py --profile profile.json
+"""
+import csv
+import json
+import time
+from collections import deque
+import numpy as np
+import pygame
+from settings import *
+from text import draw_text
+
+_enabled = False
+# Scope name -> deque of its most recent durations in seconds
+_history = {}
+# (name, depth, start offset, duration) of scopes finished in the current / last frame
+_frame = []
+_last_frame = []
+_frame_start = 0.0
+_frame_count = 0
+_depth = 0
+# Cache name -> [hits, misses]
+_cache_counts = {}
+# stats() as last shown by the overlay, refreshed every PROFILER_OVERLAY_REFRESH frames
+_overlay_stats = {}
+
+# Flame bar colors, picked per scope name
+BAR_COLORS = [(230, 120, 60), (90, 170, 230), (120, 200, 100), (200, 110, 200), (230, 200, 80), (100, 210, 200)]
+
+class _Scope:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        global _depth
+        _depth += 1
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        global _depth
+        duration = time.perf_counter() - self.start
+        _depth -= 1
+        history = _history.get(self.name)
+        if history is None:
+            history = _history[self.name] = deque(maxlen=PROFILER_HISTORY)
+        history.append(duration)
+        _frame.append((self.name, _depth, self.start - _frame_start, duration))
+
+class _NullScope:
+    __slots__ = ()
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc_info):
+        pass
+
+_NULL_SCOPE = _NullScope()
+
+def enable(on=True):
+    global _enabled
+    _enabled = on
+
+def is_enabled():
+    return _enabled
+
+def scope(name):
+    """Context manager timing a named block"""
+    if not _enabled:
+        return _NULL_SCOPE
+    return _Scope(name)
+
+def cache_hit(name, hit):
+    """Count a lookup of a named cache as a hit or a miss"""
+    if not _enabled:
+        return
+    counts = _cache_counts.get(name)
+    if counts is None:
+        counts = _cache_counts[name] = [0, 0]
+    counts[0 if hit else 1] += 1
+
+def cache_stats():
+    """Per-cache hit and miss counts and hit rate
+
+    Returns:
+        dict: cache name -> dict of stats
+    """
+    return {
+        name: {"hits": hits, "misses": misses, "hit_rate": round(hits / (hits + misses), 4)}
+        for name, (hits, misses) in _cache_counts.items()
+    }
+
+def begin_frame():
+    """Start a new frame for the overlay, keeping the finished one for display"""
+    global _frame, _last_frame, _frame_start, _frame_count
+    if _frame:
+        _last_frame = _frame
+    _frame = []
+    _frame_count += 1
+    _frame_start = time.perf_counter()
+
+def stats():
+    """Per-scope sample count, mean and p50/p95/p99/max in milliseconds
+
+    Returns:
+        dict: scope name -> dict of stats, slowest p95 first
+    """
+    result = {}
+    for name, history in _history.items():
+        samples = np.fromiter(history, float) * 1000
+        p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+        result[name] = {
+            "count": len(samples),
+            "mean_ms": round(float(samples.mean()), 4),
+            "p50_ms": round(float(p50), 4),
+            "p95_ms": round(float(p95), 4),
+            "p99_ms": round(float(p99), 4),
+            "max_ms": round(float(samples.max()), 4),
+        }
+    return dict(sorted(result.items(), key=lambda item: -item[1]["p95_ms"]))
+
+def dump(path):
+    """Write stats() to path as JSON, or CSV if path ends in .csv
+
+    Cache counters follow: under a "caches" key in JSON, or as a second table in CSV.
+    """
+    scope_stats = stats()
+    caches = cache_stats()
+    with open(path, "w", newline="") as f:
+        if path.endswith(".csv"):
+            writer = csv.writer(f)
+            writer.writerow(["scope", "count", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"])
+            for name, entry in scope_stats.items():
+                writer.writerow([name] + list(entry.values()))
+            if caches:
+                writer.writerow([])
+                writer.writerow(["cache", "hits", "misses", "hit_rate"])
+                for name, entry in caches.items():
+                    writer.writerow([name] + list(entry.values()))
+        else:
+            if caches:
+                scope_stats["caches"] = caches
+            json.dump(scope_stats, f, indent=2)
+
+def draw_overlay(surface):
+    """Draw the last frame's scopes as flame bars plus the slowest scopes' percentiles
+
+    The bar area spans one frame budget (1 / FPS); deeper scopes sit lower.
+
+    Returns:
+        list: rects of the screen areas drawn on
+    """
+    global _overlay_stats
+    dirty = []
+    if not _enabled:
+        return dirty
+    if _frame_count % PROFILER_OVERLAY_REFRESH == 0 or not _overlay_stats:
+        _overlay_stats = stats()
+
+    left = 10
+    width = WIDTH - 20
+    top = HEIGHT - 40 - PROFILER_BAR_HEIGHT * (PROFILER_MAX_DEPTH + 1)
+    scale = width * FPS
+
+    # Frame budget outline
+    budget_rect = pygame.Rect(left, top, width, PROFILER_BAR_HEIGHT * (PROFILER_MAX_DEPTH + 1))
+    dirty.append(pygame.draw.rect(surface, DEBUG_COLOR, budget_rect, 1))
+
+    for name, depth, start, duration in _last_frame:
+        if depth > PROFILER_MAX_DEPTH:
+            continue
+        bar = pygame.Rect(left + int(start * scale), top + depth * PROFILER_BAR_HEIGHT,
+                          max(1, int(duration * scale)), PROFILER_BAR_HEIGHT - 1)
+        bar = bar.clip(budget_rect)
+        if not bar.width:
+            continue
+        color = BAR_COLORS[sum(name.encode()) % len(BAR_COLORS)]
+        dirty.append(pygame.draw.rect(surface, color, bar))
+        if bar.width > 60:
+            dirty.append(draw_text(surface, name, 12, (0, 0, 0), bar.x + 2, bar.y))
+
+    # Slowest scopes, listed above the bars
+    y = top - 16
+    for name, entry in list(_overlay_stats.items())[:PROFILER_OVERLAY_ROWS]:
+        line = f"{name}: p50 {entry['p50_ms']:.2f}  p95 {entry['p95_ms']:.2f}  p99 {entry['p99_ms']:.2f} ms"
+        dirty.append(draw_text(surface, line, 12, DEBUG_COLOR, WIDTH - 10, y, "topright"))
+        y -= 14
+    for name, entry in cache_stats().items():
+        line = f"{name}: {entry['hit_rate']:.0%} hits of {entry['hits'] + entry['misses']}"
+        dirty.append(draw_text(surface, line, 12, DEBUG_COLOR, WIDTH - 10, y, "topright"))
+        y -= 14
+    return dirty
@@ -0,0 +1,172 @@
+import numpy as np
+from collections import namedtuple
+
+# Wall rects packed as a structure of arrays for vectorized ray tests
+WallArrays = namedtuple("WallArrays", ["left", "top", "right", "bottom"])
+
+# Results of a batched ray cast, one row per ray (wall_indices is -1 on a miss)
+RayBatchHits = namedtuple("RayBatchHits", ["points", "distances", "normals", "wall_indices"])
+
+# Upper bound on rays x walls evaluated at once, keeps temporaries small
+MAX_BATCH_ELEMENTS = 1 << 20
+# Segment steps shorter than this along an axis are treated as parallel to it
+PARALLEL_EPSILON = 1e-9
+
+def pack_walls(walls):
+    """Pack wall rects into a WallArrays structure of arrays"""
+    if isinstance(walls, WallArrays):
+        return walls
+    packed = getattr(walls, "packed", None)
+    if packed is not None:
+        return packed
+
+    bounds = np.array([(w.left, w.top, w.right, w.bottom) for w in walls], dtype=float).reshape(-1, 4)
+    return WallArrays(bounds[:, 0], bounds[:, 1], bounds[:, 2], bounds[:, 3])
+
+def _slab_axis(origin, step, low, high):
+    """Entry and exit distances of rays against one axis slab of every wall"""
+    parallel = step == 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t1 = (low - origin) / step
+        t2 = (high - origin) / step
+    t_near = np.minimum(t1, t2)
+    t_far = np.maximum(t1, t2)
+
+    # Rays parallel to the slab either always or never overlap it
+    if parallel.any():
+        inside = (origin >= low) & (origin <= high)
+        t_near = np.where(parallel, np.where(inside, -np.inf, np.inf), t_near)
+        t_far = np.where(parallel, np.where(inside, np.inf, -np.inf), t_far)
+    return t_near, t_far
+
+def raycast_many(origins, directions, walls, max_distance=2000):
+    """Cast many rays against a set of walls in one vectorized call
+
+    Gives the same results as utils.cast_ray applied to each ray in turn.
+
+    Args:
+        origins: (N, 2) array-like of ray start positions
+        directions: (N, 2) array-like of ray directions (need not be normalized)
+        walls: list of rects, a WallIndex or pre-packed WallArrays
+
+    Returns:
+        RayBatchHits: (N, 2) hit points, (N,) distances, (N, 2) surface normals
+                      and (N,) wall indices (-1 and a zero normal where nothing was hit)
+    """
+    origins = np.asarray(origins, dtype=float).reshape(-1, 2)
+    directions = np.asarray(directions, dtype=float).reshape(-1, 2)
+    arrays = pack_walls(walls)
+    ray_count = len(origins)
+    wall_count = len(arrays.left)
+
+    # Normalize directions, leaving zero vectors as zero like normalize_vector
+    lengths = np.sqrt(directions[:, 0] ** 2 + directions[:, 1] ** 2)
+    safe_lengths = np.where(lengths == 0, 1, lengths)
+    directions = np.where(lengths[:, None] == 0, 0, directions / safe_lengths[:, None])
+
+    distances = np.full(ray_count, float(max_distance))
+    wall_indices = np.full(ray_count, -1, dtype=np.int64)
+    normals = np.zeros((ray_count, 2))
+
+    if wall_count and ray_count:
+        chunk = max(1, MAX_BATCH_ELEMENTS // wall_count)
+        for start in range(0, ray_count, chunk):
+            rays = slice(start, start + chunk)
+            ox = origins[rays, 0:1]
+            oy = origins[rays, 1:2]
+            dx = directions[rays, 0:1]
+            dy = directions[rays, 1:2]
+
+            near_x, far_x = _slab_axis(ox, dx, arrays.left, arrays.right)
+            near_y, far_y = _slab_axis(oy, dy, arrays.top, arrays.bottom)
+            t_near = np.maximum(near_x, near_y)
+            t_far = np.minimum(far_x, far_y)
+
+            # Same acceptance rules as utils.ray_rect_intersection
+            valid = (t_near <= t_far) & (t_near >= 0) & (t_near <= max_distance)
+            t_hit = np.where(valid, t_near, np.inf)
+
+            # argmin returns the first of equal distances, matching the scalar scan order
+            nearest = np.argmin(t_hit, axis=1)
+            rows = np.arange(len(nearest))
+            nearest_t = t_hit[rows, nearest]
+            hit = np.isfinite(nearest_t)
+
+            # The entry face is on the x slab unless the y slab was entered strictly later
+            on_x = near_x[rows, nearest] >= near_y[rows, nearest]
+            chunk_normals = np.zeros((len(nearest), 2))
+            chunk_normals[:, 0] = np.where(on_x, np.where(dx[:, 0] > 0, -1, 1), 0)
+            chunk_normals[:, 1] = np.where(on_x, 0, np.where(dy[:, 0] > 0, -1, 1))
+
+            distances[rays] = np.where(hit, nearest_t, max_distance)
+            wall_indices[rays] = np.where(hit, nearest, -1)
+            normals[rays] = np.where(hit[:, None], chunk_normals, 0)
+
+    points = origins + directions * distances[:, None]
+    return RayBatchHits(points, distances, normals, wall_indices)
+
+def _segment_slab(start, step, low, high):
+    """Entry and exit fractions of a single segment through one axis slab of every box"""
+    if step > 0:
+        return (low - start) / step, (high - start) / step
+    if step < 0:
+        return (high - start) / step, (low - start) / step
+    # Parallel segments always or never overlap the slab
+    outside = np.where((low <= start) & (start <= high), -np.inf, np.inf)
+    return outside, -outside
+
+def segment_box_entries(start, end, centers, half_extent):
+    """Where a segment enters each of a set of equal axis-aligned boxes (exact slab test)
+
+    Args:
+        start, end: segment end points
+        centers: (N, 2) array of box centers
+        half_extent: half the width (and height) of every box
+
+    Returns:
+        tuple: (N,) entry fractions along the segment, 0 at start and 1 at end
+               (inf where the segment misses a box, 0 for boxes containing start),
+               and (N,) booleans that are True where the entered face is a
+               left or right side (normal (-sign(dx), 0)) rather than a top or
+               bottom (normal (0, -sign(dy)))
+    """
+    dx = end[0] - start[0]
+    dy = end[1] - start[1]
+    low = centers - half_extent
+    high = centers + half_extent
+    near_x, far_x = _segment_slab(start[0], dx, low[:, 0], high[:, 0])
+    near_y, far_y = _segment_slab(start[1], dy, low[:, 1], high[:, 1])
+    t_near = np.maximum(near_x, near_y)
+    t_far = np.minimum(far_x, far_y)
+    hit = (t_near <= t_far) & (t_far >= 0) & (t_near <= 1)
+
+    # Same face rule as raycast_many: the x slab unless the y slab was entered strictly later
+    return np.where(hit, np.maximum(t_near, 0), np.inf), near_x >= near_y
+
+def segment_box_entries_many(starts, ends, centers, half_extent):
+    """segment_box_entries for many segments at once
+
+    Each slab is entered at (center - start) / step - half_extent / |step|
+    and left at the same plus the half-extent term, which saves sorting the
+    two faces per box. Zero steps become tiny ones, so parallel segments
+    get huge entry and exit fractions of the right signs.
+
+    Args:
+        starts, ends: (M, 2) arrays of segment end points
+        centers: (N, 2) array of box centers
+        half_extent: half the width (and height) of every box
+
+    Returns:
+        ndarray: (M, N) entry fractions of each segment into each box (inf on a miss)
+    """
+    steps = ends - starts
+    steps = np.where(np.abs(steps) < PARALLEL_EPSILON, PARALLEL_EPSILON, steps)
+    inverse = 1 / steps
+    reach = half_extent * np.abs(inverse)
+
+    mid_x = (centers[:, 0] - starts[:, 0:1]) * inverse[:, 0:1]
+    mid_y = (centers[:, 1] - starts[:, 1:2]) * inverse[:, 1:2]
+    t_near = np.maximum(mid_x - reach[:, 0:1], mid_y - reach[:, 1:2])
+    t_far = np.minimum(mid_x + reach[:, 0:1], mid_y + reach[:, 1:2])
+    hit = (t_near <= t_far) & (t_far >= 0) & (t_near <= 1)
+    return np.where(hit, np.maximum(t_near, 0), np.inf)
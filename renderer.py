@@ -0,0 +1,66 @@
+"""Screen presentation strategies for Game
+
+FullRenderer clears and redraws the whole window every frame.
+DirtyRectRenderer keeps the background and walls in a cached static layer,
+restores only the areas drawn on last frame and pushes just the changed
+rects to the display.
+"""
+import pygame
+from settings import *
+import profiler
+
+class FullRenderer:
+    """Fill, redraw everything and flip"""
+    def __init__(self, screen, game):
+        self.screen = screen
+        self.game = game
+
+    def render(self):
+        self.screen.fill(BG_COLOR)
+        self.game.draw_static(self.screen)
+        self.game.draw()
+        with profiler.scope("display.flip"):
+            pygame.display.flip()
+
+class DirtyRectRenderer:
+    """Redraw and present only the screen areas that changed since last frame"""
+    def __init__(self, screen, game):
+        self.screen = screen
+        self.game = game
+        self.static_layer = pygame.Surface(screen.get_size()).convert(screen)
+        self.level_version = None
+        # Areas drawn on last frame, which must be restored this frame
+        self.previous_dirty = []
+
+    def _rebuild_static_layer(self):
+        """Render background and walls once per level"""
+        self.static_layer.fill(BG_COLOR)
+        self.game.draw_static(self.static_layer)
+        self.level_version = self.game.level_version
+
+    def render(self):
+        full_redraw = self.level_version != self.game.level_version
+        if full_redraw:
+            self._rebuild_static_layer()
+            self.screen.blit(self.static_layer, (0, 0))
+        else:
+            # Erase last frame's drawing
+            for rect in self.previous_dirty:
+                self.screen.blit(self.static_layer, rect, rect)
+
+        dirty = [rect for rect in self.game.draw() if rect.width and rect.height]
+        with profiler.scope("display.update"):
+            if full_redraw:
+                pygame.display.flip()
+            else:
+                pygame.display.update(self.previous_dirty + dirty)
+        self.previous_dirty = dirty
+
+RENDERERS = {
+    "full": FullRenderer,
+    "dirty": DirtyRectRenderer,
+}
+
+def create_renderer(screen, game, mode=RENDER_MODE):
+    """Renderer for a mode name in RENDERERS"""
+    return RENDERERS[mode](screen, game)
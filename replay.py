@@ -0,0 +1,146 @@
+"""Compact binary recording and headless replay of game sessions
+
+A recording is the game seed and level name followed by one fixed-size record per simulation
+step: dt, held keys, key edges, mouse position and a hash of the game state
+after the step. Replaying re-runs the inputs headless as fast as possible and
+checks the state hash of every frame.
+
+Replay a recording: python replay.py session.rns
+"""
+import argparse
+import struct
+import time
+import zlib
+import pygame
+from settings import *
+from game import Game
+from level import load_level
+from game_input import FrameInput, KeyState
+
+# Format tag; the digit is bumped whenever a change to the simulation makes older recordings desync
+MAGIC = b"RNS6"
+HEADER = struct.Struct("<4sq32s")  # magic, game seed, level file name
+FRAME = struct.Struct("<dBBhhI")   # dt, held keys, key edges, mouse x, mouse y, state hash
+
+# Bit positions of the held keys Game.update reads
+HELD_KEYS = [pygame.K_w, pygame.K_a, pygame.K_s, pygame.K_d, pygame.K_q, pygame.K_e]
+# Bit positions of key edges: SPACE down/up, then the command keys
+EDGE_SPACE_PRESSED = 1
+EDGE_SPACE_RELEASED = 2
+COMMAND_KEYS = [pygame.K_F1, pygame.K_f, pygame.K_g, pygame.K_r]
+
+class ReplayDesync(Exception):
+    """A replayed frame produced a different game state than was recorded"""
+    def __init__(self, frame, expected, actual):
+        super().__init__(f"State hash mismatch at frame {frame}: recorded {expected:08x}, replayed {actual:08x}")
+        self.frame = frame
+
+def state_hash(game):
+    """CRC32 of the simulation state that must match between a run and its replay"""
+    player = game.player
+    shay = game.shay
+    spawner = game.enemy_spawner
+    pool = spawner.pool
+    crc = zlib.crc32(struct.pack(
+        "<6d6i?d",
+        player.pos[0], player.pos[1], player.current_velocity[0], player.current_velocity[1],
+        shay.pos[0], shay.pos[1],
+        player.health, player.state, game.game_state, spawner.current_wave, spawner.wave_enemies_left, pool.count,
+        player.can_fire, shay.ricochet_angle
+    ))
+    for array in (pool.pos, pool.state, pool.death_timer):
+        crc = zlib.crc32(array[:pool.count].tobytes(), crc)
+    return crc
+
+def encode_input(frame_input):
+    """Pack a FrameInput into (held key bits, edge bits, mouse x, mouse y)"""
+    held = 0
+    for bit, key in enumerate(HELD_KEYS):
+        if frame_input.keys[key]:
+            held |= 1 << bit
+    edges = (EDGE_SPACE_PRESSED if frame_input.space_pressed else 0) | \
+            (EDGE_SPACE_RELEASED if frame_input.space_released else 0)
+    for bit, key in enumerate(COMMAND_KEYS):
+        if key in frame_input.key_presses:
+            edges |= 1 << (bit + 2)
+    return held, edges, int(round(frame_input.mouse_pos[0])), int(round(frame_input.mouse_pos[1]))
+
+def decode_input(held, edges, mouse_x, mouse_y):
+    """Inverse of encode_input"""
+    return FrameInput(
+        KeyState(key for bit, key in enumerate(HELD_KEYS) if held & (1 << bit)),
+        (mouse_x, mouse_y),
+        bool(edges & EDGE_SPACE_PRESSED),
+        bool(edges & EDGE_SPACE_RELEASED),
+        tuple(key for bit, key in enumerate(COMMAND_KEYS) if edges & (1 << (bit + 2)))
+    )
+
+class Recorder:
+    """Writes a recording while a Simulation runs (pass it as Simulation(recorder=...))"""
+    def __init__(self, path, seed, level_name=DEFAULT_LEVEL):
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, seed, level_name.encode()))
+        self.frames = 0
+
+    def capture(self, frame_input):
+        """The input as it will be replayed (mouse rounded, unrecorded keys dropped)"""
+        return decode_input(*encode_input(frame_input))
+
+    def write_frame(self, dt, frame_input, game):
+        self.file.write(FRAME.pack(dt, *encode_input(frame_input), state_hash(game)))
+        self.frames += 1
+
+    def close(self):
+        self.file.close()
+
+def read_recording(path):
+    """Return the seed, level name and list of (dt, FrameInput, state hash) records of a recording"""
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, seed, level_name = HEADER.unpack_from(data)
+    if magic[:3] != MAGIC[:3]:
+        raise ValueError(f"{path} is not a recording")
+    if magic != MAGIC:
+        raise ValueError(f"{path} was recorded by an incompatible version of the game "
+                         f"(format {magic.decode(errors='replace')}, this version replays {MAGIC.decode()})")
+    frames = [
+        (dt, decode_input(held, edges, mouse_x, mouse_y), recorded_hash)
+        for dt, held, edges, mouse_x, mouse_y, recorded_hash in FRAME.iter_unpack(data[HEADER.size:])
+    ]
+    return seed, level_name.rstrip(b"\0").decode(), frames
+
+def replay(path, verify=True, until=None):
+    """Re-run a recording headless at full speed
+
+    Args:
+        verify: raise ReplayDesync on the first frame whose state hash differs
+        until: stop after this many frames (fast-forward to a point in the session)
+
+    Returns:
+        Game: the game in its state after the last replayed frame
+    """
+    seed, level_name, frames = read_recording(path)
+    game = Game(screen=None, seed=seed, level=load_level(level_name))
+    for frame, (dt, frame_input, recorded_hash) in enumerate(frames[:until]):
+        game.update(dt, frame_input)
+        if verify:
+            actual = state_hash(game)
+            if actual != recorded_hash:
+                raise ReplayDesync(frame, recorded_hash, actual)
+    return game
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded session headless")
+    parser.add_argument("path", help="recording written by 'python main.py --record PATH'")
+    parser.add_argument("--until", type=int, default=None, help="stop after this many frames")
+    parser.add_argument("--no-verify", action="store_true", help="skip per-frame state hash checks")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    game = replay(args.path, verify=not args.no_verify, until=args.until)
+    elapsed = time.perf_counter() - start
+    print(f"Replayed {args.path} in {elapsed:.2f}s: wave {game.enemy_spawner.current_wave}, "
+          f"health {game.player.health}, state {game.game_state}")
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,11 @@ WIDTH = 1024
 HEIGHT = 768
 FPS = 60
 BG_COLOR = (20, 20, 30)
+RENDER_MODE = 'dirty'  # 'dirty' redraws only changed areas, 'full' redraws the whole screen each frame
+
+# Simulation Settings
+SIM_DT = 1 / FPS  # Fixed timestep in seconds for game logic
+SIM_MAX_STEPS_PER_FRAME = 5  # Most fixed steps run per rendered frame before dropping time
 
 # Player (Ric) Settings
 PLAYER_SPEED = 300
@@ -37,6 +42,18 @@ LASER_INDICATOR_COLOR = (50, 200, 255)
 LASER_WIDTH = 3
 LASER_INDICATOR_WIDTH = 2
 LASER_DISPLAY_DURATION = 0.5  # Seconds that the laser visual effect is displayed
+LASER_MAX_BOUNCES = 0  # Wall reflections of the ricochet beam (0: it stops at the first wall)
+LASER_MAX_LENGTH = 2000  # Pixels the ricochet beam travels at most, over all its bounces
+AIM_PREVIEW_QUANTUM = 2  # Pixels the player or Shay can move before the aim preview is traced again
+AIM_PREVIEW_ANGLE_QUANTUM = 0.5  # Degrees the ricochet heading can turn before the preview is traced again
+
+# Raycast Settings
+WALL_INDEX_CELL_SIZE = 64  # Cell size in pixels of the static wall grid used for raycasts and collisions
+WALL_INDEX_LINEAR_MAX = 128  # Levels with at most this many walls test rect collisions against every wall
+
+# Level Settings
+DEFAULT_LEVEL = 'arena'  # Level file in LEVEL_DIR played when none is given
+WALL_COLOR = (100, 100, 100)
 
 # Laser Impact Effect Settings
 IMPACT_BASE_RADIUS = 20      # Base size of the impact circle
@@ -56,6 +73,14 @@ ENEMY_SIZE = 35
 ENEMY_BASE_SPEED = 50
 ENEMY_COLORS = [(255, 100, 100), (255, 150, 50), (255, 200, 0), (200, 100, 200), (255, 50, 200)]
 VULNERABLE_ARC_SIZE = 90  # Size of the vulnerable arc in degrees
+ENEMY_DEATH_DURATION = 0.5  # Seconds the death animation plays before removal
+ENEMY_HIT_BUFFER = 2  # Extra pixels around an enemy that still count as a laser hit
+ENEMY_GRID_CELL_SIZE = 64  # Cell size in pixels of the enemy spatial hash
+FLOW_FIELD_CELL_SIZE = 32  # Cell size in pixels of the grid enemies path-find on
+ENEMY_SEPARATION_MULTIPLIER = 1.0  # Enemies with centers closer than this times ENEMY_SIZE push each other apart
+ENEMY_SEPARATION_STRENGTH = 0.5  # Fraction of the overlap between two enemies resolved per frame
+ENEMY_SEPARATION_PAIRWISE_MAX = 64  # Crowds of at most this many enemies test every pair for separation
+ENEMY_SCALAR_MAX = 16  # Crowds of at most this many enemies are stepped in plain Python rather than NumPy
 
 # Game State
 GAME_STATE_MENU = 0
@@ -72,6 +97,31 @@ ENEMY_COUNT_BASE = 5
 ENEMY_COUNT_INCREASE = 3  # Additional enemies per wave
 SPAWN_DELAY_BASE = 1.5  # seconds
 SPAWN_DELAY_DECREASE = 0.2  # seconds decrease per wave
+SPAWN_MIN_PLAYER_DISTANCE = 200  # Enemies spawn at least this far from the player
+SPAWN_POINT_SPACING = 4  # Pixels between the precomputed spawn points along a spawn zone
+SPAWN_SAMPLE_TRIES = 8  # Random picks before falling back to a scan for points far enough away
+
+# Text Settings
+FONT_NAME = 'Arial'
+FONT_SIZES = (12, 14, 20, 24, 36, 48)  # Sizes resolved once at startup
+TEXT_CACHE_SIZE = 128  # Most rendered text surfaces kept before evicting the least recently used
+
+# Sprite Cache Settings
+SPRITE_FADE_STEPS = 16  # Effect alpha and fade progress are quantized to this many steps
+ENEMY_SPRITE_ANGLE_STEP = 2  # Degrees between the pre-rendered directions of the enemy arrow
+
+# Profiler Settings
+PROFILER_HISTORY = 600  # Most recent samples kept per timing scope
+PROFILER_BAR_HEIGHT = 14  # Height in pixels of one flame bar row
+PROFILER_MAX_DEPTH = 3  # Deepest nested scope drawn in the overlay
+PROFILER_OVERLAY_ROWS = 8  # Slowest scopes listed with their percentiles
+PROFILER_OVERLAY_REFRESH = 30  # Frames between recomputing the overlay's percentiles
+
+# Event Log Settings
+EVENT_LOG_LEVEL = 'info'  # Lowest level recorded: 'debug', 'info' or 'warning'
+EVENT_LOG_BUFFER = 2048  # Most recent events kept in memory
+EVENT_LOG_FLUSH_INTERVAL = 0.5  # Seconds between background writes to the log file
+EVENT_LOG_OVERLAY_ROWS = 8  # Latest events shown in the debug overlay
 
 # Debug Settings
 DEBUG_MODE = False
@@ -79,4 +129,6 @@ DEBUG_COLOR = (200, 200, 50)
 
 # Paths
 ASSET_DIR = "assets/"
-SOUND_DIR = ASSET_DIR + "sounds/" 
\ No newline at end of file
+SOUND_DIR = ASSET_DIR + "sounds/"
+LEVEL_DIR = "levels/"
+LEVEL_CACHE_DIR = LEVEL_DIR + ".cache/"  # Compiled levels, keyed by file hash 
\ No newline at end of file
@@ -2,6 +2,7 @@ import pygame
 import math
 from settings import *
 from utils import normalize_vector, rotate_vector, vector_to_angle, vector_from_angle
+from text import draw_text
 
 class Shay:
     def __init__(self, pos):
@@ -80,44 +81,33 @@ class Shay:
         elif keys[pygame.K_e]:  # Clockwise rotation
             self.modify_ricochet_angle(clockwise=True)
     
-    def draw(self, surface, player_pos, player_in_firing_state=False):
+    def draw(self, surface, aim_path=None):
+        """Draw Shay and the aim preview
+        
+        aim_path is the polyline a shot would follow (see aim_preview.py), or
+        None when the player isn't firing.
+        
+        Returns:
+            list: rects of the screen areas drawn on
+        """
+        dirty = []
+        
         # Draw Shay
-        pygame.draw.rect(surface, SHAY_COLOR, self.rect)
+        dirty.append(pygame.draw.rect(surface, SHAY_COLOR, self.rect))
         
-        # Calculate and draw ricochet indicator, but only if player is in firing state
-        if player_pos and player_in_firing_state:
-            # Direction from player to Shay
-            to_shay_dir = (self.pos[0] - player_pos[0], self.pos[1] - player_pos[1])
-            to_shay_dir = normalize_vector(to_shay_dir)
-            
-            # Calculate ricochet direction
-            ricochet_dir = self.calculate_ricochet_vector(to_shay_dir, player_pos)
-            
-            # Draw line from player to Shay
-            pygame.draw.line(
+        # Draw the laser path from the player, through Shay, to where it would stop
+        if aim_path and len(aim_path) > 1:
+            dirty.append(pygame.draw.lines(
                 surface,
                 LASER_INDICATOR_COLOR,
-                player_pos,
-                self.pos,
+                False,
+                aim_path,
                 LASER_INDICATOR_WIDTH
-            )
-            
-            # Draw ricochet line from Shay outward
-            end_point = (
-                self.pos[0] + ricochet_dir[0] * 200,
-                self.pos[1] + ricochet_dir[1] * 200
-            )
-            pygame.draw.line(
-                surface,
-                LASER_INDICATOR_COLOR,
-                self.pos,
-                end_point,
-                LASER_INDICATOR_WIDTH
-            )
+            ))
             
         # Debug - show angle value
         if DEBUG_MODE:
-            pygame.draw.rect(surface, DEBUG_COLOR, self.rect, 1)
-            font = pygame.font.SysFont('Arial', 12)
-            angle_text = font.render(f"{self.ricochet_angle:.1f}°", True, DEBUG_COLOR)
-            surface.blit(angle_text, (self.pos[0] + 20, self.pos[1] - 20)) 
\ No newline at end of file
+            dirty.append(pygame.draw.rect(surface, DEBUG_COLOR, self.rect, 1))
+            dirty.append(draw_text(surface, f"{self.ricochet_angle:.1f}°", 12, DEBUG_COLOR, self.pos[0] + 20, self.pos[1] - 20))
+        
+        return dirty
\ No newline at end of file
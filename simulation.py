@@ -0,0 +1,108 @@
+"""Fixed-timestep simulation driver for Game, usable with or without a window
+
+Headless soak test: python simulation.py --seconds 3600
+
+Throughput is bounded by the fixed Python cost of each step, not by the
+amount of simulated time it covers. At the game's own 60 Hz step one
+process runs a few hundred simulated seconds per wall-clock second (the
+suite's 'simulation' benchmark tracks it); thousands per second need a
+coarser step, e.g. --dt 0.1 for soak tests. Balance runs keep SIM_DT so
+the bot plays the game as shipped, and scale out across cores instead.
+"""
+import argparse
+import time
+from settings import *
+from game import Game
+from level import load_level
+from game_input import idle_input
+
+class Simulation:
+    """Steps a Game at a fixed dt, feeding it explicit FrameInputs
+
+    In real-time mode advance() accumulates elapsed wall-clock time and runs
+    as many fixed steps as fit. Headless runs call step() directly and are
+    limited only by CPU speed.
+    """
+    def __init__(self, game, dt=None, max_steps_per_frame=None, recorder=None):
+        self.game = game
+        # Defaults read per simulation, so balance overrides apply
+        self.dt = SIM_DT if dt is None else dt
+        self.recorder = recorder
+        self.max_steps_per_frame = SIM_MAX_STEPS_PER_FRAME if max_steps_per_frame is None else max_steps_per_frame
+        self.accumulator = 0
+        self.time = 0
+        self.steps = 0
+        # Key edges wait here until a step consumes them, so none are lost
+        # on frames too short to run a step
+        self.pending_press = False
+        self.pending_release = False
+        self.pending_key_presses = ()
+
+    @classmethod
+    def headless(cls, dt=None, seed=None, recorder=None, level=None):
+        """Create a simulation of a new game with no display or fonts"""
+        return cls(Game(screen=None, seed=seed, level=level), dt, recorder=recorder)
+
+    def step(self, frame_input):
+        """Advance the game by exactly one fixed step"""
+        if self.recorder:
+            # Feed the game exactly what a replay will see
+            frame_input = self.recorder.capture(frame_input)
+        self.game.update(self.dt, frame_input)
+        if self.recorder:
+            self.recorder.write_frame(self.dt, frame_input, self.game)
+        self.time += self.dt
+        self.steps += 1
+
+    def advance(self, elapsed, frame_input):
+        """Advance by elapsed wall-clock seconds, returning the number of steps run"""
+        self.pending_press = self.pending_press or frame_input.space_pressed
+        self.pending_release = self.pending_release or frame_input.space_released
+        self.pending_key_presses += tuple(frame_input.key_presses)
+        self.accumulator += elapsed
+
+        steps = 0
+        while self.accumulator >= self.dt and steps < self.max_steps_per_frame:
+            # Edges apply to the first step only, held keys to every step
+            self.step(frame_input._replace(space_pressed=self.pending_press,
+                                           space_released=self.pending_release,
+                                           key_presses=self.pending_key_presses))
+            self.pending_press = self.pending_release = False
+            self.pending_key_presses = ()
+            self.accumulator -= self.dt
+            steps += 1
+
+        # Drop time we can't catch up on rather than spiralling
+        if steps == self.max_steps_per_frame:
+            self.accumulator = min(self.accumulator, self.dt)
+        return steps
+
+    def run(self, seconds, input_source=None):
+        """Run for a span of simulated time as fast as possible
+
+        input_source is called with the game before each step and returns the
+        FrameInput for that step (defaults to no input).
+        """
+        for _ in range(int(round(seconds / self.dt))):
+            frame_input = input_source(self.game) if input_source else idle_input()
+            self.step(frame_input)
+            if self.game.game_state in (GAME_STATE_GAME_OVER, GAME_STATE_VICTORY):
+                break
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a headless soak test of the game")
+    parser.add_argument("--seconds", type=float, default=600, help="simulated seconds to run")
+    parser.add_argument("--dt", type=float, default=SIM_DT, help="fixed timestep in seconds")
+    parser.add_argument("--seed", type=int, default=None, help="game RNG seed")
+    parser.add_argument("--level", default=DEFAULT_LEVEL, help="level file name in " + LEVEL_DIR)
+    args = parser.parse_args()
+
+    simulation = Simulation.headless(args.dt, args.seed, level=load_level(args.level))
+    start = time.perf_counter()
+    simulation.run(args.seconds)
+    elapsed = time.perf_counter() - start
+    print(f"Simulated {simulation.time:.1f}s in {simulation.steps} steps, {elapsed:.2f}s wall clock "
+          f"({simulation.time / elapsed:.0f} simulated seconds per second)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+import math
+import numpy as np
+
+def traverse_grid(start_pos, direction, max_distance, origin, cell_size, cols, rows):
+    """Walk the cells of a uniform grid crossed by a ray (Amanatides & Woo DDA)
+
+    The direction must already be normalized.
+
+    Yields:
+        tuple: (col, row, t_exit) for each cell in order along the ray, where
+               t_exit is the ray distance at which the ray leaves the cell
+    """
+    # Clip the ray against the grid bounds so we start in a valid cell
+    t_enter = 0
+    t_leave = max_distance
+    bounds = (
+        (origin[0], origin[0] + cols * cell_size),
+        (origin[1], origin[1] + rows * cell_size)
+    )
+    for axis in range(2):
+        low, high = bounds[axis]
+        if direction[axis] == 0:
+            if start_pos[axis] < low or start_pos[axis] > high:
+                return
+            continue
+        t1 = (low - start_pos[axis]) / direction[axis]
+        t2 = (high - start_pos[axis]) / direction[axis]
+        t_enter = max(t_enter, min(t1, t2))
+        t_leave = min(t_leave, max(t1, t2))
+    if t_enter > t_leave:
+        return
+
+    # Cell containing the (clipped) entry point
+    entry_x = start_pos[0] + direction[0] * t_enter
+    entry_y = start_pos[1] + direction[1] * t_enter
+    col = min(cols - 1, max(0, int((entry_x - origin[0]) // cell_size)))
+    row = min(rows - 1, max(0, int((entry_y - origin[1]) // cell_size)))
+
+    # Distance to the next vertical / horizontal cell boundary and per-cell step
+    if direction[0] > 0:
+        step_col = 1
+        t_max_x = (origin[0] + (col + 1) * cell_size - start_pos[0]) / direction[0]
+        t_delta_x = cell_size / direction[0]
+    elif direction[0] < 0:
+        step_col = -1
+        t_max_x = (origin[0] + col * cell_size - start_pos[0]) / direction[0]
+        t_delta_x = -cell_size / direction[0]
+    else:
+        step_col = 0
+        t_max_x = t_delta_x = math.inf
+
+    if direction[1] > 0:
+        step_row = 1
+        t_max_y = (origin[1] + (row + 1) * cell_size - start_pos[1]) / direction[1]
+        t_delta_y = cell_size / direction[1]
+    elif direction[1] < 0:
+        step_row = -1
+        t_max_y = (origin[1] + row * cell_size - start_pos[1]) / direction[1]
+        t_delta_y = -cell_size / direction[1]
+    else:
+        step_row = 0
+        t_max_y = t_delta_y = math.inf
+
+    while True:
+        t_exit = min(t_max_x, t_max_y, t_leave)
+        yield col, row, t_exit
+        if t_exit >= t_leave:
+            return
+
+        # Step into whichever neighbouring cell the ray reaches first
+        if t_max_x < t_max_y:
+            col += step_col
+            t_max_x += t_delta_x
+        else:
+            row += step_row
+            t_max_y += t_delta_y
+
+        if not (0 <= col < cols and 0 <= row < rows):
+            return
+
+class SpatialHash:
+    """Uniform-grid spatial hash for moving entities
+
+    Entities are bucketed into every cell their bounds overlap and only
+    rebucketed when that cell range changes. Queries return candidates in a
+    stable order; callers do their own exact tests.
+    """
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.cells = {}    # (col, row) -> {entity: None}, an insertion-ordered set
+        self.entries = {}  # entity -> (col_start, row_start, col_end, row_end)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def _cell_range(self, rect):
+        """Inclusive range of cells overlapped by a rect"""
+        return (
+            int(rect.left // self.cell_size),
+            int(rect.top // self.cell_size),
+            int((rect.right - 1) // self.cell_size),
+            int((rect.bottom - 1) // self.cell_size)
+        )
+
+    def _add_to_cells(self, entity, cell_range):
+        col_start, row_start, col_end, row_end = cell_range
+        for row in range(row_start, row_end + 1):
+            for col in range(col_start, col_end + 1):
+                self.cells.setdefault((col, row), {})[entity] = None
+
+    def _remove_from_cells(self, entity, cell_range):
+        col_start, row_start, col_end, row_end = cell_range
+        for row in range(row_start, row_end + 1):
+            for col in range(col_start, col_end + 1):
+                bucket = self.cells[(col, row)]
+                del bucket[entity]
+                if not bucket:
+                    del self.cells[(col, row)]
+
+    def insert(self, entity, rect):
+        """Add an entity with the given bounds"""
+        cell_range = self._cell_range(rect)
+        self.entries[entity] = cell_range
+        self._add_to_cells(entity, cell_range)
+
+    def update(self, entity, rect):
+        """Rebucket an entity if its bounds moved into different cells"""
+        self.update_cells(entity, self._cell_range(rect))
+
+    def update_cells(self, entity, cell_range):
+        """Rebucket an entity into an already computed inclusive cell range, inserting it if needed"""
+        old_range = self.entries.get(entity)
+        if cell_range != old_range:
+            if old_range is not None:
+                self._remove_from_cells(entity, old_range)
+            self._add_to_cells(entity, cell_range)
+            self.entries[entity] = cell_range
+
+    def remove(self, entity):
+        """Remove an entity if it is in the hash"""
+        cell_range = self.entries.pop(entity, None)
+        if cell_range is not None:
+            self._remove_from_cells(entity, cell_range)
+
+    def clear(self):
+        self.cells.clear()
+        self.entries.clear()
+
+    def query_rect(self, rect):
+        """Entities in any cell overlapped by rect"""
+        found = {}
+        col_start, row_start, col_end, row_end = self._cell_range(rect)
+        for row in range(row_start, row_end + 1):
+            for col in range(col_start, col_end + 1):
+                bucket = self.cells.get((col, row))
+                if bucket:
+                    found.update(bucket)
+        return list(found)
+
+# Cell offsets (col, row) covering every neighbouring cell pair once: the
+# cell itself plus half of the eight around it
+HALF_NEIGHBOURHOOD = [(0, 0), (1, -1), (1, 0), (1, 1), (0, 1)]
+
+def neighbour_pairs(positions, radius):
+    """Index pairs (i, j), i != j, of points binned into the same or adjacent grid cells
+
+    Points are binned into cells of size radius, so every pair closer than
+    radius is returned (along with some further apart), each unordered pair
+    once. Fully vectorized: the cost grows with the number of candidate
+    pairs, not with n squared.
+
+    Returns:
+        tuple: (i, j) arrays of point indices
+    """
+    n = len(positions)
+    if n < 2:
+        return np.zeros(0, np.intp), np.zeros(0, np.intp)
+    cells = np.floor(positions / radius).astype(np.intp)
+    # One key per cell, with room for the neighbour offsets
+    cells -= cells.min(axis=0) - 1
+    stride = int(cells[:, 1].max()) + 2
+    keys = cells[:, 0] * stride + cells[:, 1]
+    order = np.argsort(keys, kind="stable")
+
+    # Range of each cell's points in sorted order, from a table over every
+    # cell key (the points span the arena, so the table stays small)
+    cell_counts = np.bincount(keys, minlength=(int(cells[:, 0].max()) + 2) * stride)
+    cell_end = np.cumsum(cell_counts)
+    cell_start = cell_end - cell_counts
+
+    # Sorted range of each half-neighbourhood cell of each point, all offsets at once.
+    # In its own cell a point pairs only with the points sorted after it
+    offsets = np.array([d_col * stride + d_row for d_col, d_row in HALF_NEIGHBOURHOOD])
+    neighbour_keys = (keys + offsets[:, None]).ravel()
+    start = cell_start[neighbour_keys]
+    rank = np.empty(n, np.intp)
+    rank[order] = np.arange(n)
+    start[:n] = rank + 1
+    counts = cell_end[neighbour_keys] - start
+
+    # Expand each range into one row per candidate
+    total = int(counts.sum())
+    first = np.repeat(start - (np.cumsum(counts) - counts), counts)
+    i = np.repeat(np.tile(np.arange(n), len(offsets)), counts)
+    return i, order[first + np.arange(total)]
@@ -0,0 +1,64 @@
+import numpy as np
+import pygame
+from settings import *
+
+class SpawnSampler:
+    """Precomputed enemy spawn points of a level
+
+    The spawn zones are rasterized once into candidate points
+    SPAWN_POINT_SPACING apart, dropping every point where an enemy would
+    overlap a wall. Picking a spawn point is then a random array lookup, with
+    a few quick retries when it lands too close to the player.
+    """
+    def __init__(self, spawn_zones, walls, spacing=None):
+        if spacing is None:
+            spacing = SPAWN_POINT_SPACING  # Read per level, so balance overrides apply
+        if not spawn_zones:
+            raise ValueError("A level needs at least one spawn zone for enemies to enter from")
+        points = np.concatenate([self._zone_points(zone, spacing) for zone in spawn_zones])
+
+        # Keep only points where a whole enemy fits clear of the walls
+        probe = pygame.Rect(0, 0, ENEMY_SIZE, ENEMY_SIZE)
+        valid = np.zeros(len(points), dtype=bool)
+        for i, point in enumerate(points.tolist()):
+            probe.center = point
+            valid[i] = not walls.collides(probe)
+
+        # Zones entirely inside walls still spawn enemies, as before
+        self.points = points[valid] if valid.any() else points
+
+    @staticmethod
+    def _zone_points(zone, spacing):
+        """Grid of points covering a zone (zones may be lines of zero width or height)"""
+        xs = np.arange(zone.left, zone.right + 1, spacing) if zone.width else np.array([zone.left])
+        ys = np.arange(zone.top, zone.bottom + 1, spacing) if zone.height else np.array([zone.top])
+        grid_x, grid_y = np.meshgrid(xs, ys)
+        return np.stack([grid_x.ravel(), grid_y.ravel()], axis=1)
+
+    def __len__(self):
+        return len(self.points)
+
+    def sample(self, rng, player_pos, min_distance=None):
+        """Random spawn point at least min_distance (default SPAWN_MIN_PLAYER_DISTANCE) from the player
+
+        Returns:
+            tuple: (x, y) spawn point (any candidate if none is far enough)
+        """
+        if min_distance is None:
+            min_distance = SPAWN_MIN_PLAYER_DISTANCE
+        points = self.points
+        px, py = player_pos
+        min_distance_sq = min_distance * min_distance
+
+        # Almost every pick on a level-sized ring is far enough away
+        for _ in range(SPAWN_SAMPLE_TRIES):
+            x, y = points[rng.randrange(len(points))].tolist()
+            if (x - px) ** 2 + (y - py) ** 2 >= min_distance_sq:
+                return (x, y)
+
+        # Player is hugging the spawn ring: choose among the points outside the exclusion circle
+        distance_sq = ((points - (px, py)) ** 2).sum(axis=1)
+        far = np.flatnonzero(distance_sq >= min_distance_sq)
+        if not len(far):
+            far = np.arange(len(points))
+        return tuple(points[far[rng.randrange(len(far))]].tolist())
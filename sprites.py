@@ -0,0 +1,125 @@
+"""Pre-rendered translucent effect sprites and enemy bodies
+
+Glows, the invulnerability flash and enemy death fades are drawn onto
+SRCALPHA surfaces. Instead of allocating those every frame, their alpha
+and fade progress are quantized to SPRITE_FADE_STEPS levels and each
+variant is rendered once, so draw code only blits.
+
+Enemy bodies (the square with its direction arrow) are rendered once per
+wave color and ENEMY_SPRITE_ANGLE_STEP bucket of the movement angle.
+"""
+import math
+import numpy as np
+import pygame
+from settings import *
+from cache import LRUCache
+
+_FADE_LEVELS = SPRITE_FADE_STEPS + 1
+# Every key the game can ask for, so a late wave never evicts a sprite it still uses:
+# impact glows (radius x green level), the invulnerability flash, the death fade
+# of each enemy color and the firing glow radii
+SPRITE_CACHE_SIZE = (
+    int((IMPACT_BASE_RADIUS + IMPACT_PULSE_RANGE) * IMPACT_GLOW_MULTIPLIER) * _FADE_LEVELS
+    + _FADE_LEVELS * (1 + len(ENEMY_COLORS))
+    + int(PLAYER_SIZE * FIRING_GLOW_SIZE_MULTIPLIER / 2) + 1
+)
+
+# Rendered sprites keyed by (kind, *parameters)
+_sprites = LRUCache(SPRITE_CACHE_SIZE)
+
+ENEMY_SPRITE_ANGLES = round(360 / ENEMY_SPRITE_ANGLE_STEP)
+
+# Enemy body sprites per color, one slot per angle bucket, filled on first use.
+# They are few enough (colors * angles) to keep them all.
+_enemy_sprites = {}
+
+def quantize_fraction(value):
+    """Snap a 0-1 value to the nearest of SPRITE_FADE_STEPS + 1 levels"""
+    value = min(1.0, max(0.0, value))
+    return round(value * SPRITE_FADE_STEPS) / SPRITE_FADE_STEPS
+
+def quantize_alpha(alpha):
+    """Snap a 0-255 alpha to the nearest quantized level"""
+    return int(round(quantize_fraction(alpha / 255) * 255))
+
+def _get(key, render):
+    sprite = _sprites.get(key)
+    if sprite is None:
+        sprite = render()
+        _sprites.put(key, sprite)
+    return sprite
+
+def fade_square(size, color, alpha):
+    """Square of a solid color with the given (quantized) alpha"""
+    alpha = quantize_alpha(alpha)
+
+    def render():
+        sprite = pygame.Surface((size, size), pygame.SRCALPHA)
+        sprite.fill((color[0], color[1], color[2], alpha))
+        return sprite
+    return _get(("square", size, tuple(color), alpha), render)
+
+def glow_circle(radius, color):
+    """Translucent RGBA circle on a square surface at least 4 pixels wide"""
+    def render():
+        size = max(4, radius * 2)
+        sprite = pygame.Surface((size, size), pygame.SRCALPHA)
+        pygame.draw.circle(sprite, color, (size // 2, size // 2), radius)
+        return sprite
+    return _get(("glow", radius, tuple(color)), render)
+
+def firing_glow(radius):
+    """Player firing glow: outer and inner circles on a PLAYER_SIZE * FIRING_GLOW_SIZE_MULTIPLIER surface"""
+    def render():
+        size = int(PLAYER_SIZE * FIRING_GLOW_SIZE_MULTIPLIER)
+        center = (size // 2, size // 2)
+        sprite = pygame.Surface((size, size), pygame.SRCALPHA)
+        pygame.draw.circle(sprite, FIRING_GLOW_OUTER_COLOR, center, radius)
+        pygame.draw.circle(sprite, FIRING_GLOW_INNER_COLOR, center, int(radius * FIRING_GLOW_INNER_RADIUS_FACTOR))
+        return sprite
+    return _get(("firing", radius), render)
+
+def death_fade(color, progress):
+    """Enemy death sprite, growing and fading out as progress goes from 0 to 1"""
+    progress = quantize_fraction(progress)
+    size = int(ENEMY_SIZE * (1 + progress))
+    return fade_square(size, color, int(255 * (1 - progress)))
+
+def enemy_angle_buckets(angles):
+    """Angle bucket of each movement angle (degrees), as an int array"""
+    return np.rint(np.asarray(angles) / ENEMY_SPRITE_ANGLE_STEP).astype(int) % ENEMY_SPRITE_ANGLES
+
+def _render_enemy(color, bucket):
+    sprite = pygame.Surface((ENEMY_SIZE, ENEMY_SIZE))
+    sprite.fill(color)
+    center = ENEMY_SIZE / 2
+    angle = bucket * ENEMY_SPRITE_ANGLE_STEP
+
+    # Arrow pointing along the movement angle
+    points = []
+    for offset, reach in ((0, 0.5), (-140, 0.3), (140, 0.3)):
+        radians = math.radians(angle + offset)
+        points.append((center + math.cos(radians) * ENEMY_SIZE * reach,
+                       center + math.sin(radians) * ENEMY_SIZE * reach))
+    pygame.draw.polygon(sprite, (255, 255, 255), points)
+    return sprite
+
+def enemy_body(color, bucket):
+    """ENEMY_SIZE square of the enemy's color with its arrow at the bucket's angle"""
+    row = _enemy_sprites.get(color)
+    if row is None:
+        row = _enemy_sprites[color] = [None] * ENEMY_SPRITE_ANGLES
+    sprite = row[bucket]
+    if sprite is None:
+        sprite = row[bucket] = _render_enemy(color, bucket)
+    return sprite
+
+def prewarm():
+    """Render every sprite with a small fixed set of variants up front"""
+    for step in range(SPRITE_FADE_STEPS + 1):
+        progress = step / SPRITE_FADE_STEPS
+        fade_square(PLAYER_SIZE, PLAYER_COLOR, 255 * progress)
+        for color in ENEMY_COLORS:
+            death_fade(color, progress)
+    for radius in range(int(PLAYER_SIZE * FIRING_GLOW_SIZE_MULTIPLIER / 2) + 1):
+        firing_glow(radius)
@@ -0,0 +1,18 @@
+import os
+import sys
+
+import pytest
+
+# Headless pygame, and the flat module layout importable from the repo root
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+@pytest.fixture(autouse=True)
+def repo_root(monkeypatch):
+    """Run every test from the repo root so asset and level paths resolve"""
+    monkeypatch.chdir(ROOT)
@@ -0,0 +1,81 @@
+import random
+
+import pytest
+
+import balance
+from aim_preview import AimPreview
+from enemy import Enemy
+from enemy_pool import EnemyPool
+from laser import Laser
+from level import load_level
+from settings import ENEMY_GRID_CELL_SIZE, RICOCHET_ANGLE_INCREMENT
+from shay import Shay
+from spatial_grid import SpatialHash
+
+@pytest.fixture(params=[0, 3], ids=["no bounces", "3 bounces"])
+def bounces(request):
+    balance.apply_settings_overrides({"LASER_MAX_BOUNCES": request.param})
+    yield request.param
+    balance.apply_settings_overrides({})
+
+def random_enemies(rng, count):
+    pool = EnemyPool(Enemy, SpatialHash(ENEMY_GRID_CELL_SIZE))
+    for _ in range(count):
+        pool.spawn((rng.uniform(40, 984), rng.uniform(40, 728)), 50, 1, rng.uniform(0, 360))
+    return pool
+
+def random_shot(rng):
+    player = (rng.uniform(30, 994), rng.uniform(30, 738))
+    shay = Shay((rng.uniform(30, 994), rng.uniform(30, 738)))
+    shay.ricochet_angle = rng.randrange(16) * RICOCHET_ANGLE_INCREMENT
+    return player, shay
+
+def fired_path(laser):
+    """The polyline a fired laser travelled, in the form AimPreview.path returns"""
+    if laser.shay_pos is None:
+        return [laser.start_pos, laser.end_pos]
+    return [laser.start_pos, laser.shay_pos] + list(laser.ricochet_path[1:])
+
+def assert_same_path(preview, fired):
+    assert len(preview) == len(fired)
+    for point, expected in zip(preview, fired):
+        assert tuple(point) == pytest.approx(tuple(expected))
+
+def test_preview_matches_fired_laser(bounces):
+    rng = random.Random(bounces)
+    walls = load_level("arena").wall_index
+    enemies = random_enemies(rng, 30)
+    laser = Laser(random.Random(0))
+    # Tiny quanta, so every shot below is traced afresh rather than served from the cache
+    preview = AimPreview(quantum=1e-6, angle_quantum=1e-6)
+
+    outcomes = set()
+    for _ in range(300):
+        player, shay = random_shot(rng)
+        path = preview.path(player, shay, walls, 0, enemies)
+        laser.fire(player, shay.pos, shay, walls, enemies)
+        assert_same_path(path, fired_path(laser))
+        outcomes.add((laser.shay_pos is None, len(laser.ricochet_path)))
+    # Shots were blocked before Shay, ricocheted straight and (with bounces) off walls
+    assert len(outcomes) >= (3 if bounces else 2)
+
+def test_cached_preview_follows_enemies_and_level():
+    rng = random.Random(5)
+    walls = load_level("arena").wall_index
+    enemies = random_enemies(rng, 0)
+    laser = Laser(random.Random(0))
+    preview = AimPreview()
+    player, shay = (200, 384), Shay((500, 384))
+
+    first = preview.path(player, shay, walls, 0, enemies)
+    assert preview.path(player, shay, walls, 0, enemies) is first
+
+    # An enemy stepping into the beam changes the pool version, so the path is cut short
+    enemies.spawn((350, 384), 50, 1, 0)
+    path = preview.path(player, shay, walls, 0, enemies)
+    laser.fire(player, shay.pos, shay, walls, enemies)
+    assert laser.shay_pos is None
+    assert_same_path(path, fired_path(laser))
+
+    enemies.clear()
+    assert_same_path(preview.path(player, shay, walls, 1, enemies), first)
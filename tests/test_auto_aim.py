@@ -0,0 +1,63 @@
+import random
+
+import pytest
+
+import balance
+from auto_aim import kill_angles
+from enemy import Enemy
+from enemy_pool import EnemyPool
+from laser import Laser
+from level import load_level
+from settings import ENEMY_GRID_CELL_SIZE, RICOCHET_ANGLE_INCREMENT
+from shay import Shay
+from spatial_grid import SpatialHash
+
+@pytest.fixture(params=[0, 2], ids=["no bounces", "2 bounces"])
+def bounces(request):
+    balance.apply_settings_overrides({"LASER_MAX_BOUNCES": request.param})
+    yield request.param
+    balance.apply_settings_overrides({})
+
+def fired_kills(player, shay, walls, enemies, laser):
+    """{ricochet angle: pool row killed} from firing Laser.fire at every ricochet angle
+
+    Only ricochet kills count: a shot stopped before Shay is the same at every angle.
+    """
+    kills = {}
+    angle = 0
+    while angle < 360:
+        shay.ricochet_angle = angle
+        enemy = laser.fire(player, shay.pos, shay, walls, enemies)
+        if laser.shay_pos is None:
+            return {}
+        if enemy is not None:
+            kills[angle] = enemy.index
+        angle += RICOCHET_ANGLE_INCREMENT
+    return kills
+
+def test_kill_angles_match_laser_fire(bounces):
+    rng = random.Random(bounces)
+    walls = load_level("arena").wall_index
+    laser = Laser(random.Random(0))
+    found = 0
+    for _ in range(40):
+        enemies = EnemyPool(Enemy, SpatialHash(ENEMY_GRID_CELL_SIZE))
+        for _ in range(25):
+            enemies.spawn((rng.uniform(40, 984), rng.uniform(40, 728)), 50, 1, rng.uniform(0, 360))
+        player = (rng.uniform(30, 994), rng.uniform(30, 738))
+        shay = Shay((rng.uniform(30, 994), rng.uniform(30, 738)))
+
+        solutions = kill_angles(player, shay.pos, walls, enemies)
+        expected = fired_kills(player, shay, walls, enemies, laser)
+        assert {solution.angle: solution.enemy_index for solution in solutions} == expected
+        found += len(solutions)
+
+        # Best first: squarest hit on the enemy's back, then shortest beam
+        ranks = [(solution.arc_offset, solution.length) for solution in solutions]
+        assert ranks == sorted(ranks)
+    assert found > 20
+
+def test_no_solutions_without_enemies():
+    walls = load_level("arena").wall_index
+    enemies = EnemyPool(Enemy, SpatialHash(ENEMY_GRID_CELL_SIZE))
+    assert kill_angles((200, 384), (500, 384), walls, enemies) == []
@@ -0,0 +1,100 @@
+import numpy as np
+import pygame
+import pytest
+
+import enemy_pool
+import flow_field
+from enemy import Enemy
+from enemy_pool import EnemyPool, ENEMY_STATE_DYING
+from flow_field import FlowField
+from settings import ENEMY_DEATH_DURATION, ENEMY_GRID_CELL_SIZE
+from spatial_grid import SpatialHash
+
+def make_pool(count, capacity=8):
+    """Pool of count enemies, each with a distinct speed to tell them apart by"""
+    pool = EnemyPool(Enemy, SpatialHash(ENEMY_GRID_CELL_SIZE), capacity)
+    views = [pool.spawn((40 + 13 * i, 60 + 7 * i), 30.0 + i, 1 + i % 3, (i * 37) % 360) for i in range(count)]
+    return pool, views
+
+def assert_consistent(pool):
+    """Every live view points at its own row, and the grid holds exactly the live views"""
+    assert len(pool.views) == pool.count
+    for row, view in enumerate(pool.views):
+        assert view.index == row
+        assert pool.grid.entries[view] == tuple(pool.cell_range[row])
+    assert set(pool.grid.entries) == set(pool.views)
+    for view in pool.free_views:
+        assert view.index == -1 and not view.alive
+
+@pytest.mark.parametrize("removed", [[0], [9], [0, 1, 2], [7, 8, 9], [1, 4, 8], list(range(10))])
+def test_remove_keeps_views_valid(removed):
+    pool, views = make_pool(10)
+    speeds = {view: view.speed for view in views}
+    positions = {view: view.pos for view in views}
+    mask = np.zeros(pool.count, bool)
+    mask[removed] = True
+    gone = [views[i] for i in removed]
+
+    pool._remove(mask)
+
+    assert pool.count == 10 - len(removed)
+    assert_consistent(pool)
+    assert all(not view.alive for view in gone)
+    assert pool.free_views == gone
+    for view in pool.views:
+        # Survivors keep their own data whichever row they now live in
+        assert view.speed == speeds[view]
+        assert view.pos == positions[view]
+
+def test_spawn_reuses_free_views_and_grows():
+    pool, views = make_pool(10, capacity=4)
+    assert pool.capacity >= 10 and [view.speed for view in views] == [30.0 + i for i in range(10)]
+    mask = np.zeros(10, bool)
+    mask[[2, 5]] = True
+    pool._remove(mask)
+
+    reused = pool.spawn((500, 500), 99.0, 2, 90)
+    assert reused is views[5]  # Last freed, first reused
+    assert reused.index == 8 and reused.speed == 99.0 and reused.pos == (500, 500)
+    assert pool.stats() == {"live": 9, "free": 1, "high_water": 10}
+    assert_consistent(pool)
+
+def test_finished_deaths_are_removed():
+    pool, views = make_pool(6)
+    views[1].hit()
+    views[4].hit()
+    assert views[1].state == ENEMY_STATE_DYING
+    pool._advance_deaths(ENEMY_DEATH_DURATION)
+    assert pool.count == 4 and not views[1].alive and not views[4].alive
+    assert_consistent(pool)
+
+def test_clear():
+    pool, views = make_pool(5)
+    pool.clear()
+    assert len(pool) == 0 and pool.views == []
+    assert all(not view.alive for view in views)
+
+def test_small_crowd_update_matches_vectorized(monkeypatch):
+    walls = [pygame.Rect(200, 0, 30, 300), pygame.Rect(350, 250, 200, 30)]
+    field = FlowField(walls, (800, 600))
+    player = (700, 500)
+    field.update(player)
+    pools = [make_pool(12)[0] for _ in range(2)]
+    for pool in pools:
+        pool.pos[3] = pool.pos[4]  # One stacked pair
+        pool.hit(6)
+
+    for _ in range(90):
+        for pool, cutoff in zip(pools, (16, -1)):
+            monkeypatch.setattr(enemy_pool, "ENEMY_SCALAR_MAX", cutoff)
+            monkeypatch.setattr(flow_field, "ENEMY_SCALAR_MAX", cutoff)
+            pool.update(1 / 60, player, field)
+
+    few, many = pools
+    assert few.count == many.count == 11
+    n = few.count
+    np.testing.assert_allclose(few.pos[:n], many.pos[:n], atol=1e-9)
+    np.testing.assert_allclose(few.movement_angle[:n], many.movement_angle[:n], atol=1e-9)
+    np.testing.assert_array_equal(few.cell_range[:n], many.cell_range[:n])
+    assert_consistent(few)
+    assert_consistent(many)
@@ -0,0 +1,53 @@
+import random
+
+import numpy as np
+import pygame
+import pytest
+
+from level import compile_level, merge_walls, read_spec, tile_walls
+
+def coverage(rects, size):
+    """Boolean pixel mask of the union of rects over a size x size area"""
+    mask = np.zeros((size, size), bool)
+    for rect in rects:
+        rect = pygame.Rect(rect)
+        mask[rect.top:rect.bottom, rect.left:rect.right] = True
+    return mask
+
+def tile_spec(seed, density):
+    rng = random.Random(seed)
+    tiles = ["".join("#" if rng.random() < density else "." for _ in range(24)) for _ in range(18)]
+    return {"tile_size": 16, "tiles": tiles}
+
+def wall_sets():
+    rng = random.Random(4)
+    yield "arena", read_spec("arena")["walls"]
+    yield "overlapping", [(rng.randrange(0, 300), rng.randrange(0, 300), rng.randrange(1, 90), rng.randrange(1, 90))
+                          for _ in range(80)]
+    yield "sparse tiles", tile_walls(tile_spec(1, 0.2))
+    yield "dense tiles", tile_walls(tile_spec(2, 0.8))
+    yield "border", tile_walls({"tile_size": 10, "tiles": ["#" * 30] + ["#" + "." * 28 + "#"] * 28 + ["#" * 30]})
+
+@pytest.mark.parametrize("walls", [walls for _, walls in wall_sets()], ids=[name for name, _ in wall_sets()])
+def test_merged_walls_cover_the_same_area(walls):
+    merged = merge_walls(walls)
+    assert len(merged) <= len(walls)
+    assert all(isinstance(rect, pygame.Rect) and rect.width > 0 and rect.height > 0 for rect in merged)
+    np.testing.assert_array_equal(coverage(merged, 1100), coverage(walls, 1100))
+
+def test_tile_runs_merge_into_fewer_rects():
+    walls = tile_walls({"tile_size": 10, "tiles": ["#" * 30] + ["#" + "." * 28 + "#"] * 28 + ["#" * 30]})
+    assert len(merge_walls(walls)) == 4
+
+def test_merge_keeps_walls_that_do_not_merge():
+    walls = [(0, 0, 10, 10), (20, 0, 10, 10), (0, 5, 0, 30)]
+    assert merge_walls(walls) == [pygame.Rect(0, 0, 10, 10), pygame.Rect(20, 0, 10, 10)]
+    assert merge_walls([]) == []
+
+def test_compile_level_combines_walls_and_tiles():
+    spec = dict(read_spec("arena"), **tile_spec(3, 0.3))
+    level = compile_level(spec)
+    sources = spec["walls"] + tile_walls(spec)
+    np.testing.assert_array_equal(coverage(level.walls, 1100), coverage(sources, 1100))
+    assert list(level.wall_index) == level.walls
+    assert level.size == (1024, 768)
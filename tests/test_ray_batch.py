@@ -0,0 +1,82 @@
+import math
+import random
+
+import numpy as np
+import pygame
+import pytest
+
+import ray_batch
+from ray_batch import pack_walls, raycast_many
+from utils import cast_ray
+from wall_index import WallIndex
+
+def build_scene(ray_count, wall_count, seed):
+    """Random walls and rays over a 1600 x 1200 area, a quarter of the rays axis-parallel"""
+    rng = random.Random(seed)
+    walls = [
+        pygame.Rect(rng.randrange(0, 1600), rng.randrange(0, 1200), rng.randrange(4, 100), rng.randrange(4, 100))
+        for _ in range(wall_count)
+    ]
+    origins = []
+    directions = []
+    for i in range(ray_count):
+        origins.append((rng.uniform(0, 1600), rng.uniform(0, 1200)))
+        if i % 4 == 0:
+            directions.append(rng.choice([(1, 0), (-1, 0), (0, 1), (0, -1)]))
+        else:
+            angle = rng.uniform(0, 2 * math.pi)
+            length = rng.uniform(0.5, 3)
+            directions.append((math.cos(angle) * length, math.sin(angle) * length))
+    return walls, origins, directions
+
+def assert_matches_scalar(hits, origins, directions, walls, max_distance):
+    for i, (origin, direction) in enumerate(zip(origins, directions)):
+        expected = cast_ray(origin, direction, walls, max_distance)
+        assert hits.distances[i] == pytest.approx(expected.distance)
+        assert tuple(hits.points[i]) == pytest.approx(expected.point)
+        if expected.wall is None:
+            assert hits.wall_indices[i] == -1
+            assert tuple(hits.normals[i]) == (0, 0)
+        else:
+            # Ties go to the first wall in both, so the index is exact
+            assert walls[hits.wall_indices[i]] is expected.wall
+            assert tuple(hits.normals[i]) == expected.normal
+
+@pytest.mark.parametrize("wall_count", [1, 20, 300])
+def test_matches_scalar_cast_ray(wall_count):
+    walls, origins, directions = build_scene(400, wall_count, seed=wall_count)
+    hits = raycast_many(origins, directions, walls, 800)
+    assert_matches_scalar(hits, origins, directions, walls, 800)
+
+def test_accepts_wall_index_and_packed_walls():
+    walls, origins, directions = build_scene(200, 150, seed=2)
+    expected = raycast_many(origins, directions, walls)
+    for source in (WallIndex(walls), pack_walls(walls)):
+        hits = raycast_many(origins, directions, source)
+        np.testing.assert_array_equal(hits.wall_indices, expected.wall_indices)
+        np.testing.assert_allclose(hits.distances, expected.distances)
+
+def test_chunked_batches_match(monkeypatch):
+    walls, origins, directions = build_scene(300, 50, seed=3)
+    expected = raycast_many(origins, directions, walls)
+    # Force several chunks, including a short last one
+    monkeypatch.setattr(ray_batch, "MAX_BATCH_ELEMENTS", 50 * 7)
+    hits = raycast_many(origins, directions, walls)
+    np.testing.assert_array_equal(hits.wall_indices, expected.wall_indices)
+    np.testing.assert_allclose(hits.distances, expected.distances)
+    np.testing.assert_allclose(hits.normals, expected.normals)
+
+def test_rays_along_wall_edges_and_from_inside():
+    walls = [pygame.Rect(100, 100, 50, 50), pygame.Rect(300, 100, 50, 50)]
+    origins = [(0, 100), (0, 150), (125, 125), (0, 99), (200, 125)]
+    directions = [(1, 0), (1, 0), (1, 0), (1, 0), (0, 0)]
+    hits = raycast_many(origins, directions, walls)
+    assert_matches_scalar(hits, origins, directions, walls, 2000)
+
+def test_no_walls_or_rays():
+    hits = raycast_many([(0, 0), (5, 5)], [(1, 0), (0, 2)], [], 100)
+    np.testing.assert_array_equal(hits.wall_indices, [-1, -1])
+    np.testing.assert_allclose(hits.points, [(100, 0), (5, 105)])
+
+    hits = raycast_many(np.empty((0, 2)), np.empty((0, 2)), [pygame.Rect(0, 0, 10, 10)])
+    assert hits.points.shape == (0, 2) and len(hits.distances) == 0
@@ -0,0 +1,65 @@
+import pytest
+
+from bot import ScriptedBot
+from replay import FRAME, HEADER, MAGIC, Recorder, ReplayDesync, read_recording, replay, state_hash
+from simulation import Simulation
+
+SEED = 42
+
+@pytest.fixture
+def recording(tmp_path):
+    """A 20 s bot session recorded to a file, with the final game of the recorded run"""
+    path = tmp_path / "session.rns"
+    recorder = Recorder(str(path), SEED)
+    sim = Simulation.headless(1 / 60, SEED, recorder=recorder)
+    sim.run(20, ScriptedBot())
+    recorder.close()
+    return path, recorder.frames, sim.game
+
+def tamper(path, offset, out):
+    data = bytearray(path.read_bytes())
+    data[offset] ^= 1
+    out.write_bytes(bytes(data))
+    return out
+
+def test_round_trip_reproduces_the_game(recording):
+    path, frames, game = recording
+    seed, level_name, records = read_recording(str(path))
+    assert seed == SEED and len(records) == frames == 20 * 60
+
+    replayed = replay(str(path))
+    assert state_hash(replayed) == state_hash(game)
+    assert replayed.enemy_spawner.laser_kills == game.enemy_spawner.laser_kills
+    assert replayed.player.pos == game.player.pos
+
+def test_until_stops_at_the_recorded_frame(recording):
+    path, _, _ = recording
+    records = read_recording(str(path))[2]
+    assert state_hash(replay(str(path), until=300)) == records[299][2]
+
+def test_same_seed_runs_match():
+    def run(seed):
+        sim = Simulation.headless(1 / 60, seed)
+        sim.run(10, ScriptedBot())
+        return state_hash(sim.game)
+    assert run(7) == run(7)
+    assert run(7) != run(8)
+
+def test_tampered_input_desyncs_at_that_frame(recording, tmp_path):
+    path, _, _ = recording
+    # Low byte of the mouse x of frame 400: Shay moves, so the state hash differs right away
+    mouse_x = FRAME.size - 8
+    bad = tamper(path, HEADER.size + FRAME.size * 400 + mouse_x, tmp_path / "bad.rns")
+    with pytest.raises(ReplayDesync) as error:
+        replay(str(bad))
+    assert error.value.frame == 400
+
+    # Without verification the replay just runs to the end
+    replay(str(bad), verify=False)
+
+def test_rejects_other_files_and_versions(recording, tmp_path):
+    path, _, _ = recording
+    with pytest.raises(ValueError, match="not a recording"):
+        replay(str(tamper(path, 0, tmp_path / "junk.rns")))
+    with pytest.raises(ValueError, match="incompatible version"):
+        replay(str(tamper(path, len(MAGIC) - 1, tmp_path / "old.rns")))
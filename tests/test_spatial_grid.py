@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from enemy_pool import point_separation_offsets, separation_offsets
+from settings import ENEMY_SEPARATION_PAIRWISE_MAX
+from spatial_grid import neighbour_pairs
+
+def close_pairs(positions, radius):
+    """Every unordered pair (i < j) closer than radius, by brute force"""
+    diff = positions[:, None, :] - positions[None, :, :]
+    dist = np.hypot(diff[..., 0], diff[..., 1])
+    i, j = np.nonzero(np.triu(dist < radius, 1))
+    return set(zip(i.tolist(), j.tolist()))
+
+def scenes():
+    rng = np.random.default_rng(17)
+    yield "spread", rng.uniform(0, 1200, (500, 2))
+    yield "clustered", rng.normal(400, 30, (400, 2))
+    yield "negative", rng.uniform(-900, -100, (300, 2))
+    # Exactly stacked points and points on cell borders
+    stacked = np.repeat(rng.uniform(0, 200, (20, 2)), 4, axis=0)
+    yield "stacked", np.vstack([stacked, np.arange(0, 400, 20.0).reshape(-1, 2)])
+
+@pytest.mark.parametrize("name, positions", list(scenes()), ids=[name for name, _ in scenes()])
+@pytest.mark.parametrize("radius", [8.0, 20.0, 55.5])
+def test_neighbour_pairs_cover_all_close_pairs(name, positions, radius):
+    i, j = neighbour_pairs(positions, radius)
+    pairs = [tuple(sorted(pair)) for pair in zip(i.tolist(), j.tolist())]
+
+    assert all(a != b for a, b in pairs)
+    assert len(pairs) == len(set(pairs)), "each unordered pair only once"
+    assert close_pairs(positions, radius) <= set(pairs)
+
+@pytest.mark.parametrize("count", [0, 1])
+def test_neighbour_pairs_too_few_points(count):
+    i, j = neighbour_pairs(np.zeros((count, 2)), 10)
+    assert len(i) == len(j) == 0
+
+@pytest.mark.parametrize("count", [5, 40, ENEMY_SEPARATION_PAIRWISE_MAX + 200])
+def test_separation_offsets_match_plain_python(count):
+    rng = np.random.default_rng(count)
+    positions = rng.uniform(0, 6 * count ** 0.5 * 10, (count, 2))
+    positions[1] = positions[0]  # One stacked pair
+
+    expected = np.array(point_separation_offsets(positions.tolist(), 30, 0.4)).reshape(-1, 2)
+    np.testing.assert_allclose(separation_offsets(positions, 30, 0.4), expected, atol=1e-9)
+    assert np.abs(expected).sum() > 0
+
+def test_separation_offsets_zero_when_nobody_is_close():
+    positions = np.array([(x * 100.0, 0.0) for x in range(50)])
+    np.testing.assert_array_equal(separation_offsets(positions, 30, 0.5), np.zeros_like(positions))
@@ -0,0 +1,32 @@
+import random
+
+import pygame
+import pytest
+
+from level import load_level
+from settings import ENEMY_SIZE
+from spawn_sampler import SpawnSampler
+from wall_index import WallIndex
+
+def test_points_clear_walls_and_keep_away_from_the_player():
+    level = load_level("arena")
+    sampler = SpawnSampler(level.spawn_zones, level.wall_index)
+    probe = pygame.Rect(0, 0, ENEMY_SIZE, ENEMY_SIZE)
+    for point in sampler.points.tolist():
+        probe.center = point
+        assert not level.wall_index.collides(probe)
+
+    rng = random.Random(1)
+    for player in [(512, 384), (60, 60), (50, 400)]:
+        for _ in range(200):
+            x, y = sampler.sample(rng, player, 200)
+            assert (x - player[0]) ** 2 + (y - player[1]) ** 2 >= 200 ** 2
+
+def test_zones_inside_walls_still_spawn():
+    walls = WallIndex([pygame.Rect(0, 0, 100, 100)])
+    sampler = SpawnSampler([pygame.Rect(10, 10, 50, 0)], walls, spacing=10)
+    assert len(sampler) == 6
+
+def test_rejects_levels_without_spawn_zones():
+    with pytest.raises(ValueError, match="spawn zone"):
+        SpawnSampler([], WallIndex([pygame.Rect(0, 0, 10, 10)]))
@@ -0,0 +1,100 @@
+import math
+import random
+
+import pygame
+import pytest
+
+from settings import WALL_INDEX_LINEAR_MAX
+from utils import cast_ray, normalize_vector, ray_rect_intersection, sweep_box_intersection
+from wall_index import WallIndex
+
+def random_walls(count, seed, size=2000):
+    """Scattered axis-aligned walls, some overlapping, over a size x size area"""
+    rng = random.Random(seed)
+    return [
+        pygame.Rect(rng.randrange(0, size), rng.randrange(0, size), rng.randrange(4, 120), rng.randrange(4, 120))
+        for _ in range(count)
+    ]
+
+def random_rays(count, seed, size=2000):
+    rng = random.Random(seed)
+    rays = []
+    for i in range(count):
+        start = (rng.uniform(-100, size + 100), rng.uniform(-100, size + 100))
+        if i % 4 == 0:
+            # Axis-parallel rays take the zero-step slab branch
+            direction = rng.choice([(1, 0), (-1, 0), (0, 1), (0, -1)])
+        else:
+            angle = rng.uniform(0, 2 * math.pi)
+            direction = (math.cos(angle), math.sin(angle))
+        rays.append((start, direction))
+    return rays
+
+@pytest.fixture(params=[60, 400], ids=["linear", "grid"])
+def walls(request):
+    return random_walls(request.param, seed=request.param)
+
+@pytest.mark.parametrize("cell_size", [32, 64, 200])
+def test_cast_ray_matches_linear_scan(walls, cell_size):
+    index = WallIndex(walls, cell_size)
+    for start, direction in random_rays(500, seed=cell_size):
+        expected = cast_ray(start, direction, walls, 1500)
+        hit = index.cast_ray(start, direction, 1500)
+
+        assert hit.distance == pytest.approx(expected.distance)
+        assert hit.point == pytest.approx(expected.point)
+        assert (hit.wall is None) == (expected.wall is None)
+        if hit.wall is not None:
+            # Walls tied at the same distance may come back in either order,
+            # so check the returned wall really is entered at that distance
+            entry = ray_rect_intersection(start, normalize_vector(direction), hit.wall, 1500)
+            assert entry[0] == pytest.approx(hit.distance)
+            assert entry[1] == hit.normal
+
+def test_cast_ray_misses_report_max_distance():
+    index = WallIndex([pygame.Rect(100, 100, 50, 50)])
+    hit = index.cast_ray((0, 0), (-1, 0), 300)
+    assert hit.wall is None and hit.normal is None
+    assert hit.distance == 300
+    assert hit.point == pytest.approx((-300, 0))
+
+def test_collides_matches_colliderect(walls):
+    index = WallIndex(walls)
+    assert (len(walls) <= WALL_INDEX_LINEAR_MAX) == (len(walls) == 60)
+    rng = random.Random(7)
+    for _ in range(2000):
+        rect = pygame.Rect(rng.randrange(-50, 2050), rng.randrange(-50, 2050), rng.randrange(1, 60), rng.randrange(1, 60))
+        assert index.collides(rect) == (rect.collidelist(walls) >= 0)
+
+def test_collides_ignores_touching_edges():
+    index = WallIndex(random_walls(200, seed=3) + [pygame.Rect(3000, 3000, 40, 40)])
+    assert index.collides(pygame.Rect(3010, 3010, 5, 5))
+    assert not index.collides(pygame.Rect(3040, 3000, 10, 40))
+    assert not index.collides(pygame.Rect(2990, 3000, 10, 40))
+
+def test_sweep_matches_linear_scan(walls):
+    index = WallIndex(walls)
+    rng = random.Random(11)
+    for _ in range(1000):
+        rect = (rng.uniform(0, 2000), rng.uniform(0, 2000), rng.uniform(2, 40), rng.uniform(2, 40))
+        dx, dy = rng.uniform(-150, 150), rng.uniform(-150, 150)
+        if rng.random() < 0.25:
+            dx = 0 if rng.random() < 0.5 else dx
+            dy = 0 if dx else dy
+
+        box = (rect[0], rect[1], rect[0] + rect[2], rect[1] + rect[3])
+        hits = [hit for hit in (sweep_box_intersection(box, (dx, dy), wall) for wall in walls) if hit]
+        result = index.sweep(rect, dx, dy)
+        if not hits:
+            assert result.wall is None and result.normal is None and result.t == 1
+        else:
+            best = min(hit[0] for hit in hits)
+            assert result.t == pytest.approx(best)
+            assert sweep_box_intersection(box, (dx, dy), result.wall)[0] == pytest.approx(best)
+
+def test_cells_can_be_reused():
+    walls = random_walls(300, seed=5)
+    index = WallIndex(walls, 48)
+    reused = WallIndex(walls, 48, index.cells)
+    for start, direction in random_rays(100, seed=5):
+        assert reused.cast_ray(start, direction) == index.cast_ray(start, direction)
@@ -0,0 +1,49 @@
+"""Text rendering with fonts resolved once and rendered strings cached
+
+SysFont scans the system font list on every call, and most HUD and menu
+strings are identical from frame to frame, so both fonts and rendered
+surfaces are kept around.
+"""
+import pygame
+from settings import *
+from cache import LRUCache
+
+_fonts = {}
+# Rendered surfaces keyed by (font, text, color, antialias)
+_surfaces = LRUCache(TEXT_CACHE_SIZE)
+
+def init_fonts():
+    """Resolve every font size the game uses (call once after pygame.init)"""
+    pygame.font.init()
+    for size in FONT_SIZES:
+        get_font(size)
+
+def get_font(size):
+    """The game font at a point size, resolved on first use"""
+    font = _fonts.get(size)
+    if font is None:
+        if not pygame.font.get_init():
+            pygame.font.init()
+        font = _fonts[size] = pygame.font.SysFont(FONT_NAME, size)
+    return font
+
+def render_text(text, size, color, antialias=True):
+    """Rendered surface for a string, shared with earlier identical calls
+
+    Returns:
+        pygame.Surface: cached surface, which callers must not draw on
+    """
+    font = get_font(size)
+    key = (font, text, color, antialias)
+    surface = _surfaces.get(key)
+    if surface is None:
+        surface = font.render(text, antialias, color)
+        _surfaces.put(key, surface)
+    return surface
+
+def draw_text(surface, text, size, color, x, y, align="topleft"):
+    """Draw text with its rect's align point (e.g. 'midtop', 'topright') at (x, y)"""
+    text_surface = render_text(text, size, color)
+    text_rect = text_surface.get_rect(**{align: (x, y)})
+    surface.blit(text_surface, text_rect)
+    return text_rect
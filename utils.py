@@ -1,7 +1,13 @@
-import pygame
 import math
+from collections import namedtuple
 from settings import *
 
+# Result of a ray cast: hit point, surface normal, distance travelled and wall hit
+RayHit = namedtuple("RayHit", ["point", "normal", "distance", "wall"])
+
+# Result of sweeping a box: fraction of the move made before contact, contact normal and wall hit
+SweepHit = namedtuple("SweepHit", ["t", "normal", "wall"])
+
 def distance(p1, p2):
     """Calculate the distance between two points"""
     return ((p1[0] - p2[0]) ** 2 + (p1[1] - p2[1]) ** 2) ** 0.5
@@ -63,74 +69,122 @@ def is_angle_in_arc(angle, arc_center, arc_size):
     else:
         return angle >= lower_bound and angle <= upper_bound
 
-def raycast(start_pos, direction, walls, max_distance=2000):
-    """Cast a ray and return the collision point and what was hit"""
-    # Normalize direction
-    direction = normalize_vector(direction)
+def ray_rect_intersection(start_pos, direction, rect, max_distance=2000):
+    """Exact ray vs axis-aligned rect slab test
     
-    # Calculate end point based on direction and max_distance
-    end_pos = (
-        start_pos[0] + direction[0] * max_distance,
-        start_pos[1] + direction[1] * max_distance
-    )
+    The direction must already be normalized. Rays starting inside the rect
+    are ignored, matching how walls are entered from outside.
     
-    # Create a Line for collision detection
-    line = pygame.Rect(
-        min(start_pos[0], end_pos[0]),
-        min(start_pos[1], end_pos[1]),
-        abs(end_pos[0] - start_pos[0]) or 1,  # Ensure non-zero width
-        abs(end_pos[1] - start_pos[1]) or 1   # Ensure non-zero height
-    )
+    Returns:
+        tuple: (distance, normal) of the entry point, or None if the ray misses
+    """
+    t_near = -math.inf
+    t_far = math.inf
+    normal = None
+    
+    for axis, low, high in ((0, rect.left, rect.right), (1, rect.top, rect.bottom)):
+        origin = start_pos[axis]
+        step = direction[axis]
+        if step == 0:
+            # Parallel to this slab, so the origin must already lie inside it
+            if origin < low or origin > high:
+                return None
+            continue
+        
+        t1 = (low - origin) / step
+        t2 = (high - origin) / step
+        if t1 > t2:
+            t1, t2 = t2, t1
+        
+        if t1 > t_near:
+            t_near = t1
+            # The entry face points back against the direction of travel
+            face = -1 if step > 0 else 1
+            normal = (face, 0) if axis == 0 else (0, face)
+        t_far = min(t_far, t2)
+    
+    if t_near > t_far or t_near < 0 or t_near > max_distance:
+        return None
+    return t_near, normal
+
+def sweep_box_intersection(box, delta, rect):
+    """Exact moving box vs axis-aligned rect test (swept AABB)
+    
+    box is (left, top, right, bottom) and moves by delta. Boxes already
+    overlapping the rect, or only sliding along its edge, are ignored so they
+    can move out of or along a wall.
+    
+    Returns:
+        tuple: (t, normal) with t the fraction of delta travelled before contact,
+               or None if the box doesn't touch the rect during the move
+    """
+    t_near = -math.inf
+    t_far = math.inf
+    normal = None
     
-    # Check collision with walls
-    closest_point = end_pos
+    for axis, low, high in ((0, rect.left, rect.right), (1, rect.top, rect.bottom)):
+        box_low = box[axis]
+        box_high = box[axis + 2]
+        step = delta[axis]
+        if step == 0:
+            # Not moving on this axis, so the box must already overlap the slab
+            if box_high <= low or box_low >= high:
+                return None
+            continue
+        
+        if step > 0:
+            t1 = (low - box_high) / step
+            t2 = (high - box_low) / step
+        else:
+            t1 = (high - box_low) / step
+            t2 = (low - box_high) / step
+        
+        if t1 > t_near:
+            t_near = t1
+            # The contact face points back against the direction of travel
+            face = -1 if step > 0 else 1
+            normal = (face, 0) if axis == 0 else (0, face)
+        t_far = min(t_far, t2)
+    
+    if t_near >= t_far or t_near < 0 or t_near > 1:
+        return None
+    return t_near, normal
+
+def cast_ray(start_pos, direction, walls, max_distance=2000):
+    """Cast a ray against a list of wall rects
+    
+    Returns:
+        RayHit: hit point, surface normal, distance and wall (normal and wall
+                are None if nothing was hit before max_distance)
+    """
+    direction = normalize_vector(direction)
+    closest = None
     closest_distance = max_distance
-    collision_object = None
     
     for wall in walls:
-        # Use clipping to find intersection point
-        if line.colliderect(wall):
-            # Calculate intersection - simplified approximation
-            # This is a simplification and may need improvement for exact intersection
-            if direction[0] != 0:
-                # Check horizontal intersections
-                if direction[0] > 0:  # Moving right
-                    x_intersect = wall.left
-                    t = (x_intersect - start_pos[0]) / direction[0]
-                else:  # Moving left
-                    x_intersect = wall.right
-                    t = (x_intersect - start_pos[0]) / direction[0]
-                
-                if 0 <= t <= max_distance:
-                    y_intersect = start_pos[1] + t * direction[1]
-                    if wall.top <= y_intersect <= wall.bottom:
-                        intersection = (x_intersect, y_intersect)
-                        dist = distance(start_pos, intersection)
-                        if dist < closest_distance:
-                            closest_distance = dist
-                            closest_point = intersection
-                            collision_object = wall
-            
-            if direction[1] != 0:
-                # Check vertical intersections
-                if direction[1] > 0:  # Moving down
-                    y_intersect = wall.top
-                    t = (y_intersect - start_pos[1]) / direction[1]
-                else:  # Moving up
-                    y_intersect = wall.bottom
-                    t = (y_intersect - start_pos[1]) / direction[1]
-                
-                if 0 <= t <= max_distance:
-                    x_intersect = start_pos[0] + t * direction[0]
-                    if wall.left <= x_intersect <= wall.right:
-                        intersection = (x_intersect, y_intersect)
-                        dist = distance(start_pos, intersection)
-                        if dist < closest_distance:
-                            closest_distance = dist
-                            closest_point = intersection
-                            collision_object = wall
-    
-    return closest_point, collision_object
+        hit = ray_rect_intersection(start_pos, direction, wall, closest_distance)
+        if hit and (closest is None or hit[0] < closest_distance):
+            closest_distance = hit[0]
+            closest = (hit[1], wall)
+    
+    point = (
+        start_pos[0] + direction[0] * closest_distance,
+        start_pos[1] + direction[1] * closest_distance
+    )
+    if closest is None:
+        return RayHit(point, None, max_distance, None)
+    return RayHit(point, closest[0], closest_distance, closest[1])
+
+def raycast(start_pos, direction, walls, max_distance=2000):
+    """Cast a ray and return the collision point and what was hit
+    
+    walls can be a plain list of rects or a WallIndex built for the level.
+    """
+    if hasattr(walls, "cast_ray"):
+        hit = walls.cast_ray(start_pos, direction, max_distance)
+    else:
+        hit = cast_ray(start_pos, direction, walls, max_distance)
+    return hit.point, hit.wall
 
 def reflect_vector(vector, normal):
     """Reflect a vector against a normal vector"""
@@ -143,21 +197,3 @@ def reflect_vector(vector, normal):
         vector[0] - 2 * dot_product * normal[0],
         vector[1] - 2 * dot_product * normal[1]
     )
-
-def draw_text(surface, text, font, color, x, y, align="topleft"):
-    """Draw text with specified alignment"""
-    text_surface = font.render(text, True, color)
-    text_rect = text_surface.get_rect()
-    
-    if align == "topleft":
-        text_rect.topleft = (x, y)
-    elif align == "center":
-        text_rect.center = (x, y)
-    elif align == "topright":
-        text_rect.topright = (x, y)
-    elif align == "bottomleft":
-        text_rect.bottomleft = (x, y)
-    elif align == "bottomright":
-        text_rect.bottomright = (x, y)
-    
-    surface.blit(text_surface, text_rect) 
\ No newline at end of file
@@ -0,0 +1,166 @@
+import pygame
+from settings import *
+from utils import RayHit, SweepHit, normalize_vector, ray_rect_intersection, sweep_box_intersection
+from spatial_grid import traverse_grid
+from ray_batch import pack_walls
+
+class WallIndex:
+    """Static uniform grid over the level walls, built once per level
+
+    Each cell stores the indices of the walls overlapping it, so a ray or a
+    collision query only tests the walls in the cells it actually touches.
+    Pass cells to reuse the per-cell lists of an earlier index over the same
+    walls. cell_size defaults to WALL_INDEX_CELL_SIZE, read at call time like
+    the level cache key (level._cache_key) that the cells are stored under.
+    """
+    def __init__(self, walls, cell_size=None, cells=None):
+        if cell_size is None:
+            cell_size = WALL_INDEX_CELL_SIZE
+        self.walls = list(walls)
+        self.cell_size = cell_size
+
+        # Grid covers the bounding box of all walls
+        if self.walls:
+            bounds = self.walls[0].unionall(self.walls[1:])
+        else:
+            bounds = pygame.Rect(0, 0, cell_size, cell_size)
+        self.origin = (bounds.left, bounds.top)
+        self.cols = max(1, -(-bounds.width // cell_size))
+        self.rows = max(1, -(-bounds.height // cell_size))
+
+        self._packed = None
+        if cells is None:
+            cells = [[] for _ in range(self.cols * self.rows)]
+            for i, wall in enumerate(self.walls):
+                # Right/bottom edges are inclusive so rays grazing them find the wall
+                col_start, row_start = self._cell_at(wall.left, wall.top)
+                col_end, row_end = self._cell_at(wall.right, wall.bottom)
+                for row in range(row_start, row_end + 1):
+                    for col in range(col_start, col_end + 1):
+                        cells[row * self.cols + col].append(i)
+        self.cells = cells
+        # The same cells as lists of rects, for Rect.collidelist
+        self.cell_rects = [[self.walls[i] for i in cell] for cell in cells]
+
+    def __iter__(self):
+        return iter(self.walls)
+
+    def __len__(self):
+        return len(self.walls)
+
+    @property
+    def packed(self):
+        """Walls as a WallArrays structure of arrays for batched ray queries"""
+        if self._packed is None:
+            self._packed = pack_walls(self.walls)
+        return self._packed
+
+    def _cell_at(self, x, y):
+        """Grid cell containing a point, clamped to the grid"""
+        col = int((x - self.origin[0]) // self.cell_size)
+        row = int((y - self.origin[1]) // self.cell_size)
+        return (
+            min(self.cols - 1, max(0, col)),
+            min(self.rows - 1, max(0, row))
+        )
+
+    def _cell_range(self, left, top, right, bottom):
+        """Inclusive (col_start, row_start, col_end, row_end) of the cells overlapped by a box"""
+        col_start, row_start = self._cell_at(left, top)
+        col_end, row_end = self._cell_at(right, bottom)
+        return col_start, row_start, col_end, row_end
+
+    def collides(self, rect):
+        """True if rect overlaps any wall (touching edges don't count, as with Rect.colliderect)"""
+        if len(self.walls) <= WALL_INDEX_LINEAR_MAX:
+            return rect.collidelist(self.walls) >= 0
+
+        # Integer cell range, inlined from _cell_at (with plain comparisons
+        # instead of min/max) as this runs several times per frame
+        left, top = self.origin
+        size = self.cell_size
+        cols = self.cols
+        col_start = (rect.left - left) // size
+        col_end = (rect.right - left) // size
+        row_start = (rect.top - top) // size
+        row_end = (rect.bottom - top) // size
+        if col_start < 0:
+            col_start = 0
+        if row_start < 0:
+            row_start = 0
+        if col_end >= cols:
+            col_end = cols - 1
+        if row_end >= self.rows:
+            row_end = self.rows - 1
+        for row in range(row_start, row_end + 1):
+            first = row * cols
+            for walls in self.cell_rects[first + col_start:first + col_end + 1]:
+                if rect.collidelist(walls) >= 0:
+                    return True
+        return False
+
+    def sweep(self, rect, dx, dy):
+        """Move a box by (dx, dy) and return the first wall it runs into
+
+        rect is a pygame.Rect or a (left, top, width, height) sequence, which
+        may hold floats. Walls the box already overlaps are ignored.
+
+        Returns:
+            SweepHit: fraction of the move made before contact, contact normal
+                      and wall (t is 1 and normal and wall are None if the move is free)
+        """
+        left, top, width, height = rect
+        box = (left, top, left + width, top + height)
+        closest = SweepHit(1, None, None)
+        tested = set()
+
+        # Only walls in cells touched by the swept bounds can be hit
+        col_start, row_start, col_end, row_end = self._cell_range(
+            min(left, left + dx), min(top, top + dy), max(box[2], box[2] + dx), max(box[3], box[3] + dy))
+        for row in range(row_start, row_end + 1):
+            for col in range(col_start, col_end + 1):
+                for i in self.cells[row * self.cols + col]:
+                    if i in tested:
+                        continue
+                    tested.add(i)
+
+                    hit = sweep_box_intersection(box, (dx, dy), self.walls[i])
+                    if hit and (closest.wall is None or hit[0] < closest.t):
+                        closest = SweepHit(hit[0], hit[1], self.walls[i])
+        return closest
+
+    def cast_ray(self, start_pos, direction, max_distance=2000):
+        """Cast a ray through the grid and return the closest wall hit
+
+        Returns:
+            RayHit: hit point, surface normal, distance and wall (normal and wall
+                    are None if nothing was hit before max_distance)
+        """
+        direction = normalize_vector(direction)
+        closest = None
+        closest_distance = max_distance
+        tested = set()
+
+        for col, row, t_exit in traverse_grid(start_pos, direction, max_distance, self.origin,
+                                              self.cell_size, self.cols, self.rows):
+            for i in self.cells[row * self.cols + col]:
+                if i in tested:
+                    continue
+                tested.add(i)
+
+                hit = ray_rect_intersection(start_pos, direction, self.walls[i], closest_distance)
+                if hit and (closest is None or hit[0] < closest_distance):
+                    closest_distance = hit[0]
+                    closest = (hit[1], self.walls[i])
+
+            # Nothing in later cells can be closer than a hit inside this one
+            if closest is not None and closest_distance <= t_exit:
+                break
+
+        point = (
+            start_pos[0] + direction[0] * closest_distance,
+            start_pos[1] + direction[1] * closest_distance
+        )
+        if closest is None:
+            return RayHit(point, None, max_distance, None)
+        return RayHit(point, closest[0], closest_distance, closest[1])